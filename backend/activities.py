@@ -0,0 +1,211 @@
+"""MET activity catalog (Compendium of Physical Activities) with fuzzy search.
+
+The catalog is loaded once from data/met_compendium.csv (or MET_CATALOG_PATH,
+same columns) into parallel arrays sorted by activity code. Search uses two indexes built at load time: the
+sorted vocabulary with one flat postings array, so every word sharing a
+prefix maps to a single contiguous slice, and trigram postings that still
+match misspelled words. Calories for whole workout logs use the formula of
+CaloriesBurnedCalculator.jsx on NumPy columns.
+"""
+import bisect
+import csv
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+import formulas
+from metabolic import is_male
+
+CATALOG_PATH = Path(os.environ.get("MET_CATALOG_PATH", Path(__file__).parent / "data" / "met_compendium.csv"))
+
+# Compendium intensity bands: light < 3 METs, moderate < 6, vigorous above
+LIGHT_MET = 3.0
+# Share of energy from fat the calculator assumes for light / other intensities
+FAT_FRACTION_LIGHT = 0.5
+FAT_FRACTION = 0.4
+KCAL_PER_GRAM_FAT = 9
+
+# A row only scores as fuzzy match with at least this share of the query's trigrams
+MIN_TRIGRAM_SIMILARITY = 0.4
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokens(text):
+    return WORD.findall(text.lower())
+
+
+def trigrams(word):
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MetCatalog:
+    def __init__(self, path=CATALOG_PATH):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = sorted(csv.DictReader(f), key=lambda row: int(row["code"]))
+        if not rows:
+            raise ValueError(f"No activities in {path}")
+        self.codes = np.array([int(row["code"]) for row in rows], dtype=np.int32)
+        if (np.diff(self.codes) == 0).any():
+            raise ValueError(f"Duplicate activity codes in {path}")
+        self.mets = np.array([float(row["met"]) for row in rows])
+        self.headings = tuple(dict.fromkeys(row["heading"] for row in rows))
+        self.heading_index = np.array([self.headings.index(row["heading"]) for row in rows], dtype=np.uint8)
+        self.descriptions = tuple(row["description"] for row in rows)
+        self._build_indexes()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _build_indexes(self):
+        entries_by_word = {}
+        described_by_word = {}
+        for i, (heading, description) in enumerate(zip(self.heading_index, self.descriptions)):
+            described = set(tokens(description))
+            for word in described | set(tokens(self.headings[heading])):
+                entries_by_word.setdefault(word, []).append(i)
+            for word in described:
+                described_by_word.setdefault(word, []).append(i)
+
+        # Words in sorted order with their postings back to back: the words
+        # sharing a prefix are adjacent, and so are their postings
+        self._words = sorted(entries_by_word)
+        lengths = [len(entries_by_word[word]) for word in self._words]
+        self._word_offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int32)
+        self._word_postings = np.fromiter(
+            (i for word in self._words for i in entries_by_word[word]), dtype=np.int32, count=sum(lengths))
+
+        # Trigrams come from descriptions only, or a misspelled "runing" would
+        # match every entry under the "running" heading (jogging included) equally
+        entries_by_trigram = {}
+        for word, entries in described_by_word.items():
+            for gram in trigrams(word):
+                entries_by_trigram.setdefault(gram, set()).update(entries)
+        self._trigram_postings = {
+            gram: np.fromiter(sorted(entries), dtype=np.int32) for gram, entries in entries_by_trigram.items()
+        }
+        self._description_lengths = np.array([len(d) for d in self.descriptions], dtype=np.int32)
+
+    def _prefix_matches(self, prefix):
+        lo = bisect.bisect_left(self._words, prefix)
+        hi = bisect.bisect_left(self._words, prefix + "\x7f", lo)
+        return self._word_postings[self._word_offsets[lo]:self._word_offsets[hi]]
+
+    def search(self, query, limit=10, heading=None):
+        """Best matches for ``query``, ranked by how many of its words prefix a
+        word of the entry, then by trigram similarity, then by shorter (more
+        specific) description."""
+        words = tokens(query)
+        if not words:
+            raise ValueError("Search query must contain letters or digits")
+        n = len(self.codes)
+        prefix_hits = np.zeros(n, dtype=np.int32)
+        for word in words:
+            matched = np.zeros(n, dtype=bool)
+            matched[self._prefix_matches(word)] = True
+            prefix_hits += matched
+
+        grams = set().union(*(trigrams(word) for word in words))
+        postings = [self._trigram_postings[g] for g in grams if g in self._trigram_postings]
+        shared = np.bincount(np.concatenate(postings), minlength=n) if postings else np.zeros(n, dtype=np.int64)
+        similarity = shared / len(grams)
+
+        candidates = (prefix_hits > 0) | (similarity >= MIN_TRIGRAM_SIMILARITY)
+        if heading is not None:
+            if heading not in self.headings:
+                raise ValueError(f"Unknown heading: {heading}")
+            candidates &= self.heading_index == self.headings.index(heading)
+        found = np.flatnonzero(candidates)
+        # lexsort sorts by the last key first
+        order = np.lexsort((self._description_lengths[found], -similarity[found], -prefix_hits[found]))
+        best = found[order[:limit]]
+        scores = (prefix_hits[best] + np.minimum(similarity[best], 1.0)) / (len(words) + 1)
+        return [{**self.entry_at(i), "score": round(float(score), 3)} for i, score in zip(best, scores)]
+
+    def entry_at(self, i):
+        return {
+            "code": f"{self.codes[i]:05d}",
+            "met": round(float(self.mets[i]), 2),
+            "heading": self.headings[self.heading_index[i]],
+            "description": self.descriptions[i],
+        }
+
+    def index_of(self, codes):
+        """Row index for each activity code; unknown codes raise ValueError."""
+        try:
+            codes = np.asarray(codes, dtype=np.int64)
+        except OverflowError:
+            raise ValueError("Unknown activity code: out of range") from None
+        index = np.minimum(np.searchsorted(self.codes, codes), len(self.codes) - 1)
+        unknown = self.codes[index] != codes
+        if unknown.any():
+            raise ValueError(f"Unknown activity code: {codes[unknown][0]:05d}")
+        return index
+
+    def entry(self, code):
+        return self.entry_at(self.index_of([code])[0])
+
+
+def _optional_column(values, n, name):
+    if values is None:
+        return np.full(n, np.nan)
+    if len(values) != n:
+        raise ValueError(f"Column '{name}' has {len(values)} values, expected {n}")
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def compute_calories(catalog, codes, duration_min, weight, age=None, body_fat=None, sex=None, weight_unit="kg"):
+    """Calories for each logged session, as in CaloriesBurnedCalculator.jsx.
+
+    MET x weight x hours, or when age, body fat and sex are all known for a
+    row, MET x lean mass x 1.2 x hours with the calculator's age adjustment
+    (clamped to 0.8-1.1) and 0.9 for women.
+    """
+    met = catalog.mets[catalog.index_of(codes)]
+    n = met.shape[0]
+    duration_min = np.asarray(duration_min, dtype=np.float64)
+    weight_kg = np.asarray(weight, dtype=np.float64) * formulas.to_kg(1, weight_unit)
+    if duration_min.shape != (n,) or weight_kg.shape != (n,):
+        raise ValueError(f"Columns 'duration_min' and 'weight' must have {n} values")
+    if (duration_min <= 0).any() or (weight_kg <= 0).any():
+        raise ValueError("Durations and weights must be positive")
+    age = _optional_column(age, n, "age")
+    body_fat = _optional_column(body_fat, n, "body_fat")
+    if sex is None:
+        sex = [None] * n
+    elif len(sex) != n:
+        raise ValueError(f"Column 'sex' has {len(sex)} values, expected {n}")
+    has_sex = np.array([s is not None for s in sex], dtype=bool)
+    male = np.zeros(n, dtype=bool)
+    if has_sex.any():
+        male[has_sex] = is_male([s for s in sex if s is not None])
+
+    hours = duration_min / 60
+    calories = met * weight_kg * hours
+    adjusted = has_sex & ~np.isnan(age) & ~np.isnan(body_fat)
+    if adjusted.any():
+        age_adjustment = np.clip(1 - (age - 25) * 0.002, 0.8, 1.1)
+        sex_adjustment = np.where(male, 1.0, 0.9)
+        lean_mass = weight_kg * (1 - body_fat / 100)
+        calories = np.where(adjusted, met * lean_mass * 1.2 * hours * age_adjustment * sex_adjustment, calories)
+
+    fat_fraction = np.where(met < LIGHT_MET, FAT_FRACTION_LIGHT, FAT_FRACTION)
+    return {
+        "met": met,
+        "calories": calories,
+        "calories_per_hour": calories / hours,
+        "fat_grams": calories * fat_fraction / KCAL_PER_GRAM_FAT,
+    }
+
+
+_catalog = None
+
+
+def get_catalog():
+    global _catalog
+    if _catalog is None:
+        _catalog = MetCatalog()
+    return _catalog
@@ -0,0 +1,216 @@
+"""Body-composition profile: every measurement-derived metric in one pass.
+
+Covers BMI, the five BSA formulas (BodySurfaceAreaCalculator.jsx), Boer,
+James and Hume lean body mass with FFMI (LeanBodyMassCalculator.jsx), Navy
+and Army body fat (BodyFatCalculator.jsx, ArmyBodyFatCalculator.jsx) and the
+somatotype scores of BodyTypeCalculator.jsx. Units are normalized once, and
+the shared intermediates (height², natural and base-10 logs of height and
+weight) are computed once per batch. Large batches are split across a
+process pool.
+"""
+import asyncio
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import formulas
+from composition import navy_body_fat
+from metabolic import is_male, to_column
+
+# Batches smaller than this run in one thread; pickling to workers costs more
+PARALLEL_MIN_ROWS = 20000
+LN10 = math.log(10)
+LOG10_CM_PER_INCH = math.log10(formulas.CM_PER_INCH)
+
+# (male, female) maximum body fat for ages up to 20, 27, 39 and above (AR 600-9)
+ARMY_AGE_LIMITS = (20, 27, 39)
+ARMY_MAX_BODY_FAT = {True: (20, 22, 24, 26), False: (30, 32, 34, 36)}
+
+SOMATOTYPES = ("endomorph", "mesomorph", "ectomorph")
+
+MEASUREMENTS = ("neck", "waist", "hip", "wrist", "shoulder")
+
+
+def _column(values, n, name):
+    if values is None:
+        return np.full(n, np.nan)
+    if len(values) != n:
+        raise ValueError(f"Column '{name}' has {len(values)} values, expected {n}")
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def normalize(columns, weight_unit="kg", length_unit="cm"):
+    """Convert a columnar request to float arrays in kg / cm (NaN for missing)."""
+    weight_factor = formulas.to_kg(1, weight_unit)
+    length_factor = formulas.to_cm(1, length_unit)
+    n = len(columns["weight"])
+    if len(columns["sex"]) != n:
+        raise ValueError(f"Column 'sex' has {len(columns['sex'])} values, expected {n}")
+    data = {
+        "weight_kg": _column(columns["weight"], n, "weight") * weight_factor,
+        "height_cm": _column(columns["height"], n, "height") * length_factor,
+        "age": _column(columns.get("age"), n, "age"),
+        "body_fat": _column(columns.get("body_fat"), n, "body_fat"),
+        "male": is_male(columns["sex"]),
+    }
+    for name in MEASUREMENTS:
+        data[f"{name}_cm"] = _column(columns.get(name), n, name) * length_factor
+    if not ((data["weight_kg"] > 0).all() and (data["height_cm"] > 0).all()):
+        raise ValueError("Weight and height must be positive")
+    return data
+
+
+def _somatotype(bmi, male, wrist, shoulder, waist, hip):
+    n = bmi.shape[0]
+    scores = np.zeros((n, 3))
+    # BMI: <18.5, <22, <25, <28, else -> (endo, meso, ecto) points
+    bmi_points = np.array([[0, 0, 3], [0, 1, 2], [0, 2, 1], [1, 2, 0], [3, 0, 0]])
+    scores += bmi_points[np.searchsorted([18.5, 22, 25, 28], bmi, side="right")]
+
+    framed = ~np.isnan(wrist) & ~np.isnan(shoulder) & ~np.isnan(waist)
+    wrist_low = np.where(male, 16.5, 14.0)
+    wrist_high = np.where(male, 19.0, 16.5)
+    scores[:, 2] += framed & (wrist < wrist_low)
+    scores[:, 0] += framed & (wrist > wrist_high)
+    scores[:, 1] += framed & (wrist >= wrist_low) & (wrist <= wrist_high)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = shoulder / waist
+    ratio_low = np.where(male, 1.3, 1.1)
+    ratio_high = np.where(male, 1.45, 1.25)
+    scores[:, 1] += np.where(framed & (ratio > ratio_high), 2, 0)
+    scores[:, 0] += framed & (ratio < ratio_low)
+    scores[:, 1] += framed & (ratio >= ratio_low) & (ratio <= ratio_high)
+
+    hipped = ~np.isnan(waist) & ~np.isnan(hip)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        waist_hip = waist / hip
+    scores[:, 1] += hipped & (waist_hip < np.where(male, 0.85, 0.7))
+    scores[:, 0] += hipped & (waist_hip > np.where(male, 0.95, 0.8))
+
+    # Stable sort keeps the calculator's endomorph > mesomorph > ectomorph tie order
+    order = np.argsort(-scores, axis=1, kind="stable")
+    rows = np.arange(n)
+    first, second = order[:, 0], order[:, 1]
+    has_secondary = scores[rows, second] >= scores[rows, first] - 1
+    names = np.array(SOMATOTYPES, dtype=object)
+    return {
+        **{name: scores[:, i] for i, name in enumerate(SOMATOTYPES)},
+        "primary": names[first],
+        "secondary": np.where(has_secondary, names[second], None),
+    }
+
+
+def compute_profiles(data):
+    """All derived metrics for normalized columns (see ``normalize``)."""
+    w = data["weight_kg"]
+    h = data["height_cm"]
+    male = data["male"]
+
+    # Shared intermediates
+    height_m2 = (h / 100) ** 2
+    ln_w = np.log(w)
+    ln_h = np.log(h)
+    log10_w = ln_w / LN10
+    log10_h_in = ln_h / LN10 - LOG10_CM_PER_INCH
+    bmi = w / height_m2
+
+    bsa = {
+        "dubois": 0.007184 * np.exp(0.725 * ln_h + 0.425 * ln_w),
+        "mosteller": np.sqrt(h * w / 3600),
+        "haycock": 0.024265 * np.exp(0.5378 * ln_w + 0.3964 * ln_h),
+        "gehan": 0.0235 * np.exp(0.51456 * ln_w + 0.42246 * ln_h),
+        # weight in grams: log10(g) = log10(kg) + 3
+        "boyd": 0.0003207 * np.exp(0.3 * ln_h + (0.7285 - 0.0188 * (log10_w + 3)) * (ln_w + 3 * LN10)),
+    }
+
+    navy = navy_body_fat(h, data["neck_cm"], data["waist_cm"], data["hip_cm"], male, log_height=log10_h_in)
+    # The women's formula needs the hip; without it the result is far below zero
+    navy = np.where(np.isfinite(navy) & (male | ~np.isnan(data["hip_cm"])), navy, np.nan)
+    lean_mass = {
+        "boer": np.where(male, 0.407 * w + 0.267 * h - 19.2, 0.252 * w + 0.473 * h - 48.3),
+        # 128 * (W / H)^2 as published; the calculator page squares W / H^2 instead
+        "james": np.where(male, 1.1 * w - 128 * (w / h) ** 2, 1.07 * w - 148 * (w / h) ** 2),
+        "hume": np.where(male, 0.32810 * w + 0.33929 * h - 29.5336, 0.29569 * w + 0.41813 * h - 43.2933),
+        "navy": w * (1 - navy / 100),
+        "measured": w * (1 - data["body_fat"] / 100),
+    }
+
+    age = data["age"]
+    # side="left": an age equal to a limit falls in that band (age <= 20 -> first)
+    band = np.searchsorted(ARMY_AGE_LIMITS, np.nan_to_num(age), side="left")
+    limits = np.where(male[:, None], ARMY_MAX_BODY_FAT[True], ARMY_MAX_BODY_FAT[False])
+    army_max = np.where(np.isnan(age), np.nan, limits[np.arange(len(age)), band])
+
+    somatotype = _somatotype(bmi, male, data["wrist_cm"], data["shoulder_cm"], data["waist_cm"], data["hip_cm"])
+    return {
+        "bmi": bmi,
+        "bsa": bsa,
+        "lean_mass": lean_mass,
+        "ffmi": {name: lbm / height_m2 for name, lbm in lean_mass.items()},
+        "body_fat": {"navy": navy, "measured": data["body_fat"]},
+        "army_max_body_fat": army_max,
+        "army_pass": np.where(np.isnan(navy) | np.isnan(army_max), None, navy <= army_max),
+        "somatotype": somatotype,
+    }
+
+
+def _slice(data, start, stop):
+    return {name: values[start:stop] for name, values in data.items()}
+
+
+def _concat(parts):
+    first = parts[0]
+    if isinstance(first, dict):
+        return {name: _concat([part[name] for part in parts]) for name in first}
+    return np.concatenate(parts)
+
+
+def to_json(results, decimals=2):
+    """Nested result arrays as JSON-friendly lists (NaN -> None)."""
+    if isinstance(results, dict):
+        return {name: to_json(values, decimals) for name, values in results.items()}
+    if results.dtype == object:
+        return results.tolist()
+    return to_column(results, decimals)
+
+
+def row(results, index):
+    """One row of ``to_json`` output, as scalars."""
+    if isinstance(results, dict):
+        return {name: row(values, index) for name, values in results.items()}
+    return results[index]
+
+
+_pool = None
+WORKERS = int(os.environ.get("BODY_PROFILE_WORKERS", os.cpu_count() or 1))
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=WORKERS)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+async def compute_batch(data):
+    """compute_profiles off the event loop; large batches are split across the process pool."""
+    loop = asyncio.get_running_loop()
+    n = data["weight_kg"].shape[0]
+    if n < PARALLEL_MIN_ROWS:
+        return await loop.run_in_executor(None, compute_profiles, data)
+    pool = get_pool()
+    chunk = max(PARALLEL_MIN_ROWS // 2, -(-n // WORKERS))
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(pool, compute_profiles, _slice(data, start, start + chunk))
+        for start in range(0, n, chunk)
+    ))
+    return _concat(parts)
@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+
+from metabolic import is_male
+
+
+CM_PER_INCH = 2.54
+
+
+def navy_body_fat(height_cm, neck_cm, waist_cm, hip_cm, male, log_height=None):
+    """U.S. Navy circumference method, as in BodyFatCalculator.jsx (inches internally).
+
+    ``log_height`` is log10 of the height in inches, for callers that already have it.
+    """
+    neck_in = np.asarray(neck_cm, dtype=np.float64) / CM_PER_INCH
+    waist_in = np.asarray(waist_cm, dtype=np.float64) / CM_PER_INCH
+    hip_in = np.nan_to_num(np.asarray(hip_cm, dtype=np.float64)) / CM_PER_INCH
+    if log_height is None:
+        log_height = np.log10(np.asarray(height_cm, dtype=np.float64) / CM_PER_INCH)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        men = 86.010 * np.log10(waist_in - neck_in) - 70.041 * log_height + 36.76
+        women = 163.205 * np.log10(waist_in + hip_in - neck_in) - 97.684 * log_height - 78.387
+    return np.where(male, men, women)
+
+
+def compute_composition(weight_kg, height_cm, neck_cm, waist_cm, hip_cm, sex):
+    """Navy body fat, fat/lean mass and FFMI for columnar inputs.
+
+    Rows whose measurements make the formula undefined (e.g. neck >= waist)
+    come back as NaN rather than failing the whole batch.
+    """
+    weight_kg = np.asarray(weight_kg, dtype=np.float64)
+    height_cm = np.asarray(height_cm, dtype=np.float64)
+    male = is_male(sex)
+    body_fat = navy_body_fat(height_cm, neck_cm, waist_cm, hip_cm, male)
+    fat_mass = weight_kg * body_fat / 100
+    lean_mass = weight_kg - fat_mass
+    height_m = height_cm / 100
+    return {
+        "body_fat": body_fat,
+        "fat_mass": fat_mass,
+        "lean_mass": lean_mass,
+        "ffmi": lean_mass / (height_m * height_m),
+    }
+
+
+COMPOSITION_FIELDS = ("weight_kg", "height_cm", "neck_cm", "waist_cm", "sex")
+
+
+def _round_or_none(value, decimals=2):
+    return round(value, decimals) if math.isfinite(value) else None
+
+
+def _measurement(record, field):
+    """A positive finite float from a record field; bools and numeric strings are not accepted."""
+    value = record[field]
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value <= 0:
+        raise ValueError(f"{field} must be a positive number, got {value!r}")
+    return float(value)
+
+
+def process_records(records):
+    """Compute composition for a micro-batch of record dicts (NDJSON handler).
+
+    Returns one result dict per record, in order; invalid records get an
+    ``error`` entry instead of failing the batch. Each record is validated
+    on its own, so one bad line never affects the others in its batch.
+    Women need ``hip_cm``, and a body fat outside (0, 100) is an error.
+    """
+    results = [None] * len(records)
+    valid = []
+    rows = []
+    for i, record in enumerate(records):
+        missing = [field for field in COMPOSITION_FIELDS if record.get(field) is None]
+        if missing:
+            results[i] = {"error": f"missing fields: {', '.join(missing)}"}
+            continue
+        if str(record["sex"]).lower() not in ("male", "female"):
+            results[i] = {"error": f"unknown sex value: {record['sex']}"}
+            continue
+        if record.get("hip_cm") is None and str(record["sex"]).lower() == "female":
+            results[i] = {"error": "missing fields: hip_cm"}
+            continue
+        try:
+            measurements = [_measurement(record, field) for field in COMPOSITION_FIELDS[:4]]
+            hip = _measurement(record, "hip_cm") if record.get("hip_cm") is not None else np.nan
+        except ValueError as e:
+            results[i] = {"error": str(e)}
+            continue
+        valid.append(i)
+        rows.append((*measurements, hip, record["sex"]))
+    if valid:
+        weight, height, neck, waist, hip, sex = zip(*rows)
+        columns = compute_composition(weight, height, neck, waist, hip, sex)
+        for column_index, i in enumerate(valid):
+            # NaN when the neck is not below the waist; out of range for far-off circumferences
+            body_fat = float(columns["body_fat"][column_index])
+            if not 0 < body_fat < 100:
+                results[i] = {"error": "measurements are outside the Navy formula's range"}
+                continue
+            result = {name: _round_or_none(float(values[column_index])) for name, values in columns.items()}
+            if "id" in records[i]:
+                result = {"id": records[i]["id"], **result}
+            results[i] = result
+    return results
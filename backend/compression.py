@@ -0,0 +1,223 @@
+"""Response compression and precompressed static files.
+
+CompressionMiddleware negotiates br or gzip from Accept-Encoding for API
+responses. It is pure ASGI like MetricsMiddleware: bodies below
+``minimum_size``, non-text types and responses that already carry a
+Content-Encoding pass through. Streamed bodies (NDJSON) are compressed
+incrementally with a flush per chunk, so each batch still reaches the client
+as soon as it is produced. Strong ETags are weakened, as the encoded bytes are
+not the representation the tag was computed for, also on 304s; endpoints
+that revalidate must compare with response_cache.etag_matches, which is weak.
+
+PrecompressedStaticFiles serves a built frontend whose assets have .br/.gz
+siblings written at build time by precompress.py, so static files are never
+compressed per request. Brotli is optional: without the ``brotli`` package
+only gzip is offered.
+"""
+import json
+import mimetypes
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml",
+)
+MANIFEST_NAME = "precompress-manifest.json"
+
+
+def accepted_encodings(accept_encoding):
+    """Codings from an Accept-Encoding header with q > 0, best first."""
+    codings = []
+    for i, part in enumerate(accept_encoding.split(",")):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name and q > 0:
+            codings.append((-q, i, name.strip().lower()))
+    return [name for _, _, name in sorted(codings)]
+
+
+def choose_encoding(accept_encoding, available):
+    for name in accepted_encodings(accept_encoding or ""):
+        if name in available:
+            return name
+        if name == "*":
+            return available[0] if available else None
+    return None
+
+
+def add_vary(headers):
+    """Add Accept-Encoding to Vary unless the endpoint already listed it."""
+    vary = headers.get("vary", "")
+    if "accept-encoding" not in (token.strip().lower() for token in vary.split(",")):
+        headers.add_vary_header("Accept-Encoding")
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data=b""):
+        return self._z.compress(data) + self._z.flush()
+
+
+class _Brotli:
+    def __init__(self, quality):
+        self._c = brotli.Compressor(quality=quality)
+
+    def chunk(self, data):
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self, data=b""):
+        return self._c.process(data) + self._c.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        # Preference when the client weighs them equally
+        self.available = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def _compressor(self, encoding):
+        return _Brotli(self.brotli_quality) if encoding == "br" else _Gzip(self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding"), self.available)
+        if_none_match = request_headers.get("if-none-match")
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if message["status"] == 304:
+                    # Vary as on the 200, and the ETag in the form the client holds
+                    headers = MutableHeaders(raw=message["headers"])
+                    add_vary(headers)
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/") and "W/" + etag in (if_none_match or ""):
+                        headers["ETag"] = "W/" + etag
+                    passthrough = True
+                    await send(message)
+                elif ("content-encoding" in headers or message["status"] == 204
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                add_vary(headers)
+                if not more_body and len(body) < self.minimum_size:
+                    # Too small to be worth it
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = self._compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start)
+                    start = None
+                else:
+                    body = compressor.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+            if more_body:
+                data = compressor.chunk(body)
+                if data:
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, compressing_send)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """A built SPA: prerendered route shells, index.html fallback, and .br/.gz siblings from the manifest."""
+
+    ENCODINGS = ("br", "gzip")
+
+    def __init__(self, directory, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.root = os.path.realpath(directory)
+        try:
+            with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+                self.variants = {path: entry["variants"] for path, entry in json.load(f)["files"].items()}
+        except (OSError, ValueError, KeyError):
+            self.variants = {}
+
+    async def get_response(self, path, scope):
+        if not os.path.splitext(path)[1]:
+            # Client-side route: its prerendered shell if there is one, else the SPA entry point
+            shell = "index.html" if path in ("", ".") else os.path.join(path, "index.html")
+            full_path, stat_result = self.lookup_path(shell)
+            if stat_result is None:
+                full_path, stat_result = self.lookup_path("index.html")
+            if stat_result is not None:
+                return self.file_response(full_path, stat_result, scope)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        relative = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+        variants = self.variants.get(relative)
+        if not variants:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"), self.ENCODINGS)
+        if encoding in variants:
+            sibling = os.path.join(os.path.dirname(full_path), variants[encoding])
+            response = super().file_response(sibling, os.stat(sibling), scope, status_code)
+            response.headers["Content-Encoding"] = encoding
+            # Type of the original file, not of the .br/.gz sibling
+            media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+            if media_type.startswith("text/"):
+                media_type += "; charset=utf-8"
+            response.headers["Content-Type"] = media_type
+        else:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+        add_vary(response.headers)
+        return response
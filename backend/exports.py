@@ -0,0 +1,203 @@
+"""Background exports of status checks to gzip CSV or Parquet.
+
+A job reads ``status_checks`` through a Mongo cursor in ``batch_size``
+chunks and appends each chunk to the output file from a worker thread:
+another CSV block in one gzip stream, or another Parquet row group. Memory
+stays bounded by one chunk whatever the collection size. Job state lives in
+the ``export_jobs`` collection, so any worker can report progress and serve
+the file (workers of one deployment share EXPORT_DIR).
+"""
+import asyncio
+import gzip
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "csv": (".csv.gz", "application/gzip"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+COLUMNS = ("id", "client_name", "timestamp")
+
+
+class CsvChunkWriter:
+    def __init__(self, path):
+        self._file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        self._header = True
+
+    def write(self, frame):
+        frame.to_csv(self._file, header=self._header, index=False, date_format="%Y-%m-%dT%H:%M:%S.%f")
+        self._header = False
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetChunkWriter:
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.string()), ("client_name", pa.string()), ("timestamp", pa.timestamp("ms")),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, frame):
+        table = self._pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {"csv": CsvChunkWriter, "parquet": ParquetChunkWriter}
+
+
+def check_format(fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet exports require pyarrow (pip install pyarrow)")
+
+
+def to_frame(columns):
+    import pandas as pd
+
+    frame = pd.DataFrame(columns, columns=COLUMNS)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+    return frame
+
+
+class ExportManager:
+    def __init__(self, db, output_dir, batch_size=50000, max_concurrent=2, retention_hours=24):
+        self.source = db.status_checks
+        self.jobs = db.export_jobs
+        self.output_dir = Path(output_dir)
+        self.batch_size = batch_size
+        self.retention = timedelta(hours=retention_hours)
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._tasks = {}
+
+    async def create_indexes(self):
+        await self.jobs.create_index([("created_at", ASCENDING)])
+
+    async def start(self, fmt, client_name=None, since=None, until=None):
+        check_format(fmt)
+        await self.prune()
+        query = {}
+        if client_name is not None:
+            query["client_name"] = client_name
+        if since is not None or until is not None:
+            query["timestamp"] = {}
+            if since is not None:
+                query["timestamp"]["$gte"] = since
+            if until is not None:
+                query["timestamp"]["$lt"] = until
+
+        job_id = str(uuid.uuid4())
+        suffix, _ = FORMATS[fmt]
+        job = {
+            "_id": job_id,
+            "format": fmt,
+            "filters": {"client_name": client_name, "since": since, "until": until},
+            "state": "queued",
+            "rows_written": 0,
+            "total_rows": None,
+            "bytes_written": 0,
+            "filename": f"status_checks-{datetime.utcnow():%Y%m%dT%H%M%S}-{job_id[:8]}{suffix}",
+            "error": None,
+            "created_at": datetime.utcnow(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        await self.jobs.insert_one(job)
+        task = asyncio.create_task(self._run(job, query))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return job
+
+    async def get(self, job_id):
+        return await self.jobs.find_one({"_id": job_id})
+
+    def path_for(self, job):
+        return self.output_dir / job["filename"]
+
+    async def _update(self, job_id, **fields):
+        await self.jobs.update_one({"_id": job_id}, {"$set": fields})
+
+    async def _run(self, job, query):
+        job_id = job["_id"]
+        async with self._slots:
+            path = self.path_for(job)
+            partial = path.with_name(path.name + ".part")
+            try:
+                total = await (self.source.count_documents(query) if query else
+                               self.source.estimated_document_count())
+                await self._update(job_id, state="running", started_at=datetime.utcnow(), total_rows=total)
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                writer = await asyncio.to_thread(WRITERS[job["format"]], partial)
+                rows = 0
+                started = time.perf_counter()
+                try:
+                    cursor = self.source.find(query, {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1})
+                    cursor = cursor.sort([("timestamp", ASCENDING), ("id", ASCENDING)]).batch_size(self.batch_size)
+                    columns = {name: [] for name in COLUMNS}
+                    async for doc in cursor:
+                        for name in COLUMNS:
+                            columns[name].append(doc.get(name))
+                        if len(columns["id"]) >= self.batch_size:
+                            rows += await self._write_chunk(writer, columns)
+                            columns = {name: [] for name in COLUMNS}
+                            await self._update(job_id, rows_written=rows, bytes_written=partial.stat().st_size)
+                    # An empty export still gets the CSV header
+                    if columns["id"] or not rows:
+                        rows += await self._write_chunk(writer, columns)
+                finally:
+                    await asyncio.to_thread(writer.close)
+                os.replace(partial, path)
+                await self._update(
+                    job_id, state="done", rows_written=rows, bytes_written=path.stat().st_size,
+                    finished_at=datetime.utcnow(),
+                )
+                logger.info("Export %s wrote %d rows in %.1fs", job_id, rows, time.perf_counter() - started)
+            except asyncio.CancelledError:
+                partial.unlink(missing_ok=True)
+                await asyncio.shield(self._update(
+                    job_id, state="failed", error="interrupted by shutdown", finished_at=datetime.utcnow()))
+                raise
+            except (PyMongoError, OSError, ValueError) as e:
+                logger.exception("Export %s failed", job_id)
+                partial.unlink(missing_ok=True)
+                await self._update(job_id, state="failed", error=str(e), finished_at=datetime.utcnow())
+
+    @staticmethod
+    async def _write_chunk(writer, columns):
+        # Frame building and encoding are CPU-bound; keep them off the event loop
+        await asyncio.to_thread(lambda: writer.write(to_frame(columns)))
+        return len(columns["id"])
+
+    async def prune(self):
+        """Delete files and mark jobs expired once they are older than the retention window."""
+        cutoff = datetime.utcnow() - self.retention
+        async for job in self.jobs.find({"state": "done", "finished_at": {"$lt": cutoff}}):
+            self.path_for(job).unlink(missing_ok=True)
+            await self._update(job["_id"], state="expired")
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,185 @@
+"""Scalar calculator formulas shared by the API, behind a bounded LRU/TTL cache.
+
+Inputs are normalized to metric units and quantized before they form the
+cache key, so "180 cm" and "70.866 in" hit the same entry. Results are
+computed from the quantized values, so a cached answer is always identical
+to a fresh one.
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+CM_PER_INCH = 2.54
+KG_PER_LB = 0.453592
+# The 1RM formulas are fitted on sets of a few reps and diverge far beyond
+# (Brzycki at 37, Lander at 38); the training planner uses the same limit
+ONE_RM_MAX_REPS = 20
+
+
+class FormulaCache:
+    def __init__(self, maxsize=4096, ttl=3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires >= time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+cache = FormulaCache(
+    maxsize=int(os.environ.get("FORMULA_CACHE_SIZE", 4096)),
+    ttl=float(os.environ.get("FORMULA_CACHE_TTL", 3600)),
+)
+
+
+def memoized(func):
+    """Cache ``func`` on its (already quantized) positional arguments."""
+    @wraps(func)
+    def wrapper(*args):
+        key = (func.__name__,) + args
+        result = cache.get(key)
+        if result is None:
+            result = func(*args)
+            cache.put(key, result)
+        return result
+    return wrapper
+
+
+def to_cm(height, unit="cm"):
+    if unit == "cm":
+        return float(height)
+    if unit == "in":
+        return float(height) * CM_PER_INCH
+    raise ValueError(f"Unknown height unit: {unit}")
+
+
+def to_kg(weight, unit="kg"):
+    if unit == "kg":
+        return float(weight)
+    if unit == "lbs":
+        return float(weight) * KG_PER_LB
+    raise ValueError(f"Unknown weight unit: {unit}")
+
+
+def quantize(value, step=0.1):
+    steps = value / step
+    if not math.isfinite(steps):
+        raise ValueError(f"Expected a finite number, got {value}")
+    return round(round(steps) * step, 6)
+
+
+@memoized
+def _bsa(weight_kg, height_cm):
+    weight_g = weight_kg * 1000
+    return {
+        "dubois": 0.007184 * height_cm ** 0.725 * weight_kg ** 0.425,
+        "mosteller": math.sqrt(height_cm * weight_kg / 3600),
+        "haycock": 0.024265 * weight_kg ** 0.5378 * height_cm ** 0.3964,
+        "gehan": 0.0235 * weight_kg ** 0.51456 * height_cm ** 0.42246,
+        "boyd": 0.0003207 * height_cm ** 0.3 * weight_g ** (0.7285 - 0.0188 * math.log10(weight_g)),
+    }
+
+
+def body_surface_area(weight, height, weight_unit="kg", height_unit="cm"):
+    """All five BSA formulas from BodySurfaceAreaCalculator.jsx, in m²."""
+    weight_kg = quantize(to_kg(weight, weight_unit))
+    height_cm = quantize(to_cm(height, height_unit))
+    if weight_kg <= 0 or height_cm <= 0:
+        raise ValueError("Weight and height must be positive")
+    return _bsa(weight_kg, height_cm)
+
+
+@memoized
+def _one_rep_max(weight, reps):
+    w, r = weight, reps
+    return {
+        "epley": w * (1 + r / 30),
+        "brzycki": w * (36 / (37 - r)),
+        "lander": 100 * w / (101.3 - 2.67123 * r),
+        "lombardi": w * r ** 0.10,
+        "mayhew": 100 * w / (52.2 + 41.9 * math.exp(-0.055 * r)),
+        "oconner": w * (1 + 0.025 * r),
+        "wathan": 100 * w / (48.8 + 53.8 * math.exp(-0.075 * r)),
+    }
+
+
+def one_rep_max(weight, reps):
+    """The seven 1RM estimates from OneRepMaxCalculator.jsx, in the input unit."""
+    reps = int(reps)
+    if weight <= 0 or not 1 <= reps <= ONE_RM_MAX_REPS:
+        raise ValueError(f"Weight must be positive and reps between 1 and {ONE_RM_MAX_REPS}")
+    return _one_rep_max(quantize(float(weight)), reps)
+
+
+# (base kg at 5 ft, kg per inch over 5 ft) for men, women
+IDEAL_WEIGHT_FORMULAS = {
+    "devine": ((50.0, 2.3), (45.5, 2.3)),
+    "robinson": ((52.0, 1.9), (49.0, 1.7)),
+    "miller": ((56.2, 1.41), (53.1, 1.36)),
+    "hamwi": ((48.0, 2.7), (45.5, 2.2)),
+}
+
+
+@memoized
+def _ideal_weight(height_cm, male):
+    inches_over = max(0.0, height_cm / CM_PER_INCH - 60)
+    results = {}
+    for name, (men, women) in IDEAL_WEIGHT_FORMULAS.items():
+        base, per_inch = men if male else women
+        results[name] = base + per_inch * inches_over
+    return results
+
+
+def ideal_weight(height, sex, height_unit="cm"):
+    """Devine, Robinson, Miller and Hamwi ideal weights from IdealWeightCalculator.jsx, in kg."""
+    sex = sex.lower()
+    if sex not in ("male", "female"):
+        raise ValueError(f"Unknown sex value: {sex}")
+    height_cm = quantize(to_cm(height, height_unit))
+    if height_cm <= 0:
+        raise ValueError("Height must be positive")
+    return _ideal_weight(height_cm, sex == "male")
@@ -0,0 +1,297 @@
+"""Multi-day meal plans that hit the macro targets of MacroCalculator.jsx.
+
+Calories and grams follow the calculator (TDEE plus the goal modifier, ratio
+presets, 4/4/9 kcal per gram, the same breakfast/lunch/dinner/snack split).
+Each meal is one protein, one carb and one fat food from data/foods.csv (or
+FOODS_PATH, same columns) plus a fixed serving of fruit or vegetables. Every
+(protein, carb, fat, produce) combination allowed by the preferences is solved
+at once: servings come from a batched least-squares solve of the 3x3 macro
+system, clipped and rounded to quarter servings, and combinations are ranked
+by the macro error that is left. Days then take the best combinations that do
+not repeat the previous day's protein or carb. Portions are capped, so a day
+that still falls short of a target lists it under ``short_of`` and the plan
+is flagged with ``shortfall``.
+
+Plans are memoized by (calorie band, ratio, preferences, days); targets are
+rounded to CALORIE_BAND kcal so nearby TDEEs share a plan.
+"""
+import csv
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+FOODS_PATH = Path(os.environ.get("FOODS_PATH", Path(__file__).parent / "data" / "foods.csv"))
+
+MACROS = ("protein", "carbs", "fat")
+KCAL_PER_GRAM = np.array([4.0, 4.0, 9.0])
+
+# Same presets (protein, carbs, fat %) and goal modifiers as MacroCalculator.jsx
+MACRO_PRESETS = {
+    "balanced": (25, 45, 30),
+    "highProtein": (35, 35, 30),
+    "lowCarb": (30, 20, 50),
+    "highCarb": (20, 60, 20),
+    "keto": (25, 5, 70),
+    "mediterranean": (20, 45, 35),
+}
+GOAL_MODIFIERS = {
+    "maintain": 0,
+    "lose0.5": -250,
+    "lose1": -500,
+    "gain0.5": 250,
+    "gain1": 500,
+}
+
+# Share of the day's protein, carbs and fat per meal, as in the calculator's meal distribution
+MEAL_SPLIT = {
+    "breakfast": (0.25, 0.25, 0.25),
+    "lunch": (0.35, 0.35, 0.30),
+    "dinner": (0.30, 0.30, 0.30),
+    "snacks": (0.10, 0.10, 0.15),
+}
+MEAL_CODES = {"breakfast": "b", "lunch": "l", "dinner": "d", "snacks": "s"}
+
+ROLES = ("protein", "carb", "fat", "produce")
+DIET_LEVELS = ("vegan", "vegetarian", "fish", "meat")
+# Diet preference -> the food diet levels it allows
+DIETS = {
+    "any": DIET_LEVELS,
+    "pescatarian": ("vegan", "vegetarian", "fish"),
+    "vegetarian": ("vegan", "vegetarian"),
+    "vegan": ("vegan",),
+}
+ALLERGENS = ("gluten", "dairy")
+
+CALORIE_BAND = 50
+MIN_CALORIES = 1000
+# Above this even capped portions of the densest foods fall well short
+MAX_CALORIES = 6000
+SERVING_STEP = 0.25
+MAX_SERVINGS = 3.0
+MAX_DAYS = 14
+# A day is short of a macro (or calories) below this share of its target
+SHORTFALL_RATIO = 0.9
+# Keeps the normal equations solvable when two foods have proportional macros
+RIDGE = 1e-6
+
+
+def js_round(x):
+    """Math.round for non-negative numbers (half up, not half to even)."""
+    return int(np.floor(x + 0.5))
+
+
+def macro_targets(calories, ratio):
+    """Grams of protein, carbs and fat for a day, rounded as in the calculator."""
+    grams = [js_round(js_round(calories * pct / 100) / per_gram) for pct, per_gram in zip(ratio, KCAL_PER_GRAM)]
+    return np.array(grams, dtype=np.float64)
+
+
+class FoodTable:
+    def __init__(self, path=FOODS_PATH):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        if not rows:
+            raise ValueError(f"No foods in {path}")
+        self.names = tuple(row["name"] for row in rows)
+        self._by_name = {name.lower(): i for i, name in enumerate(self.names)}
+        if len(self._by_name) != len(rows):
+            raise ValueError(f"Duplicate food names in {path}")
+        self.serving_g = np.array([float(row["serving_g"]) for row in rows], dtype=np.float32)
+        # Protein, carbs, fat in grams per serving
+        per_100g = np.array([[float(row[m]) for m in ("protein", "carbs", "fat")] for row in rows], dtype=np.float32)
+        self.macros = per_100g * self.serving_g[:, None] / 100
+        self.role = np.array([ROLES.index(row["role"]) for row in rows], dtype=np.uint8)
+        self.diet = np.array([DIET_LEVELS.index(row["diet"]) for row in rows], dtype=np.uint8)
+        # Bit i set: allowed at MEAL_CODES[i] / contains ALLERGENS[i]
+        codes = tuple(MEAL_CODES.values())
+        self.meal_bits = np.array([sum(1 << codes.index(c) for c in row["meals"]) for row in rows], dtype=np.uint8)
+        self.allergen_bits = np.array(
+            [sum(1 << ALLERGENS.index(a) for a in row["contains"].split()) for row in rows], dtype=np.uint8,
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def index_of(self, names):
+        try:
+            return [self._by_name[name.lower()] for name in names]
+        except KeyError as e:
+            raise ValueError(f"Unknown food: {e.args[0]}")
+
+    def allowed(self, diet="any", gluten_free=False, dairy_free=False, exclude=()):
+        """Mask of the foods that fit the preferences, at any meal."""
+        if diet not in DIETS:
+            raise ValueError(f"Unknown diet: {diet}")
+        mask = np.isin(self.diet, [DIET_LEVELS.index(level) for level in DIETS[diet]])
+        banned = (1 if gluten_free else 0) | (2 if dairy_free else 0)
+        mask &= (self.allergen_bits & banned) == 0
+        mask[self.index_of(exclude)] = False
+        return mask
+
+
+def rank_meal(table, candidates, target):
+    """Best servings for every (protein, carb, fat, produce) combination, best first.
+
+    Returns (foods, servings, error): foods and servings are (combinations x 4)
+    with a produce index of -1 when none is allowed.
+    """
+    roles = [np.flatnonzero(candidates & (table.role == r)) for r in range(len(ROLES))]
+    for role, foods in zip(ROLES[:3], roles):
+        if not foods.size:
+            raise ValueError(f"No {role} foods fit these preferences")
+    p, c, f = np.meshgrid(*roles[:3], indexing="ij")
+    p, c, f = p.ravel(), c.ravel(), f.ravel()
+    macros = table.macros.astype(np.float64)
+    # (combinations x macros x foods)
+    a = np.stack([macros[p], macros[c], macros[f]], axis=2)
+
+    produce = roles[3] if roles[3].size else np.array([-1])
+    produce_macros = np.where(produce[:, None] >= 0, macros[produce], 0.0)
+    # What the three foods still have to supply next to each produce option: (produce x macros)
+    remaining = np.maximum(target[None, :] - produce_macros, 0)
+
+    # Relative error on each macro, so a few grams of fat weigh as much as many grams of carbs
+    weights = 1 / np.maximum(target, 1)
+    wa = a * weights[None, :, None]
+    normal = wa.transpose(0, 2, 1) @ wa + RIDGE * np.eye(3)
+    rhs = wa.transpose(0, 2, 1) @ (remaining * weights).T[None, :, :]
+    servings = np.linalg.solve(normal, rhs).transpose(0, 2, 1)
+    # Portions are whole quarter servings, at most MAX_SERVINGS
+    servings = np.round(np.clip(servings, 0, MAX_SERVINGS) / SERVING_STEP) * SERVING_STEP
+
+    # (combinations x produce x macros)
+    achieved = np.einsum("kmj,kvj->kvm", a, servings) + produce_macros[None, :, :]
+    error = (np.abs(achieved - target) * weights).sum(axis=2)
+    calorie_target = target @ KCAL_PER_GRAM
+    error += np.abs(achieved @ KCAL_PER_GRAM - calorie_target) / calorie_target
+
+    order = np.argsort(error, axis=None, kind="stable")
+    k, v = np.unravel_index(order, error.shape)
+    foods = np.stack([p[k], c[k], f[k], produce[v]], axis=1)
+    portions = np.concatenate([servings[k, v], np.where(produce[v] >= 0, 1.0, 0.0)[:, None]], axis=1)
+    return foods, portions, error[k, v]
+
+
+def pick_days(foods, servings, days):
+    """Row of the ranking used on each day: best first, with no protein or carb two days running."""
+    # Foods that actually get a portion; a zero-serving food does not make a meal different
+    foods = np.where(servings > 0, foods, -1)
+    picks, used = [], set()
+    for _ in range(days):
+        previous = foods[picks[-1]] if picks else None
+        choice = None
+        for i, row in enumerate(foods):
+            key = tuple(row)
+            if key in used:
+                continue
+            if previous is None or ((row[0] < 0 or row[0] != previous[0]) and (row[1] < 0 or row[1] != previous[1])):
+                choice = i
+                break
+            if choice is None:
+                choice = i
+        if choice is None:
+            # Fewer distinct meals than days: start over
+            used.clear()
+            choice = 0
+        picks.append(choice)
+        used.add(tuple(foods[choice]))
+    return picks
+
+
+def _meal_json(table, foods, servings, target):
+    items = []
+    totals = np.zeros(3)
+    for food, amount in zip(foods, servings):
+        if food < 0 or amount == 0:
+            continue
+        macros = table.macros[food].astype(np.float64) * amount
+        totals += macros
+        items.append({
+            "food": table.names[food],
+            "servings": float(amount),
+            "grams": round(float(table.serving_g[food]) * float(amount)),
+            **{m: round(float(g), 1) for m, g in zip(MACROS, macros)},
+            "calories": round(float(macros @ KCAL_PER_GRAM)),
+        })
+    return {
+        "foods": items,
+        "totals": {**{m: round(float(g), 1) for m, g in zip(MACROS, totals)}, "calories": round(float(totals @ KCAL_PER_GRAM))},
+        "target": {**{m: round(float(g), 1) for m, g in zip(MACROS, target)}, "calories": round(float(target @ KCAL_PER_GRAM))},
+    }
+
+
+@lru_cache(maxsize=256)
+def solve_plan(calories, ratio, preferences, days):
+    """JSON-ready plan for a calorie band; ``preferences`` is (diet, gluten_free, dairy_free, exclude)."""
+    table = get_food_table()
+    diet, gluten_free, dairy_free, exclude = preferences
+    allowed = table.allowed(diet, gluten_free, dairy_free, exclude)
+    daily = macro_targets(calories, ratio)
+    codes = tuple(MEAL_CODES.values())
+
+    plan = [{"day": d + 1, "meals": {}} for d in range(days)]
+    for meal, split in MEAL_SPLIT.items():
+        candidates = allowed & ((table.meal_bits & (1 << codes.index(MEAL_CODES[meal]))) != 0)
+        target = daily * np.array(split)
+        try:
+            foods, servings, _ = rank_meal(table, candidates, target)
+        except ValueError as e:
+            raise ValueError(f"{e} at {meal}")
+        for day, row in zip(plan, pick_days(foods, servings, days)):
+            day["meals"][meal] = _meal_json(table, foods[row], servings[row], target)
+    targets = {**{m: int(g) for m, g in zip(MACROS, daily)}, "calories": calories}
+    for day in plan:
+        day["totals"] = {
+            key: round(sum(meal["totals"][key] for meal in day["meals"].values()), 1)
+            for key in (*MACROS, "calories")
+        }
+        day["short_of"] = [key for key, target in targets.items() if day["totals"][key] < SHORTFALL_RATIO * target]
+    return {
+        "band_calories": calories,
+        "targets": targets,
+        "shortfall": any(day["short_of"] for day in plan),
+        "days": plan,
+    }
+
+
+def meal_plan(tdee, goal="maintain", preset="balanced", ratio=None, days=1,
+              diet="any", gluten_free=False, dairy_free=False, exclude=()):
+    """Plan for ``days`` days; ``ratio`` (protein, carbs, fat %) overrides ``preset``."""
+    if goal not in GOAL_MODIFIERS:
+        raise ValueError(f"Unknown goal: {goal}")
+    if ratio is None:
+        if preset not in MACRO_PRESETS:
+            raise ValueError(f"Unknown macro preset: {preset}")
+        ratio = MACRO_PRESETS[preset]
+    ratio = tuple(int(pct) for pct in ratio)
+    if len(ratio) != 3 or min(ratio) < 0 or sum(ratio) != 100:
+        raise ValueError("Macro ratio must be three non-negative percentages adding up to 100")
+    if not 1 <= days <= MAX_DAYS:
+        raise ValueError(f"Days must be between 1 and {MAX_DAYS}")
+    calories = tdee + GOAL_MODIFIERS[goal]
+    if calories < MIN_CALORIES:
+        raise ValueError(f"Target of {calories:.0f} kcal is below the {MIN_CALORIES} kcal planning minimum")
+    if calories > MAX_CALORIES:
+        raise ValueError(f"Target of {calories:.0f} kcal is above the {MAX_CALORIES} kcal planning maximum")
+
+    band = int(round(calories / CALORIE_BAND)) * CALORIE_BAND
+    preferences = (diet, bool(gluten_free), bool(dairy_free), tuple(sorted({name.lower() for name in exclude})))
+    return {"target_calories": js_round(calories), "ratio": dict(zip(MACROS, ratio)),
+            **solve_plan(band, ratio, preferences, days)}
+
+
+def plan_cache_stats():
+    info = solve_plan.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+
+_food_table = None
+
+
+def get_food_table():
+    global _food_table
+    if _food_table is None:
+        _food_table = FoodTable()
+    return _food_table
@@ -0,0 +1,107 @@
+import numpy as np
+
+
+# Same multipliers as the basic activity levels in TDEECalculator.jsx
+ACTIVITY_MULTIPLIERS = {
+    "sedentary": 1.2,
+    "light": 1.375,
+    "moderate": 1.55,
+    "very": 1.725,
+    "extreme": 1.9,
+}
+# Accepted range for activity multipliers given as numbers
+MULTIPLIER_RANGE = (1.0, 2.5)
+
+
+def activity_multipliers(levels):
+    """Map activity level names (or numeric multipliers as strings, within MULTIPLIER_RANGE) to floats."""
+    levels = np.asarray(levels, dtype=object)
+    keys, inverse = np.unique(levels.astype(str), return_inverse=True)
+    lookup = np.empty(len(keys), dtype=np.float64)
+    for i, key in enumerate(keys):
+        if key in ACTIVITY_MULTIPLIERS:
+            lookup[i] = ACTIVITY_MULTIPLIERS[key]
+        else:
+            try:
+                value = float(key)
+            except ValueError:
+                raise ValueError(f"Unknown activity level: {key}")
+            # Also rejects nan and inf
+            if not MULTIPLIER_RANGE[0] <= value <= MULTIPLIER_RANGE[1]:
+                raise ValueError(
+                    f"Activity multiplier {key} is outside {MULTIPLIER_RANGE[0]}-{MULTIPLIER_RANGE[1]}"
+                )
+            lookup[i] = value
+    return lookup[inverse.reshape(-1)]
+
+
+def is_male(sex):
+    sex = np.char.lower(np.asarray(sex, dtype=str))
+    unknown = ~np.isin(sex, ("male", "female"))
+    if unknown.any():
+        raise ValueError(f"Unknown sex value: {sex[unknown][0]}")
+    return sex == "male"
+
+
+def bmi(weight_kg, height_cm):
+    height_m = np.asarray(height_cm, dtype=np.float64) / 100
+    return np.asarray(weight_kg, dtype=np.float64) / (height_m * height_m)
+
+
+def bmr_mifflin(weight_kg, height_cm, age, male):
+    base = 10 * weight_kg + 6.25 * height_cm - 5 * age
+    return base + np.where(male, 5.0, -161.0)
+
+
+def bmr_harris(weight_kg, height_cm, age, male):
+    men = 88.362 + 13.397 * weight_kg + 4.799 * height_cm - 5.677 * age
+    women = 447.593 + 9.247 * weight_kg + 3.098 * height_cm - 4.330 * age
+    return np.where(male, men, women)
+
+
+def bmr_katch(weight_kg, body_fat):
+    """Katch-McArdle; NaN wherever body fat is missing or non-positive."""
+    body_fat = np.asarray(body_fat, dtype=np.float64)
+    lean_mass = weight_kg * (1 - body_fat / 100)
+    return np.where(body_fat > 0, 370 + 21.6 * lean_mass, np.nan)
+
+
+def compute_metabolic(weight_kg, height_cm, age, sex, activity_level, body_fat=None):
+    """Compute BMI, the three BMR formulas and TDEE for columnar inputs.
+
+    All inputs are equal-length sequences. TDEE is based on Mifflin-St Jeor,
+    matching the TDEE calculator on the frontend.
+    """
+    weight_kg = np.asarray(weight_kg, dtype=np.float64)
+    height_cm = np.asarray(height_cm, dtype=np.float64)
+    age = np.asarray(age, dtype=np.float64)
+    n = weight_kg.shape[0]
+    for name, column in (("height_cm", height_cm), ("age", age), ("sex", sex), ("activity_level", activity_level)):
+        if len(column) != n:
+            raise ValueError(f"Column '{name}' has {len(column)} values, expected {n}")
+    if body_fat is None:
+        body_fat = np.full(n, np.nan)
+    elif len(body_fat) != n:
+        raise ValueError(f"Column 'body_fat' has {len(body_fat)} values, expected {n}")
+    else:
+        body_fat = np.array([np.nan if v is None else v for v in body_fat], dtype=np.float64)
+
+    male = is_male(sex)
+    multiplier = activity_multipliers(activity_level)
+    mifflin = bmr_mifflin(weight_kg, height_cm, age, male)
+    return {
+        "bmi": bmi(weight_kg, height_cm),
+        "bmr_mifflin": mifflin,
+        "bmr_harris": bmr_harris(weight_kg, height_cm, age, male),
+        "bmr_katch": bmr_katch(weight_kg, body_fat),
+        "tdee": mifflin * multiplier,
+    }
+
+
+def to_column(values, decimals=2):
+    """Round a float array and convert it to a JSON-friendly list (NaN -> None)."""
+    rounded = np.round(values, decimals)
+    column = rounded.tolist()
+    if np.isnan(rounded).any():
+        column = [None if v != v else v for v in column]
+    return column
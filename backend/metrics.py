@@ -0,0 +1,228 @@
+"""Request metrics, Mongo command timing and an opt-in slow-request profiler.
+
+Everything is in-process and exported in the Prometheus text format. Mongo
+time is attributed to the HTTP request through a context variable: motor
+runs pymongo calls on its executor with a copy of the caller's context, so
+the command listener sees the accumulator of the request that issued them.
+"""
+import contextvars
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from pathlib import Path
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_request_mongo = contextvars.ContextVar("request_mongo", default=None)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items()]
+        for labels, (counts, total, count) in sorted(items):
+            base = _labels(self.label_names, labels)
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{{{_labels(self.label_names, labels)}}} {value}")
+        return lines
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values))
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", LATENCY_BUCKETS, ("method", "route", "status"))
+request_mongo_time = Histogram(
+    "http_request_mongo_seconds", "Time spent in MongoDB commands per HTTP request", LATENCY_BUCKETS, ("route",))
+request_size = Histogram(
+    "http_request_size_bytes", "HTTP request body size", SIZE_BUCKETS, ("route",))
+response_size = Histogram(
+    "http_response_size_bytes", "HTTP response body size", SIZE_BUCKETS, ("route",))
+mongo_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", LATENCY_BUCKETS, ("command",))
+mongo_failures = Counter(
+    "mongo_command_failures_total", "Failed MongoDB commands", ("command",))
+
+REGISTRY = [request_duration, request_mongo_time, request_size, response_size, mongo_duration, mongo_failures]
+
+
+def render_prometheus():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Pass to AsyncIOMotorClient(event_listeners=[...])."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        mongo_failures.inc(1, event.command_name)
+        self._record(event)
+
+    @staticmethod
+    def _record(event):
+        seconds = event.duration_micros / 1e6
+        mongo_duration.observe(seconds, event.command_name)
+        accumulator = _request_mongo.get()
+        if accumulator is not None:
+            accumulator[0] += seconds
+
+
+class StackSampler:
+    """Samples the event-loop thread's stack into a ring buffer.
+
+    When a request runs longer than the threshold, the samples taken during
+    it are written as folded stacks (flamegraph.pl / speedscope input).
+    Samples cover everything the loop ran meanwhile, not just that request.
+    """
+
+    def __init__(self, threshold_ms, interval_ms=5, output_dir="profiles", max_samples=20000):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.output_dir = Path(output_dir)
+        self._samples = deque(maxlen=max_samples)
+        self._thread_id = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        threading.Thread(target=self._run, name="stack-sampler", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self._samples.append((time.perf_counter(), ";".join(reversed(stack))))
+
+    def maybe_dump(self, route, started, finished):
+        if finished - started < self.threshold:
+            return None
+        folded = {}
+        for at, stack in list(self._samples):
+            if started <= at <= finished:
+                folded[stack] = folded.get(stack, 0) + 1
+        if not folded:
+            return None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        safe_route = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        path = self.output_dir / f"{int(time.time() * 1000)}-{safe_route}.folded"
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in folded.items()))
+        return path
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware so streaming responses are measured without buffering."""
+
+    def __init__(self, app, sampler=None):
+        self.app = app
+        self.sampler = sampler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sizes = [0, 0]
+        status = [500]
+        mongo = [0.0]
+        token = _request_mongo.set(mongo)
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                sizes[0] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                sizes[1] += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            finished = time.perf_counter()
+            _request_mongo.reset(token)
+            route = scope.get("route")
+            # Label by route template, not raw path, to keep cardinality bounded
+            route_path = getattr(route, "path", None) or "unmatched"
+            request_duration.observe(finished - started, scope["method"], route_path, status[0])
+            request_mongo_time.observe(mongo[0], route_path)
+            request_size.observe(sizes[0], route_path)
+            response_size.observe(sizes[1], route_path)
+            if self.sampler is not None:
+                self.sampler.maybe_dump(route_path, started, finished)
@@ -0,0 +1,95 @@
+import json
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """StreamingResponse that reads the request body while it writes the reply.
+
+    The stock response listens for ``http.disconnect`` on ``receive`` while
+    streaming, which would swallow the body chunks we are still consuming.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_lines(chunks, max_line_bytes=MAX_LINE_BYTES):
+    """Split an async stream of byte chunks into lines without buffering the body.
+
+    A line longer than ``max_line_bytes`` is skipped up to its newline and
+    yielded as a ValueError in its place, so the stream carries on.
+    """
+    too_long = f"NDJSON line exceeds {max_line_bytes} bytes"
+    pending = b""
+    oversized = False
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if oversized or len(line) > max_line_bytes:
+                # The end of a line already being discarded, or one that arrived whole
+                oversized = False
+                yield ValueError(too_long)
+            else:
+                yield line
+        if len(pending) > max_line_bytes:
+            oversized = True
+            pending = b""
+    if oversized:
+        yield ValueError(too_long)
+    elif pending:
+        yield pending
+
+
+async def iter_batches(chunks, batch_size):
+    """Group non-blank NDJSON lines into (line_number, record_or_error) batches."""
+    batch = []
+    line_no = 0
+    async for raw in iter_lines(chunks):
+        line_no += 1
+        if isinstance(raw, ValueError):
+            batch.append((line_no, raw))
+            continue
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            record = ValueError(f"invalid JSON: {e}")
+        batch.append((line_no, record))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def stream_ndjson(chunks, handler, batch_size=1000):
+    """Run ``handler`` over bounded micro-batches and yield NDJSON result lines.
+
+    ``handler`` takes a list of record dicts and returns one result dict per
+    record; it runs in the threadpool so the event loop keeps reading input.
+    Memory use is bounded by ``batch_size`` regardless of body size.
+    """
+    async for batch in iter_batches(chunks, batch_size):
+        good = [(line_no, record) for line_no, record in batch if isinstance(record, dict)]
+        results = await run_in_threadpool(handler, [record for _, record in good]) if good else []
+        by_line = {line_no: result for (line_no, _), result in zip(good, results)}
+        out = []
+        for line_no, record in batch:
+            result = by_line.get(line_no)
+            if result is None:
+                result = {"error": str(record)}
+            out.append(json.dumps({"line": line_no, **result}))
+        yield ("\n".join(out) + "\n").encode()
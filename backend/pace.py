@@ -0,0 +1,134 @@
+"""Daniels/Gilbert VDOT race predictions and training paces for whole rosters.
+
+Uses the same oxygen-cost and %VO2max curves as PaceCalculator.jsx, but
+equivalent race times are solved exactly, for every athlete and distance at
+once. The frontend instead scales VDOT by a fixed factor per race. Times are
+found with a vectorized Newton iteration seeded by Riegel's formula.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+MAX_NEWTON_STEPS = 20
+
+# Same races as PaceCalculator.jsx, plus the common track distances
+STANDARD_RACES = {
+    "1500m": 1500.0,
+    "mile": 1609.344,
+    "3k": 3000.0,
+    "5k": 5000.0,
+    "10k": 10000.0,
+    "15k": 15000.0,
+    "half_marathon": 21097.5,
+    "marathon": 42195.0,
+}
+
+# Training intensities as a fraction of VDOT (Daniels' Running Formula)
+TRAINING_INTENSITIES = {
+    "easy": 0.70,
+    "threshold": 0.88,
+    "interval": 0.98,
+    "repetition": 1.05,
+}
+
+VDOT_TABLE_RANGE = (30, 85)
+
+
+def oxygen_cost(velocity):
+    """ml/kg/min at ``velocity`` metres per minute."""
+    return -4.60 + 0.182258 * velocity + 0.000104 * velocity * velocity
+
+
+def percent_vo2max(minutes):
+    """Fraction of VO2max sustainable for a race lasting ``minutes``."""
+    return 0.8 + 0.1894393 * np.exp(-0.012778 * minutes) + 0.2989558 * np.exp(-0.1932605 * minutes)
+
+
+def vdot(distance_m, time_s):
+    minutes = np.asarray(time_s, dtype=np.float64) / 60
+    velocity = np.asarray(distance_m, dtype=np.float64) / minutes
+    return oxygen_cost(velocity) / percent_vo2max(minutes)
+
+
+def velocity_at(vo2):
+    """Velocity (m/min) whose oxygen cost is ``vo2``; the positive root of the cost quadratic."""
+    a, b, c = 0.000104, 0.182258, -4.60 - np.asarray(vo2, dtype=np.float64)
+    return (-b + np.sqrt(b * b - 4 * a * c)) / (2 * a)
+
+
+def solve_race_times(vdots, distances_m, guess_s=None):
+    """Race time in seconds for each VDOT (rows) and distance (columns).
+
+    Solves oxygen_cost(d / t) = VDOT * percent_vo2max(t) for t with Newton
+    steps on the whole (athletes x distances) grid.
+    """
+    vdots = np.asarray(vdots, dtype=np.float64)[:, None]
+    distances = np.asarray(distances_m, dtype=np.float64)[None, :]
+    if guess_s is None:
+        # Cost of running the distance at vVO2max, slowed by a typical %VO2max
+        guess_s = distances / velocity_at(vdots) * 60 / 0.9
+    t = np.broadcast_to(np.asarray(guess_s, dtype=np.float64) / 60, np.broadcast(vdots, distances).shape).copy()
+    if t.size == 0:
+        return t
+    for _ in range(MAX_NEWTON_STEPS):
+        v = distances / t
+        e1 = np.exp(-0.012778 * t)
+        e2 = np.exp(-0.1932605 * t)
+        g = oxygen_cost(v) - vdots * (0.8 + 0.1894393 * e1 + 0.2989558 * e2)
+        dg = -(0.182258 + 0.000208 * v) * v / t + vdots * (0.1894393 * 0.012778 * e1 + 0.2989558 * 0.1932605 * e2)
+        step = g / dg
+        # Never step to a non-positive time
+        t = np.maximum(t - step, t / 2)
+        if np.max(np.abs(step)) < 1e-7:
+            break
+    return t * 60
+
+
+def training_paces(vdots):
+    """Seconds per km for each training intensity, plus marathon pace."""
+    vdots = np.asarray(vdots, dtype=np.float64)
+    paces = {name: 60000 / velocity_at(vdots * fraction) for name, fraction in TRAINING_INTENSITIES.items()}
+    marathon = STANDARD_RACES["marathon"]
+    paces["marathon"] = solve_race_times(vdots, [marathon])[:, 0] / (marathon / 1000)
+    return paces
+
+
+def compute_predictions(distance_m, time_s, targets_m=None):
+    """VDOT, equivalent race times and training paces for columnar race results."""
+    distance_m = np.asarray(distance_m, dtype=np.float64)
+    time_s = np.asarray(time_s, dtype=np.float64)
+    if distance_m.shape != time_s.shape:
+        raise ValueError(f"Column 'time_s' has {time_s.size} values, expected {distance_m.size}")
+    if (distance_m <= 0).any() or (time_s <= 0).any():
+        raise ValueError("Distances and times must be positive")
+    if targets_m is None:
+        targets = STANDARD_RACES
+    else:
+        if not targets_m or min(targets_m) <= 0:
+            raise ValueError("Target distances must be positive")
+        targets = {f"{d:g}m": float(d) for d in targets_m}
+
+    scores = vdot(distance_m, time_s)
+    if (scores <= 0).any():
+        raise ValueError("Performance is too slow to score (VDOT must be positive)")
+    target_distances = np.fromiter(targets.values(), dtype=np.float64)
+    # Riegel's t2 = t1 * (d2 / d1) ** 1.06 is within a few percent; Newton finishes it
+    guess = time_s[:, None] * (target_distances[None, :] / distance_m[:, None]) ** 1.06
+    times = solve_race_times(scores, target_distances, guess)
+    return {
+        "vdot": scores,
+        "race_times": {name: times[:, i] for i, name in enumerate(targets)},
+        "training_paces": training_paces(scores),
+    }
+
+
+@lru_cache(maxsize=1)
+def vdot_table():
+    """Race times for each whole VDOT in VDOT_TABLE_RANGE, like the published Daniels tables."""
+    low, high = VDOT_TABLE_RANGE
+    scores = np.arange(low, high + 1, dtype=np.float64)
+    times = solve_race_times(scores, list(STANDARD_RACES.values()))
+    return {
+        "vdot": np.round(scores, 1).tolist(),
+        "race_times": {name: np.round(times[:, i], 1).tolist() for i, name in enumerate(STANDARD_RACES)},
+    }
@@ -0,0 +1,105 @@
+"""Per-client token buckets and concurrency-based admission control.
+
+Both are applied as FastAPI dependencies, so the route template is known:
+buckets are keyed by client address and route, and the admission gate only
+wraps MongoDB-backed routes. A rate-limited request gets 429, a request shed
+because too many are already waiting on MongoDB gets 503, both with
+Retry-After.
+
+The default store keeps buckets in-process, so limits apply per worker. A
+shared store (e.g. Redis running the same refill arithmetic in a script) only
+needs ``async take(key, rate, burst)`` returning 0 when a token was taken,
+or the seconds until one is available.
+"""
+import math
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+
+import metrics
+
+decisions = metrics.Counter(
+    "http_admission_decisions_total", "Rate limiter and admission gate decisions", ("route", "decision"))
+metrics.REGISTRY.append(decisions)
+
+
+class MemoryStore:
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+
+    async def take(self, key, rate, burst):
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = burst
+        else:
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            self._buckets.move_to_end(key)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            wait = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            wait = (1 - tokens) / rate
+        # Idle clients are forgotten first; a forgotten bucket restarts full
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def _route_label(request):
+    route = request.scope.get("route")
+    return f"{request.method} {getattr(route, 'path', request.url.path)}"
+
+
+class RateLimiter:
+    """Token bucket per (client, route); ``policies`` maps "METHOD /path" to (rate per second, burst)."""
+
+    def __init__(self, default, policies=None, store=None, enabled=True):
+        self.default = default
+        self.policies = policies or {}
+        self.store = store or MemoryStore()
+        self.enabled = enabled
+
+    async def __call__(self, request: Request):
+        if not self.enabled:
+            return
+        route = _route_label(request)
+        rate, burst = self.policies.get(route, self.default)
+        client = request.client.host if request.client else "unknown"
+        wait = await self.store.take(f"{client}|{route}", rate, burst)
+        if wait > 0:
+            decisions.inc(1, route, "rate_limited")
+            raise HTTPException(
+                status_code=429, detail="Rate limit exceeded",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+        decisions.inc(1, route, "allowed")
+
+
+class AdmissionGate:
+    """Caps concurrent requests on a shared resource and sheds the excess at once.
+
+    Requests past ``limit`` would only queue inside the MongoDB pool and hold
+    their sockets; answering 503 lets the client back off instead.
+    """
+
+    def __init__(self, limit, retry_after=1):
+        self.limit = limit
+        self.retry_after = retry_after
+        self.in_flight = 0
+
+    async def __call__(self, request: Request):
+        if self.in_flight >= self.limit:
+            decisions.inc(1, _route_label(request), "shed")
+            raise HTTPException(
+                status_code=503, detail="Server busy, retry later",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
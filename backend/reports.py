@@ -0,0 +1,429 @@
+"""Server-side PDF reports mirroring the jsPDF exports of the calculators.
+
+Templates are compiled once: static text (headings, disclaimers, footer),
+font metrics and the fixed PDF objects are turned into bytes up front, so
+rendering a report only formats the per-user values and writes the xref.
+Coordinates follow jsPDF: millimetres from the top-left corner, text
+positioned on its baseline.
+"""
+import asyncio
+import io
+import os
+import re
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+PAGE_WIDTH = 210.0
+PAGE_HEIGHT = 297.0
+BOTTOM_MARGIN = 25.0
+PT_PER_MM = 72 / 25.4
+LINE_HEIGHT_FACTOR = 1.15
+
+DARK = (51, 51, 51)
+BODY = (80, 80, 80)
+MUTED = (100, 100, 100)
+GREEN = (34, 197, 94)
+BLUE = (59, 130, 246)
+AMBER = (245, 158, 11)
+RED = (239, 68, 68)
+ORANGE = (251, 146, 60)
+
+# Helvetica advance widths (1/1000 em) for WinAnsi 32..126, from the Adobe AFM
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_CHAR_WIDTHS = {chr(32 + i): w for i, w in enumerate(_HELVETICA_WIDTHS)}
+_CHAR_WIDTHS.update({"•": 350, "²": 333, "³": 333, "°": 400})
+
+# Filenames and zip entries keep only these characters; anything else becomes "-"
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9._-]+")
+MAX_FILENAME_LENGTH = 100
+
+_FONT_OBJECT = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+
+
+def text_width(text, size):
+    """Width of ``text`` in mm at ``size`` points."""
+    units = sum(_CHAR_WIDTHS.get(ch, 556) for ch in text)
+    return units * size / 1000 / PT_PER_MM
+
+
+def wrap_text(text, size, max_width):
+    """Greedy word wrap, equivalent to jsPDF's splitTextToSize for plain text."""
+    lines = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if current and text_width(candidate, size) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines or [""]
+
+
+def safe_filename(text, default="report"):
+    """``text`` reduced to a plain basename of [A-Za-z0-9._-]."""
+    # The last path component only, whichever separator the client used
+    base = re.split(r"[/\\]", str(text))[-1]
+    name = _UNSAFE_FILENAME.sub("-", base).strip("-.")[:MAX_FILENAME_LENGTH]
+    return name or default
+
+
+def _escape(text):
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _num(value):
+    return f"{value:.2f}".rstrip("0").rstrip(".").encode()
+
+
+def text_op(x, y, text, size, color, align="left"):
+    if align == "center":
+        x -= text_width(text, size) / 2
+    r, g, b = (_num(c / 255) for c in color)
+    return b"BT /F1 %s Tf %s %s %s rg %s %s Td (%s) Tj ET\n" % (
+        _num(size), r, g, b, _num(x * PT_PER_MM), _num((PAGE_HEIGHT - y) * PT_PER_MM), _escape(text),
+    )
+
+
+def line_op(x1, y1, x2, y2, color):
+    r, g, b = (_num(c / 255) for c in color)
+    return b"%s %s %s RG %s %s m %s %s l S\n" % (
+        r, g, b,
+        _num(x1 * PT_PER_MM), _num((PAGE_HEIGHT - y1) * PT_PER_MM),
+        _num(x2 * PT_PER_MM), _num((PAGE_HEIGHT - y2) * PT_PER_MM),
+    )
+
+
+def _shifted(block, dy):
+    """Place a block compiled at y=0 at ``dy`` mm down the page."""
+    if not dy:
+        return block
+    return b"q 1 0 0 1 0 %s cm\n%sQ\n" % (_num(-dy * PT_PER_MM), block)
+
+
+class _Values(dict):
+    def __missing__(self, key):
+        return "N/A"
+
+
+class _Page:
+    def __init__(self):
+        self.parts = []
+
+
+class Heading:
+    def __init__(self, text, advance=10):
+        self.advance = advance
+        self.block = text_op(20, 0, text, 16, DARK)
+
+    def render(self, pages, y, data):
+        pages[-1].parts.append(_shifted(self.block, y))
+        return y + self.advance
+
+
+class StaticParagraph:
+    def __init__(self, text, size=10, color=(120, 120, 120), x=20):
+        lines = wrap_text(text, size, PAGE_WIDTH - 40)
+        step = size * LINE_HEIGHT_FACTOR / PT_PER_MM
+        self.block = b"".join(text_op(x, i * step, line, size, color) for i, line in enumerate(lines))
+        self.advance = len(lines) * step
+
+    def render(self, pages, y, data):
+        pages[-1].parts.append(_shifted(self.block, y))
+        return y + self.advance
+
+
+class Fields:
+    """Fixed lines of ``str.format`` templates filled from the report data."""
+
+    def __init__(self, templates, advance, spacing=8, size=12, color=BODY, x=25):
+        self.templates = templates
+        self.advance = advance
+        self.spacing = spacing
+        self.size = size
+        self.color = color
+        self.x = x
+
+    def render(self, pages, y, data):
+        for i, template in enumerate(self.templates):
+            text = template.format_map(data)
+            pages[-1].parts.append(text_op(self.x, y + i * self.spacing, text, self.size, self.color))
+        return y + self.advance
+
+
+class Centered:
+    def __init__(self, template, size, advance, color=DARK, color_for=None):
+        self.template = template
+        self.size = size
+        self.advance = advance
+        self.color = color
+        self.color_for = color_for
+
+    def render(self, pages, y, data):
+        color = self.color_for(data) if self.color_for else self.color
+        text = self.template.format_map(data)
+        pages[-1].parts.append(text_op(PAGE_WIDTH / 2, y, text, self.size, color, align="center"))
+        return y + self.advance
+
+
+class Paragraph:
+    def __init__(self, key, advance_after=15, size=12, color=BODY, x=25):
+        self.key = key
+        self.advance_after = advance_after
+        self.size = size
+        self.color = color
+        self.x = x
+
+    def render(self, pages, y, data):
+        step = self.size * LINE_HEIGHT_FACTOR / PT_PER_MM
+        lines = wrap_text(str(data[self.key]), self.size, PAGE_WIDTH - 40)
+        top, row = y, 0
+        for line in lines:
+            # Long text continues at the top of a new page
+            if top + row * step > PAGE_HEIGHT - BOTTOM_MARGIN:
+                pages.append(_Page())
+                top, row = BOTTOM_MARGIN, 0
+            pages[-1].parts.append(text_op(self.x, top + row * step, line, self.size, self.color))
+            row += 1
+        return top + row * step + self.advance_after
+
+
+class Bullets:
+    def __init__(self, key, advance_after=10, size=12, color=BODY, x=25):
+        self.key = key
+        self.advance_after = advance_after
+        self.size = size
+        self.color = color
+        self.x = x
+
+    def render(self, pages, y, data):
+        step = self.size * LINE_HEIGHT_FACTOR / PT_PER_MM
+        items = data.get(self.key)
+        for item in items if isinstance(items, (list, tuple)) else []:
+            lines = wrap_text(f"• {item}", self.size, PAGE_WIDTH - 40)
+            if y + len(lines) * step > PAGE_HEIGHT - BOTTOM_MARGIN:
+                pages.append(_Page())
+                y = BOTTOM_MARGIN
+            for i, line in enumerate(lines):
+                pages[-1].parts.append(text_op(self.x, y + i * step, line, self.size, self.color))
+            y += len(lines) * step + 3
+        return y + self.advance_after
+
+
+class ReportTemplate:
+    def __init__(self, title, subtitle, footer, steps, filename):
+        header_y = 25
+        self.header = b"".join([
+            text_op(PAGE_WIDTH / 2, header_y, title, 20, DARK, align="center"),
+            text_op(PAGE_WIDTH / 2, header_y + 8, subtitle, 12, MUTED, align="center"),
+            line_op(20, header_y + 25, PAGE_WIDTH - 20, header_y + 25, (200, 200, 200)),
+        ])
+        self.date_y = header_y + 15
+        self.body_start = header_y + 40
+        self.footer = text_op(PAGE_WIDTH / 2, PAGE_HEIGHT - 15, footer, 10, (150, 150, 150), align="center")
+        self.steps = steps
+        self.filename = filename
+
+    def render(self, data):
+        """Render one report; ``data`` holds the per-user values."""
+        values = _Values(data)
+        first = _Page()
+        first.parts.append(self.header)
+        first.parts.append(text_op(PAGE_WIDTH / 2, self.date_y, f"Date: {values['calculated_on']}", 12, MUTED, align="center"))
+        pages = [first]
+        y = self.body_start
+        for step in self.steps:
+            if y > PAGE_HEIGHT - BOTTOM_MARGIN:
+                pages.append(_Page())
+                y = BOTTOM_MARGIN
+            y = step.render(pages, y, values)
+        for page in pages:
+            page.parts.append(self.footer)
+        return _write_pdf([b"".join(page.parts) for page in pages])
+
+    def filename_for(self, data):
+        date = safe_filename(str(data.get("calculated_on") or "report").replace("/", "-").replace("\\", "-"))
+        return f"{self.filename}-{date}.pdf"
+
+    def content_disposition(self, data):
+        """Attachment header with an ASCII filename and the UTF-8 original (RFC 5987)."""
+        date = str(data.get("calculated_on") or "report").replace("/", "-")
+        original = "".join(ch for ch in f"{self.filename}-{date}.pdf" if ch.isprintable())
+        return f"attachment; filename=\"{self.filename_for(data)}\"; filename*=UTF-8''{quote(original, safe='')}"
+
+
+def _write_pdf(contents):
+    """Assemble a PDF; objects 1-3 (catalog, pages, font) are fixed."""
+    n = len(contents)
+    page_ids = [4 + 2 * i for i in range(n)]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % p for p in page_ids), n),
+        _FONT_OBJECT,
+    ]
+    media_box = b"[0 0 %s %s]" % (_num(PAGE_WIDTH * PT_PER_MM), _num(PAGE_HEIGHT * PT_PER_MM))
+    for page_id, content in zip(page_ids, contents):
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox %s /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (media_box, page_id + 1)
+        )
+        stream = zlib.compress(content)
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (i, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _bmi_color(data):
+    return {"Normal Weight": GREEN, "Underweight": BLUE, "Overweight": AMBER}.get(data["category"], RED)
+
+
+def _bsa_color(data):
+    category = str(data["category"])
+    if "Average" in category:
+        return GREEN
+    if "Small" in category or "Child" in category:
+        return BLUE
+    if "Large" in category:
+        return AMBER
+    return ORANGE
+
+
+TEMPLATES = {
+    "bmi": ReportTemplate(
+        title="BMI Health Report",
+        subtitle="Generated by Advanced BMI Calculator",
+        footer="Advanced BMI Calculator - Your Health Partner",
+        filename="BMI-Report",
+        steps=[
+            Heading("Personal Information"),
+            Fields(["Age: {age}", "Gender: {gender}", "Weight: {weight} kg", "Height: {height} cm"], advance=40),
+            Heading("BMI Results", advance=15),
+            Centered("{bmi}", 36, advance=12, color_for=_bmi_color),
+            Centered("{category}", 18, advance=18, color_for=_bmi_color),
+            Heading("Health Risk Assessment"),
+            Paragraph("health_risk"),
+            Heading("Ideal Weight Range"),
+            Fields(["{ideal_weight_min} - {ideal_weight_max} {ideal_weight_unit}"], advance=20, size=14, color=GREEN),
+            Heading("Health Recommendations"),
+            Bullets("recommendations", advance_after=15),
+            StaticParagraph(
+                "Disclaimer: This BMI calculation is for informational purposes only and should not replace "
+                "professional medical advice. Please consult with a healthcare provider for personalized health guidance."
+            ),
+        ],
+    ),
+    "bsa": ReportTemplate(
+        title="Body Surface Area Report",
+        subtitle="Medical BSA Calculation",
+        footer="Body Surface Area Calculator - Medical Formula Assessment",
+        filename="BSA-Report",
+        steps=[
+            Heading("Personal Information"),
+            Fields(["Weight: {weight} kg", "Height: {height} cm", "Age: {age}", "Gender: {gender}"], advance=40),
+            Heading("Body Surface Area Results", advance=15),
+            Centered("{bsa} m²", 48, advance=15, color_for=_bsa_color),
+            Centered("{category}", 18, advance=20),
+            Heading("Calculation Method"),
+            Fields(["Formula: {method}", "Accuracy: {accuracy}"], advance=25),
+            Heading("Additional Metrics"),
+            Fields([
+                "BMI: {bmi}",
+                "Weight/BSA Ratio: {weight_bsa_ratio} kg/m²",
+                "Height/BSA Ratio: {height_bsa_ratio} m/m²",
+            ], advance=30),
+            Heading("Clinical Applications"),
+            Bullets("applications"),
+            Heading("Health Insights"),
+            Bullets("health_insights"),
+            Heading("Recommendations"),
+            Bullets("recommendations", advance_after=15),
+            StaticParagraph(
+                "Disclaimer: Body Surface Area calculations are for medical and scientific reference purposes. "
+                "Always consult qualified healthcare professionals for medical applications, drug dosing, "
+                "and clinical interpretations."
+            ),
+        ],
+    ),
+}
+
+
+def render_report(kind, data):
+    return TEMPLATES[kind].render(data)
+
+
+def render_many(kind, items):
+    """Render a chunk of reports; runs inside process-pool workers."""
+    template = TEMPLATES[kind]
+    return [template.render(data) for data in items]
+
+
+def build_archive(kind, items, pdfs):
+    """Zip rendered reports under safe, unique basenames."""
+    template = TEMPLATES[kind]
+    out = io.BytesIO()
+    seen = {}
+    used = set()
+    # PDF streams are already deflated, so store them as-is
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as archive:
+        for data, pdf in zip(items, pdfs):
+            name = safe_filename(data.get("name") or "", default=template.filename_for(data)[:-4])
+            count = seen.get(name, 0)
+            entry = f"{name}-{count + 1}.pdf" if count else f"{name}.pdf"
+            # A sanitized name can collide with another's numbered entry
+            while entry in used:
+                count += 1
+                entry = f"{name}-{count + 1}.pdf"
+            seen[name] = count + 1
+            used.add(entry)
+            archive.writestr(entry, pdf)
+    return out.getvalue()
+
+
+_pool = None
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=int(os.environ.get("REPORT_WORKERS", os.cpu_count() or 1)))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+async def render_batch(kind, items, chunk_size=50):
+    """Render many reports across the process pool and return a zip archive."""
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    rendered = await asyncio.gather(*(loop.run_in_executor(pool, render_many, kind, chunk) for chunk in chunks))
+    pdfs = [pdf for chunk in rendered for pdf in chunk]
+    return await loop.run_in_executor(None, build_archive, kind, items, pdfs)
@@ -0,0 +1,152 @@
+"""Response cache for read endpoints with strong ETags and per-route Cache-Control.
+
+Entries are keyed by a route tag, the tag's generation and the request URL.
+``invalidate(tag)`` bumps the generation, so every cached page of that route
+misses at once without scanning keys. ETags hash the response body, so a
+poller whose copy is still current gets a bodiless 304 even on a cache miss.
+
+Entries live in-process, one cache per worker. Generations can be shared
+instead (``MongoGenerations``), so an invalidation on one worker makes every
+worker miss; each worker rereads a generation at most ``max_age`` seconds
+old, which bounds how long another worker serves a stale page. A shared
+entry backend (Redis, memcached) only needs async ``get``, ``set`` and
+``incr``.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+from pymongo import ReturnDocument
+from starlette.responses import Response
+
+
+class MemoryBackend:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    async def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key, value, ttl=None):
+        self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def incr(self, key):
+        value = (await self.get(key) or 0) + 1
+        await self.set(key, value)
+        return value
+
+
+class MongoGenerations:
+    """Route generations in a MongoDB collection shared by all workers, one document per tag."""
+
+    def __init__(self, collection, max_age=1.0):
+        self.collection = collection
+        self.max_age = max_age
+        self._seen = {}
+
+    async def get(self, tag):
+        now = time.monotonic()
+        seen = self._seen.get(tag)
+        if seen is not None and now - seen[0] < self.max_age:
+            return seen[1]
+        doc = await self.collection.find_one({"_id": tag})
+        generation = doc["generation"] if doc else 0
+        self._seen[tag] = (now, generation)
+        return generation
+
+    async def incr(self, tag):
+        doc = await self.collection.find_one_and_update(
+            {"_id": tag}, {"$inc": {"generation": 1}}, upsert=True, return_document=ReturnDocument.AFTER,
+        )
+        # This worker sees its own invalidation at once
+        self._seen[tag] = (time.monotonic(), doc["generation"])
+        return doc["generation"]
+
+
+def render_json(content):
+    # Same bytes as starlette's JSONResponse
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def strong_etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+
+class ResponseCache:
+    def __init__(self, backend=None, policies=None, ttl=60.0, generations=None):
+        self.backend = backend or MemoryBackend()
+        # Shared generations (see MongoGenerations); None keeps them in the entry backend
+        self.generations = generations
+        self.policies = policies or {}
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    async def invalidate(self, tag):
+        self.invalidations += 1
+        if self.generations is not None:
+            await self.generations.incr(tag)
+        else:
+            await self.backend.incr(f"generation:{tag}")
+
+    async def generation(self, tag):
+        if self.generations is not None:
+            return await self.generations.get(tag)
+        return await self.backend.get(f"generation:{tag}") or 0
+
+    async def respond(self, request, tag, build):
+        """Serve ``build()`` (an async callable returning body bytes and extra headers) from the cache."""
+        generation = await self.generation(tag)
+        key = f"{tag}:{generation}:{request.url.path}?{request.url.query}"
+        entry = await self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            body, headers = await build()
+            entry = (body, strong_etag(body), headers)
+            await self.backend.set(key, entry, self.ttl)
+        else:
+            self.hits += 1
+
+        body, etag, extra_headers = entry
+        # The body may go out compressed, so shared caches key 200s and 304s on the encoding
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", **extra_headers}
+        if tag in self.policies:
+            headers["Cache-Control"] = self.policies[tag]
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,174 @@
+"""Per-client minute/hour rollups of status checks.
+
+A background task periodically aggregates raw ``status_checks`` newer than
+a stored watermark into ``status_check_rollups``, so dashboard queries read a
+few pre-aggregated buckets instead of scanning raw heartbeats. Raw documents
+can then expire through a TTL index, and buckets through their own
+``expires_at`` TTL.
+
+Every worker runs this loop, so a run must be safe to repeat or race. It
+recounts whole buckets from raw documents, starting at the hour that holds
+the watermark, and writes them with $set rather than $inc. Each bucket
+carries the ``as_of`` time it was counted up to, and a write only replaces a
+bucket counted up to an earlier time, so a slower worker cannot overwrite a
+fresher count. The watermark only moves forward by compare-and-set.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("minute", "hour")
+STATE_ID = "status_checks"
+DUPLICATE_KEY = 11000
+
+
+def truncate(moment, granularity):
+    if granularity == "minute":
+        return moment.replace(second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class StatusRollup:
+    def __init__(self, db, interval=60.0, lag=5.0, retention=None):
+        self.raw = db.status_checks
+        self.rollups = db.status_check_rollups
+        self.state = db.rollup_state
+        self.interval = interval
+        # How long buckets of each granularity are kept; missing or None keeps them
+        self.retention = retention or {}
+        # Leave recent documents for the next run; buffered writes may still land
+        self.lag = timedelta(seconds=lag)
+        self._task = None
+
+    async def create_indexes(self, raw_ttl_seconds=None):
+        await self.rollups.create_index(
+            [("granularity", ASCENDING), ("client_name", ASCENDING), ("bucket", ASCENDING)], unique=True
+        )
+        await self.rollups.create_index([("granularity", ASCENDING), ("bucket", ASCENDING)])
+        await self.rollups.create_index("expires_at", name="expires_at_ttl", expireAfterSeconds=0)
+        if raw_ttl_seconds:
+            await self._ensure_ttl(raw_ttl_seconds)
+
+    async def _ensure_ttl(self, seconds):
+        try:
+            await self.raw.create_index("timestamp", name="timestamp_ttl", expireAfterSeconds=seconds)
+        except OperationFailure:
+            # The TTL changed since the index was created; update it in place
+            await self.raw.database.command(
+                "collMod", self.raw.name, index={"name": "timestamp_ttl", "expireAfterSeconds": seconds}
+            )
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except PyMongoError:
+                logger.exception("Status rollup failed")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self, now=None):
+        """Roll up raw checks between the watermark and now - lag; returns new docs counted."""
+        state = await self.state.find_one({"_id": STATE_ID})
+        since = state["watermark"] if state else datetime.min
+        until = (now or datetime.utcnow()) - self.lag
+        if until <= since:
+            return 0
+
+        # Recount from the start of the watermark's hour so every bucket written is complete up to `until`
+        start = truncate(since, "hour") if state else since
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": start, "$lt": until}}},
+            {"$group": {
+                "_id": {
+                    "client_name": "$client_name",
+                    "year": {"$year": "$timestamp"},
+                    "month": {"$month": "$timestamp"},
+                    "day": {"$dayOfMonth": "$timestamp"},
+                    "hour": {"$hour": "$timestamp"},
+                    "minute": {"$minute": "$timestamp"},
+                },
+                "count": {"$sum": 1},
+            }},
+        ]
+        counts = {}
+        async for row in self.raw.aggregate(pipeline):
+            key = row["_id"]
+            minute = datetime(key["year"], key["month"], key["day"], key["hour"], key["minute"])
+            for granularity in GRANULARITIES:
+                bucket_key = (granularity, key["client_name"], truncate(minute, granularity))
+                counts[bucket_key] = counts.get(bucket_key, 0) + row["count"]
+
+        if counts:
+            await self._write_buckets(counts, until)
+        if not await self._advance_watermark(state, since, until):
+            # Another worker moved the watermark first; its buckets are at least as fresh
+            return 0
+        return await self.raw.count_documents({"timestamp": {"$gte": since, "$lt": until}})
+
+    async def _write_buckets(self, counts, until):
+        operations = []
+        for (granularity, client_name, bucket), count in counts.items():
+            fields = {"count": count, "as_of": until}
+            retention = self.retention.get(granularity)
+            if retention:
+                fields["expires_at"] = bucket + retention
+            operations.append(UpdateOne(
+                {
+                    "granularity": granularity, "client_name": client_name, "bucket": bucket,
+                    "as_of": {"$not": {"$gte": until}},
+                },
+                {"$set": fields},
+                upsert=True,
+            ))
+        try:
+            await self.rollups.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # The upsert collides with the unique index when the bucket already holds a fresher count
+            if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+                raise
+
+    async def _advance_watermark(self, state, since, until):
+        try:
+            if state is None:
+                await self.state.insert_one({"_id": STATE_ID, "watermark": until})
+                return True
+            result = await self.state.update_one({"_id": STATE_ID, "watermark": since}, {"$set": {"watermark": until}})
+            return result.modified_count == 1
+        except DuplicateKeyError:
+            return False
+
+    async def counts_by_client(self, hours, granularity="hour", now=None):
+        """Checks per client over the last ``hours`` hours, read from rollups."""
+        since = truncate((now or datetime.utcnow()) - timedelta(hours=hours), granularity)
+        pipeline = [
+            {"$match": {"granularity": granularity, "bucket": {"$gte": since}}},
+            {"$group": {"_id": "$client_name", "count": {"$sum": "$count"}}},
+            {"$sort": {"count": -1}},
+        ]
+        return [{"client_name": row["_id"], "count": row["count"]} async for row in self.rollups.aggregate(pipeline)]
+
+    async def series(self, client_name, hours, granularity="hour", now=None):
+        since = truncate((now or datetime.utcnow()) - timedelta(hours=hours), granularity)
+        cursor = self.rollups.find(
+            {"granularity": granularity, "client_name": client_name, "bucket": {"$gte": since}},
+            {"_id": 0, "bucket": 1, "count": 1},
+        ).sort("bucket", ASCENDING)
+        return [{"bucket": doc["bucket"].isoformat(), "count": doc["count"]} async for doc in cursor]
@@ -0,0 +1,73 @@
+"""Production entry point: uvicorn with one worker per available core.
+
+uvloop and httptools are used when installed. On SIGTERM each worker stops
+accepting connections, lets in-flight requests finish (up to
+--graceful-timeout) and then runs the app's shutdown, which drains pending
+status writes before closing its MongoDB pool. Pool sizing is read from the
+MONGO_*_POOL_SIZE / MONGO_WAIT_QUEUE_TIMEOUT_MS settings in server.py and
+applies per worker.
+
+Usage:
+    python run.py                          # WEB_CONCURRENCY or one worker per core
+    python run.py --workers 4 --port 8001
+"""
+import argparse
+import importlib.util
+import os
+from pathlib import Path
+
+import uvicorn
+
+BACKEND_DIR = Path(__file__).parent
+
+
+def available_cpus():
+    # Respects container/cgroup CPU sets, unlike os.cpu_count()
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with multiple uvicorn workers")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8001)))
+    parser.add_argument("-w", "--workers", type=int,
+                        default=int(os.environ.get("WEB_CONCURRENCY", 0)) or available_cpus())
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.environ.get("GRACEFUL_TIMEOUT", 30)),
+                        help="seconds to wait for in-flight requests on shutdown")
+    parser.add_argument("--keep-alive", type=int, default=5, help="keep-alive timeout in seconds")
+    parser.add_argument("--log-level", default=os.environ.get("LOG_LEVEL", "info"))
+    parser.add_argument("--no-access-log", action="store_true")
+    parser.add_argument("--app", default="server:app", help="ASGI app import string")
+    parser.add_argument("--factory", action="store_true", help="treat --app as an app factory")
+    parser.add_argument("--app-dir", default=str(BACKEND_DIR), help="directory added to sys.path for --app")
+    args = parser.parse_args()
+
+    loop = "uvloop" if installed("uvloop") else "asyncio"
+    http = "httptools" if installed("httptools") else "h11"
+    print(f"Starting {args.workers} workers on {args.host}:{args.port} (loop={loop}, http={http})")
+    uvicorn.run(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        app_dir=args.app_dir,
+        factory=args.factory,
+        proxy_headers=True,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+        access_log=not args.no_access_log,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,107 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Request, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
+import sys
+import base64
+import json
 import logging
+import math
+from contextlib import asynccontextmanager
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, ValidationError
+from typing import Annotated, Any, Dict, List, Optional, Union
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+# NumPy-backed modules (metabolic, composition, pace, body_profiles,
+# weight_tables, activities, training, meals) and the report renderer are imported inside the endpoints
+# that need them, so a cold start only pays for them once one is hit.
+import formulas
+import metrics
+import ndjson
+from compression import CompressionMiddleware, PrecompressedStaticFiles
+from exports import FORMATS as EXPORT_FORMATS, ExportManager
+from ratelimit import AdmissionGate, RateLimiter
+from response_cache import MongoGenerations, ResponseCache, etag_matches, render_json
+from rollups import GRANULARITIES, StatusRollup
+from write_buffer import WriteBehindBuffer
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, opened in the app lifespan (see connect_db). A client
+# assigned here before startup, e.g. an in-memory stand-in, is used as is.
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+# Connection pool sizing, per worker process (see run.py for multi-worker mode)
+MONGO_POOL_OPTIONS = [
+    ('MONGO_MAX_POOL_SIZE', 'maxPoolSize'),
+    ('MONGO_MIN_POOL_SIZE', 'minPoolSize'),
+    ('MONGO_MAX_CONNECTING', 'maxConnecting'),
+    ('MONGO_MAX_IDLE_TIME_MS', 'maxIdleTimeMS'),
+    ('MONGO_WAIT_QUEUE_TIMEOUT_MS', 'waitQueueTimeoutMS'),
+]
+
+# How long shutdown waits for in-flight status inserts before closing the client
+SHUTDOWN_DRAIN_TIMEOUT = float(os.environ.get('SHUTDOWN_DRAIN_TIMEOUT', 10))
+inflight_writes = set()
+
+# Optional write-behind mode for POST /api/status: heartbeats are acknowledged
+# immediately and written in batches with insert_many
+STATUS_WRITE_BEHIND = os.environ.get('STATUS_WRITE_BEHIND', '').lower() in ('1', 'true', 'yes')
+status_buffer: Optional[WriteBehindBuffer] = None
 
-# Create the main app without a prefix
-app = FastAPI()
+# Heartbeat rollups: raw checks are aggregated every STATUS_ROLLUP_INTERVAL
+# seconds (0 disables) and expire after STATUS_RAW_TTL_DAYS (0 keeps them).
+# Minute and hour buckets expire after STATUS_ROLLUP_MINUTE_TTL_DAYS and
+# STATUS_ROLLUP_HOUR_TTL_DAYS (0 keeps them)
+STATUS_ROLLUP_INTERVAL = float(os.environ.get('STATUS_ROLLUP_INTERVAL', 60))
+status_rollup: Optional[StatusRollup] = None
+STATUS_RAW_TTL_DAYS = float(os.environ.get('STATUS_RAW_TTL_DAYS', 30))
+STATUS_ROLLUP_TTL_DAYS = {
+    'minute': float(os.environ.get('STATUS_ROLLUP_MINUTE_TTL_DAYS', 7)),
+    'hour': float(os.environ.get('STATUS_ROLLUP_HOUR_TTL_DAYS', 90)),
+}
+
+# Status check exports (gzip CSV / Parquet), written to EXPORT_DIR in the background
+EXPORT_DIR = os.environ.get('EXPORT_DIR', ROOT_DIR / 'exports')
+export_manager: Optional[ExportManager] = None
+
+# Cached read endpoints: writes invalidate their tag, pollers revalidate with
+# If-None-Match and get a 304 while nothing changed. Tag generations live in
+# MongoDB so every worker sees an invalidation within
+# RESPONSE_CACHE_GENERATION_MAX_AGE seconds
+CACHE_POLICIES = {
+    'root': 'public, max-age=3600',
+    'status': 'no-cache',
+}
+response_cache = ResponseCache(policies=CACHE_POLICIES, ttl=float(os.environ.get('RESPONSE_CACHE_TTL', 30)))
+RESPONSE_CACHE_GENERATION_MAX_AGE = float(os.environ.get('RESPONSE_CACHE_GENERATION_MAX_AGE', 1))
+
+# Token bucket per client address and route (RATE_LIMIT_RPS / RATE_LIMIT_BURST
+# by default, tighter for heartbeats), and a cap on concurrent MongoDB-backed
+# requests kept below the pool size so excess load is shed with a 503
+rate_limiter = RateLimiter(
+    default=(float(os.environ.get('RATE_LIMIT_RPS', 50)), float(os.environ.get('RATE_LIMIT_BURST', 100))),
+    policies={
+        'POST /api/status': (float(os.environ.get('STATUS_RATE_LIMIT_RPS', 10)), 20),
+    },
+    enabled=os.environ.get('RATE_LIMIT_ENABLED', '1').lower() in ('1', 'true', 'yes'),
+)
+mongo_admission = Depends(AdmissionGate(int(os.environ.get('MONGO_ADMISSION_LIMIT', 80))))
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", dependencies=[Depends(rate_limiter)])
 
 
 # Define Models
@@ -35,33 +113,625 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class StatusRecord:
+    """Internal heartbeat record; serializes to the StatusCheck schema without revalidating."""
+    __slots__ = ("id", "client_name", "timestamp")
+
+    def __init__(self, client_name: str):
+        self.id = str(uuid.uuid4())
+        self.client_name = client_name
+        self.timestamp = datetime.utcnow()
+
+    def to_document(self) -> dict:
+        return {"id": self.id, "client_name": self.client_name, "timestamp": self.timestamp}
+
+    def to_json(self) -> dict:
+        return {"id": self.id, "client_name": self.client_name, "timestamp": self.timestamp.isoformat()}
+
+# Finite, positive body measurements; NaN, inf or 0 would only fail later, as a 500 while serializing
+WeightKg = Annotated[float, Field(gt=0, le=1000, allow_inf_nan=False)]
+HeightCm = Annotated[float, Field(gt=0, le=300, allow_inf_nan=False)]
+Age = Annotated[float, Field(gt=0, le=150, allow_inf_nan=False)]
+BodyFat = Annotated[float, Field(ge=0, lt=100, allow_inf_nan=False)]
+Circumference = Annotated[float, Field(gt=0, le=300, allow_inf_nan=False)]
+
+class MetabolicBatch(BaseModel):
+    weight_kg: List[WeightKg]
+    height_cm: List[HeightCm]
+    age: List[Age]
+    sex: List[str]
+    activity_level: List[str]
+    body_fat: Optional[List[Optional[BodyFat]]] = None
+
+# Race distances up to 1000 km and times up to a week
+DistanceM = Annotated[float, Field(gt=0, le=1_000_000, allow_inf_nan=False)]
+TimeS = Annotated[float, Field(gt=0, le=604_800, allow_inf_nan=False)]
+
+class PaceBatch(BaseModel):
+    distance_m: List[DistanceM] = Field(..., min_length=1)
+    time_s: List[TimeS] = Field(..., min_length=1)
+    targets_m: Optional[List[DistanceM]] = Field(None, min_length=1)
+
+class PaceBatchResult(BaseModel):
+    count: int
+    vdot: List[float]
+    race_times: Dict[str, List[float]]
+    training_paces: Dict[str, List[float]]
+
+class ProfileInput(BaseModel):
+    weight: WeightKg
+    height: HeightCm
+    sex: str
+    age: Optional[Age] = None
+    neck: Optional[Circumference] = None
+    waist: Optional[Circumference] = None
+    hip: Optional[Circumference] = None
+    wrist: Optional[Circumference] = None
+    shoulder: Optional[Circumference] = None
+    body_fat: Optional[BodyFat] = None
+    weight_unit: str = "kg"
+    length_unit: str = "cm"
+
+class ProfileBatch(BaseModel):
+    weight: List[WeightKg]
+    height: List[HeightCm]
+    sex: List[str]
+    age: Optional[List[Optional[Age]]] = None
+    neck: Optional[List[Optional[Circumference]]] = None
+    waist: Optional[List[Optional[Circumference]]] = None
+    hip: Optional[List[Optional[Circumference]]] = None
+    wrist: Optional[List[Optional[Circumference]]] = None
+    shoulder: Optional[List[Optional[Circumference]]] = None
+    body_fat: Optional[List[Optional[BodyFat]]] = None
+    weight_unit: str = "kg"
+    length_unit: str = "cm"
+
+# Five-digit Compendium codes; sessions up to a day
+ActivityCode = Annotated[int, Field(ge=0, le=99_999)]
+DurationMin = Annotated[float, Field(gt=0, le=1440, allow_inf_nan=False)]
+
+class CaloriesBatch(BaseModel):
+    code: List[ActivityCode]
+    duration_min: List[DurationMin]
+    weight: List[WeightKg]
+    age: Optional[List[Optional[Age]]] = None
+    body_fat: Optional[List[Optional[BodyFat]]] = None
+    sex: Optional[List[Optional[str]]] = None
+    weight_unit: str = "kg"
+
+class TrainingPlanBatch(BaseModel):
+    weight: Optional[List[float]] = None
+    reps: Optional[List[int]] = None
+    age: Optional[List[float]] = None
+    resting_hr: Optional[List[Optional[float]]] = None
+    max_hr: Optional[List[Optional[float]]] = None
+    max_reps: int = 20
+    round_to: Optional[float] = None
+    per_formula: bool = False
+
+class MealPlanRequest(BaseModel):
+    tdee: float = Field(..., gt=0, le=10_000, allow_inf_nan=False)
+    goal: str = "maintain"
+    preset: str = "balanced"
+    protein: Optional[int] = None
+    carbs: Optional[int] = None
+    fat: Optional[int] = None
+    days: int = Field(1, ge=1, le=14)
+    diet: str = "any"
+    gluten_free: bool = False
+    dairy_free: bool = False
+    exclude: List[str] = []
+
+class ExportRequest(BaseModel):
+    format: str = "csv"
+    client_name: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+# Report values are printed as given; missing ones print as N/A
+ReportValue = Union[int, float, str]
+
+class BmiReport(BaseModel):
+    name: Optional[str] = None
+    calculated_on: Optional[str] = None
+    age: Optional[ReportValue] = None
+    gender: Optional[str] = None
+    weight: Optional[ReportValue] = None
+    height: Optional[ReportValue] = None
+    bmi: Optional[ReportValue] = None
+    category: Optional[str] = None
+    health_risk: Optional[str] = None
+    ideal_weight_min: Optional[ReportValue] = None
+    ideal_weight_max: Optional[ReportValue] = None
+    ideal_weight_unit: Optional[str] = None
+    recommendations: List[ReportValue] = []
+
+class BsaReport(BaseModel):
+    name: Optional[str] = None
+    calculated_on: Optional[str] = None
+    weight: Optional[ReportValue] = None
+    height: Optional[ReportValue] = None
+    age: Optional[ReportValue] = None
+    gender: Optional[str] = None
+    bsa: Optional[ReportValue] = None
+    category: Optional[str] = None
+    method: Optional[str] = None
+    accuracy: Optional[str] = None
+    bmi: Optional[ReportValue] = None
+    weight_bsa_ratio: Optional[ReportValue] = None
+    height_bsa_ratio: Optional[ReportValue] = None
+    applications: List[ReportValue] = []
+    health_insights: List[ReportValue] = []
+    recommendations: List[ReportValue] = []
+
+REPORT_MODELS = {"bmi": BmiReport, "bsa": BsaReport}
+
+class ReportBatch(BaseModel):
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=5000)
+
+class MetabolicBatchResult(BaseModel):
+    count: int
+    bmi: List[float]
+    bmr_mifflin: List[float]
+    bmr_harris: List[float]
+    bmr_katch: List[Optional[float]]
+    tdee: List[float]
+
+async def tracked_write(operation):
+    # Shielded so an insert finishes even if its request is cancelled; shutdown
+    # waits for whatever is still pending before closing the client
+    task = asyncio.ensure_future(operation)
+    inflight_writes.add(task)
+    task.add_done_callback(inflight_writes.discard)
+    return await asyncio.shield(task)
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
-async def root():
-    return {"message": "Hello World"}
+async def root(request: Request):
+    async def build():
+        return render_json({"message": "Hello World"}), {}
+    return await response_cache.respond(request, 'root', build)
 
-@api_router.post("/status", response_model=StatusCheck)
+@api_router.post("/status", response_model=StatusCheck, dependencies=[mongo_admission])
 async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
-
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
-
-# Include the router in the main app
-app.include_router(api_router)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    # The body is validated once on the way in; the record is built and
+    # serialized directly rather than through a second StatusCheck model
+    record = StatusRecord(input.client_name)
+    if status_buffer is not None:
+        await status_buffer.put(record.to_document())
+    else:
+        await tracked_write(db.status_checks.insert_one(record.to_document()))
+        await response_cache.invalidate('status')
+    return JSONResponse(record.to_json())
+
+async def invalidate_status_cache(written: int):
+    await response_cache.invalidate('status')
+
+@api_router.get("/status/buffer")
+async def get_status_buffer_metrics():
+    if status_buffer is None:
+        return {"enabled": False}
+    return {"enabled": True, **status_buffer.metrics()}
+
+@api_router.get("/status/summary", dependencies=[mongo_admission])
+async def get_status_summary(hours: int = Query(24, ge=1, le=24 * 90)):
+    granularity = "minute" if hours <= 6 else "hour"
+    clients = await status_rollup.counts_by_client(hours, granularity)
+    return {"hours": hours, "granularity": granularity, "clients": clients}
+
+@api_router.get("/status/rollups/{client_name}", dependencies=[mongo_admission])
+async def get_status_rollups(client_name: str, hours: int = Query(24, ge=1, le=24 * 90), granularity: str = "hour"):
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=422, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    buckets = await status_rollup.series(client_name, hours, granularity)
+    return {"client_name": client_name, "hours": hours, "granularity": granularity, "buckets": buckets}
+
+STATUS_PROJECTION = {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1}
+
+def encode_status_cursor(doc) -> str:
+    raw = json.dumps([doc["timestamp"].isoformat(), doc["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_status_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, last_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), str(last_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@api_router.get("/status", response_model=List[StatusCheck], dependencies=[mongo_admission])
+async def get_status_checks(
+    request: Request,
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    client_name: Optional[str] = None,
+):
+    # Keyset pagination on (timestamp, id); the next page's cursor is returned
+    # in the X-Next-Cursor header so the body keeps the original list schema.
+    query = {}
+    if client_name is not None:
+        query["client_name"] = client_name
+    if cursor:
+        timestamp, last_id = decode_status_cursor(cursor)
+        query["$or"] = [
+            {"timestamp": {"$gt": timestamp}},
+            {"timestamp": timestamp, "id": {"$gt": last_id}},
+        ]
+
+    async def build():
+        docs = await (
+            db.status_checks.find(query, STATUS_PROJECTION)
+            .sort([("timestamp", ASCENDING), ("id", ASCENDING)])
+            .limit(limit)
+            .to_list(limit)
+        )
+        headers = {}
+        if len(docs) == limit:
+            headers["X-Next-Cursor"] = encode_status_cursor(docs[-1])
+        # Documents were validated on insert; serialize them directly
+        for doc in docs:
+            doc["timestamp"] = doc["timestamp"].isoformat()
+        return render_json(docs), headers
+
+    return await response_cache.respond(request, 'status', build)
+
+def export_status(job) -> dict:
+    total = job["total_rows"]
+    return {
+        "id": job["_id"],
+        "format": job["format"],
+        "state": job["state"],
+        "rows_written": job["rows_written"],
+        "total_rows": total,
+        "progress": 1.0 if job["state"] == "done" else round(job["rows_written"] / total, 4) if total else 0.0,
+        "bytes_written": job["bytes_written"],
+        "error": job["error"],
+        "created_at": job["created_at"].isoformat(),
+        "finished_at": job["finished_at"].isoformat() if job["finished_at"] else None,
+        "download_url": f"/api/exports/{job['_id']}/download" if job["state"] == "done" else None,
+    }
+
+@api_router.post("/exports/status", status_code=202, dependencies=[mongo_admission])
+async def start_status_export(request: ExportRequest):
+    try:
+        job = await export_manager.start(request.format, request.client_name, request.since, request.until)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return export_status(job)
+
+async def find_export(job_id: str):
+    job = await export_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown export job")
+    return job
+
+@api_router.get("/exports/{job_id}", dependencies=[mongo_admission])
+async def get_status_export(job_id: str):
+    return export_status(await find_export(job_id))
+
+@api_router.get("/exports/{job_id}/download", dependencies=[mongo_admission])
+async def download_status_export(job_id: str):
+    job = await find_export(job_id)
+    if job["state"] != "done":
+        raise HTTPException(status_code=409, detail=f"Export is {job['state']}")
+    path = export_manager.path_for(job)
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Export file is no longer available")
+    return FileResponse(path, media_type=EXPORT_FORMATS[job["format"]][1], filename=job["filename"])
+
+@api_router.get("/cache")
+async def response_cache_stats():
+    stats = response_cache.stats()
+    if "meals" in sys.modules:
+        stats["meal_plans"] = sys.modules["meals"].plan_cache_stats()
+    return stats
+
+@api_router.post("/batch/metabolic", response_model=MetabolicBatchResult)
+def batch_metabolic(batch: MetabolicBatch):
+    # Plain def so the NumPy work runs in the threadpool, not on the event loop
+    import metabolic
+
+    try:
+        results = metabolic.compute_metabolic(
+            batch.weight_kg, batch.height_cm, batch.age,
+            batch.sex, batch.activity_level, batch.body_fat,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    columns = {name: metabolic.to_column(values) for name, values in results.items()}
+    return MetabolicBatchResult(count=len(batch.weight_kg), **columns)
+
+@api_router.post("/batch/pace", response_model=PaceBatchResult)
+def batch_pace(batch: PaceBatch):
+    import metabolic
+    import pace
+
+    try:
+        results = pace.compute_predictions(batch.distance_m, batch.time_s, batch.targets_m)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return PaceBatchResult(
+        count=len(batch.distance_m),
+        vdot=metabolic.to_column(results["vdot"]),
+        race_times={name: metabolic.to_column(v, 1) for name, v in results["race_times"].items()},
+        training_paces={name: metabolic.to_column(v, 1) for name, v in results["training_paces"].items()},
+    )
+
+@api_router.get("/pace/vdot-table")
+async def pace_vdot_table():
+    import pace
+
+    return pace.vdot_table()
+
+PROFILE_UNITS = {"weight_unit", "length_unit"}
+
+@api_router.post("/profile")
+def body_profile(profile: ProfileInput):
+    import body_profiles
+
+    columns = {name: [value] for name, value in profile.model_dump(exclude=PROFILE_UNITS).items()}
+    try:
+        data = body_profiles.normalize(columns, profile.weight_unit, profile.length_unit)
+        return body_profiles.row(body_profiles.to_json(body_profiles.compute_profiles(data)), 0)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@api_router.post("/batch/profile")
+async def batch_body_profile(batch: ProfileBatch):
+    import body_profiles
+
+    try:
+        data = body_profiles.normalize(batch.model_dump(exclude=PROFILE_UNITS), batch.weight_unit, batch.length_unit)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    results = await body_profiles.compute_batch(data)
+    return {"count": len(batch.weight), **body_profiles.to_json(results)}
+
+@api_router.get("/activities/search")
+def search_activities(q: str, limit: int = Query(10, ge=1, le=100), heading: Optional[str] = None):
+    import activities
+
+    try:
+        return activities.get_catalog().search(q, limit, heading)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@api_router.get("/activities/{code}")
+def get_activity(code: int):
+    import activities
+
+    try:
+        return activities.get_catalog().entry(code)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@api_router.post("/batch/calories")
+def batch_calories(batch: CaloriesBatch):
+    import activities
+    import metabolic
+
+    try:
+        results = activities.compute_calories(
+            activities.get_catalog(), batch.code, batch.duration_min, batch.weight,
+            batch.age, batch.body_fat, batch.sex, batch.weight_unit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {
+        "count": len(batch.code),
+        "total_calories": round(float(results["calories"].sum()), 1),
+        **{name: metabolic.to_column(values, 1) for name, values in results.items()},
+    }
+
+@api_router.get("/training/percent-table")
+def training_percent_table(max_reps: int = Query(20, ge=1)):
+    import metabolic
+    import training
+
+    if max_reps > training.MAX_REPS:
+        raise HTTPException(status_code=422, detail=f"max_reps must be between 1 and {training.MAX_REPS}")
+    table = training.percent_table(max_reps) * 100
+    return {
+        "reps": list(range(1, max_reps + 1)),
+        "percent": {name: metabolic.to_column(table[i], 1) for i, name in enumerate(training.ONE_RM_FORMULAS)},
+        "mean": metabolic.to_column(table.mean(axis=0), 1),
+    }
+
+@api_router.post("/batch/training-plan")
+def batch_training_plan(batch: TrainingPlanBatch):
+    import metabolic
+    import training
+
+    def by_rep(matrix):
+        return {str(r + 1): metabolic.to_column(matrix[:, r], 1) for r in range(matrix.shape[1])}
+
+    if (batch.weight is None) != (batch.reps is None):
+        raise HTTPException(status_code=422, detail="Give both 'weight' and 'reps', or neither")
+    if batch.weight is None and batch.age is None:
+        raise HTTPException(status_code=422, detail="Give 'weight' and 'reps', 'age', or both")
+    sizes = {len(column) for column in (batch.weight, batch.age) if column is not None}
+    if len(sizes) > 1:
+        raise HTTPException(status_code=422, detail="Columns 'weight' and 'age' must have the same length")
+
+    response = {"count": sizes.pop()}
+    try:
+        if batch.weight is not None:
+            plan = training.strength_plan(batch.weight, batch.reps, batch.max_reps, batch.round_to, batch.per_formula)
+            low, high = plan["one_rep_max_range"]
+            response["strength"] = {
+                "one_rep_max": {name: metabolic.to_column(v, 1) for name, v in plan["one_rep_max"].items()},
+                "one_rep_max_mean": metabolic.to_column(plan["one_rep_max_mean"], 1),
+                "one_rep_max_min": metabolic.to_column(low, 1),
+                "one_rep_max_max": metabolic.to_column(high, 1),
+                "loads": by_rep(plan["loads"]),
+            }
+            if batch.per_formula:
+                response["strength"]["loads_by_formula"] = {
+                    name: by_rep(plan["loads_by_formula"][:, i]) for i, name in enumerate(training.ONE_RM_FORMULAS)
+                }
+        if batch.age is not None:
+            zones = training.heart_rate_zones(batch.age, batch.resting_hr, batch.max_hr)
+            response["heart_rate"] = {
+                "max_hr": metabolic.to_column(zones["max_hr"], 0),
+                "resting_hr": metabolic.to_column(zones["resting_hr"], 0),
+                "zones": {
+                    name: {"low": metabolic.to_column(low, 0), "high": metabolic.to_column(high, 0)}
+                    for name, (low, high) in zones["zones"].items()
+                },
+            }
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return response
+
+@api_router.post("/meal-plan")
+def meal_plan(request: MealPlanRequest):
+    import meals
+
+    custom = (request.protein, request.carbs, request.fat)
+    if any(pct is not None for pct in custom) and None in custom:
+        raise HTTPException(status_code=422, detail="Give all of 'protein', 'carbs' and 'fat', or none")
+    try:
+        return meals.meal_plan(
+            request.tdee, request.goal, request.preset, None if None in custom else custom, request.days,
+            request.diet, request.gluten_free, request.dairy_free, request.exclude,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@api_router.post("/stream/composition")
+async def stream_composition(request: Request, batch_size: int = 1000):
+    import composition
+
+    batch_size = max(1, min(batch_size, 10000))
+    return ndjson.NDJSONStreamingResponse(
+        ndjson.stream_ndjson(request.stream(), composition.process_records, batch_size)
+    )
+
+def rounded(results, decimals=2):
+    # Cached results are shared, so always build a new dict
+    return {name: round(value, decimals) for name, value in results.items()}
+
+# Formula inputs in either unit (lbs / in): finite and bounded, so results stay finite too
+FormulaWeight = Annotated[float, Query(gt=0, le=2500, allow_inf_nan=False)]
+FormulaHeight = Annotated[float, Query(gt=0, le=300, allow_inf_nan=False)]
+
+@api_router.get("/formulas/bsa")
+async def formula_bsa(weight: FormulaWeight, height: FormulaHeight, weight_unit: str = "kg", height_unit: str = "cm"):
+    try:
+        return rounded(formulas.body_surface_area(weight, height, weight_unit, height_unit), 3)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@api_router.get("/formulas/one-rep-max")
+async def formula_one_rep_max(weight: FormulaWeight, reps: int):
+    try:
+        return rounded(formulas.one_rep_max(weight, reps), 1)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@api_router.get("/formulas/ideal-weight")
+async def formula_ideal_weight(height: FormulaHeight, sex: str, height_unit: str = "cm"):
+    try:
+        return rounded(formulas.ideal_weight(height, sex, height_unit), 1)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@api_router.get("/formulas/cache")
+async def formula_cache_stats():
+    return formulas.cache.stats()
+
+@api_router.get("/tables/healthy-weight")
+async def lookup_healthy_weight(height_cm: float, age: int, activity: str = "low", frame: str = "average"):
+    import weight_tables
+
+    try:
+        return weight_tables.get_tables().healthy_range(height_cm, age, activity, frame)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@api_router.get("/tables/ideal-weight")
+async def lookup_ideal_weight(height_cm: float, sex: str):
+    import weight_tables
+
+    try:
+        return weight_tables.get_tables().ideal_weights(height_cm, sex)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+TABLE_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
+
+def table_asset(request: Request, body: bytes, media_type: str, etag: str):
+    headers = {"ETag": etag, "Cache-Control": TABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+@api_router.get("/tables/weight-ranges.json")
+async def weight_ranges_json(request: Request):
+    import weight_tables
+
+    tables = weight_tables.get_tables()
+    return table_asset(request, tables.json_bytes, "application/json", tables.json_etag)
+
+@api_router.get("/tables/weight-ranges.bin")
+async def weight_ranges_binary(request: Request):
+    import weight_tables
+
+    tables = weight_tables.get_tables()
+    return table_asset(request, tables.binary_bytes, "application/octet-stream", tables.binary_etag)
+
+@api_router.get("/tables/weight-ranges.layout")
+async def weight_ranges_layout():
+    import weight_tables
+
+    return weight_tables.get_tables().layout()
+
+def report_values(kind: str, data: Dict[str, Any], loc: tuple) -> dict:
+    """Validate a report body against the model for ``kind``; errors are located under ``loc``."""
+    if kind not in REPORT_MODELS:
+        raise HTTPException(status_code=404, detail=f"Unknown report type: {kind}")
+    try:
+        return REPORT_MODELS[kind].model_validate(data).model_dump(exclude_none=True)
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": (*loc, *error["loc"])} for error in e.errors(include_url=False)])
+
+@api_router.post("/reports/{kind}")
+def render_report(kind: str, data: Dict[str, Any]):
+    import reports
+
+    data = report_values(kind, data, ("body",))
+    return Response(
+        reports.render_report(kind, data),
+        media_type="application/pdf",
+        headers={"Content-Disposition": reports.TEMPLATES[kind].content_disposition(data)},
+    )
+
+@api_router.post("/reports/{kind}/batch")
+async def render_report_batch(kind: str, batch: ReportBatch):
+    import reports
+
+    items = [report_values(kind, item, ("body", "items", i)) for i, item in enumerate(batch.items)]
+    archive = await reports.render_batch(kind, items)
+    return Response(
+        archive,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{kind}-reports.zip"'},
+    )
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+# Opt-in sampling profiler: requests slower than PROFILE_SLOW_REQUEST_MS dump
+# folded stacks to PROFILE_DIR
+slow_request_sampler = None
+if os.environ.get('PROFILE_SLOW_REQUEST_MS'):
+    slow_request_sampler = metrics.StackSampler(
+        threshold_ms=float(os.environ['PROFILE_SLOW_REQUEST_MS']),
+        interval_ms=float(os.environ.get('PROFILE_INTERVAL_MS', 5)),
+        output_dir=os.environ.get('PROFILE_DIR', ROOT_DIR / 'profiles'),
+    )
 
 # Configure logging
 logging.basicConfig(
@@ -70,6 +740,142 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
+async def connect_db():
+    global client, db
+    if client is None:
+        if 'MONGO_URL' not in os.environ:
+            raise RuntimeError("MONGO_URL is not set")
+        pool_options = {option: int(os.environ[name]) for name, option in MONGO_POOL_OPTIONS if os.environ.get(name)}
+        client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'], event_listeners=[metrics.MongoCommandListener()], **pool_options
+        )
+        # Open a pooled connection now rather than on the first request
+        try:
+            await client.admin.command('ping')
+        except PyMongoError as e:
+            logger.warning("MongoDB ping failed at startup: %s", e)
+    if 'DB_NAME' not in os.environ:
+        raise RuntimeError("DB_NAME is not set")
+    db = client[os.environ['DB_NAME']]
+
+async def create_indexes():
+    await db.status_checks.create_index([("timestamp", ASCENDING), ("id", ASCENDING)])
+    await db.status_checks.create_index(
+        [("client_name", ASCENDING), ("timestamp", ASCENDING), ("id", ASCENDING)]
+    )
+
+async def start_status_rollup():
+    global status_rollup
+    retention = {granularity: timedelta(days=days) for granularity, days in STATUS_ROLLUP_TTL_DAYS.items() if days > 0}
+    status_rollup = StatusRollup(db, interval=STATUS_ROLLUP_INTERVAL, retention=retention)
+    await status_rollup.create_indexes(raw_ttl_seconds=int(STATUS_RAW_TTL_DAYS * 86400))
+    if status_rollup.interval > 0:
+        status_rollup.start()
+
+def build_lookup_tables():
+    import activities
+    import weight_tables
+
+    weight_tables.get_tables()
+    activities.get_catalog()
+
+async def start_export_manager():
+    global export_manager
+    export_manager = ExportManager(
+        db, EXPORT_DIR,
+        batch_size=int(os.environ.get('EXPORT_BATCH_SIZE', 50000)),
+        max_concurrent=int(os.environ.get('EXPORT_MAX_CONCURRENT', 2)),
+        retention_hours=float(os.environ.get('EXPORT_RETENTION_HOURS', 24)),
+    )
+    await export_manager.create_indexes()
+
+async def start_status_buffer():
+    global status_buffer
+    if STATUS_WRITE_BEHIND:
+        status_buffer = WriteBehindBuffer(
+            db.status_checks,
+            max_batch=int(os.environ.get('STATUS_BUFFER_MAX_BATCH', 500)),
+            max_delay=float(os.environ.get('STATUS_BUFFER_MAX_DELAY', 0.05)),
+            on_flush=invalidate_status_cache,
+        )
+        status_buffer.start()
+
 async def shutdown_db_client():
+    global client, status_buffer
+    if status_rollup is not None:
+        await status_rollup.stop()
+    if export_manager is not None:
+        await export_manager.stop()
+    if status_buffer is not None:
+        await status_buffer.drain()
+        status_buffer = None
+    if inflight_writes:
+        _, pending = await asyncio.wait(set(inflight_writes), timeout=SHUTDOWN_DRAIN_TIMEOUT)
+        if pending:
+            logger.warning("Closing MongoDB client with %d status writes still pending", len(pending))
+    for pooled in ('reports', 'body_profiles'):
+        if pooled in sys.modules:
+            sys.modules[pooled].shutdown_pool()
+    if slow_request_sampler is not None:
+        slow_request_sampler.stop()
     client.close()
+    client = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_db()
+    response_cache.generations = MongoGenerations(db.cache_generations, max_age=RESPONSE_CACHE_GENERATION_MAX_AGE)
+    await create_indexes()
+    await start_status_rollup()
+    await start_export_manager()
+    if slow_request_sampler is not None:
+        slow_request_sampler.start()
+    # Import NumPy and build the lookup tables before serving, so the first
+    # requests don't pay for them; the import stays out of module load
+    if os.environ.get('WARM_LOOKUP_TABLES', '1').lower() in ('1', 'true', 'yes'):
+        await asyncio.get_running_loop().run_in_executor(None, build_lookup_tables)
+    await start_status_buffer()
+    yield
+    await shutdown_db_client()
+
+async def validation_error(request: Request, exc: RequestValidationError):
+    # FastAPI echoes each rejected input, and a NaN or inf literal would make that 422 fail to serialize
+    errors = []
+    for error in exc.errors():
+        value = error.get("input")
+        if isinstance(value, float) and not math.isfinite(value):
+            error = {key: v for key, v in error.items() if key != "input"}
+        errors.append(error)
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(errors)})
+
+def create_app() -> FastAPI:
+    # Create the main app without a prefix
+    app = FastAPI(lifespan=lifespan)
+    app.add_exception_handler(RequestValidationError, validation_error)
+
+    # Include the router in the main app
+    app.include_router(api_router)
+    # Optionally serve the built frontend (prerendered shells, precompressed
+    # assets) from the same process; routes above take precedence
+    frontend_dist = os.environ.get('FRONTEND_DIST')
+    if frontend_dist:
+        app.mount("/", PrecompressedStaticFiles(frontend_dist), name="frontend")
+
+    # Innermost, so the metrics middleware counts the bytes actually sent
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', 1024)),
+        gzip_level=int(os.environ.get('GZIP_LEVEL', 6)),
+        brotli_quality=int(os.environ.get('BROTLI_QUALITY', 4)),
+    )
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(metrics.MetricsMiddleware, sampler=slow_request_sampler)
+    return app
+
+app = create_app()
@@ -0,0 +1,135 @@
+"""Team training-load planning: %1RM loading tables and Karvonen heart-rate zones.
+
+Uses the seven 1RM formulas of OneRepMaxCalculator.jsx and the Karvonen zones
+of TargetHeartRateCalculator.jsx, for a whole roster at once. Each formula is
+reduced to a repetition factor f(r) with 1RM = weight x f(r), so the
+estimates are an outer product of the lifted weights with the factors at the
+reps performed, and the loading tables an outer product of the estimated 1RMs
+with the %1RM for each rep count (athletes x formulas x reps).
+"""
+from functools import lru_cache
+
+import numpy as np
+
+import formulas
+
+# 1RM = weight x factor(reps): formulas.one_rep_max as factors, so they broadcast over reps
+ONE_RM_FORMULAS = {
+    "epley": lambda r: 1 + r / 30,
+    "brzycki": lambda r: 36 / (37 - r),
+    "lander": lambda r: 100 / (101.3 - 2.67123 * r),
+    "lombardi": lambda r: r ** 0.10,
+    "mayhew": lambda r: 100 / (52.2 + 41.9 * np.exp(-0.055 * r)),
+    "oconner": lambda r: 1 + 0.025 * r,
+    "wathan": lambda r: 100 / (48.8 + 53.8 * np.exp(-0.075 * r)),
+}
+
+# None of the formulas is meaningful far out; shared with formulas.one_rep_max
+MAX_REPS = formulas.ONE_RM_MAX_REPS
+TABLE_REPS = 20
+
+# Karvonen zone bounds as % of heart-rate reserve, as in TargetHeartRateCalculator.jsx
+HR_ZONES = {
+    "recovery": (50, 60),
+    "aerobic": (60, 70),
+    "threshold": (70, 80),
+    "anaerobic": (80, 90),
+    "maximum": (90, 100),
+}
+DEFAULT_RESTING_HR = 70
+
+
+def rep_factors(reps):
+    """Factor of each formula (rows) at each rep count (columns)."""
+    reps = np.asarray(reps, dtype=np.float64)
+    return np.stack([np.broadcast_to(f(reps), reps.shape) for f in ONE_RM_FORMULAS.values()])
+
+
+@lru_cache(maxsize=8)
+def percent_table(max_reps=TABLE_REPS):
+    """%1RM that can be lifted for 1..max_reps reps under each formula (formulas x reps).
+
+    The inverse of each formula, normalised so one rep is exactly 100%;
+    Epley and Mayhew would otherwise put a single above the estimated 1RM.
+    """
+    factors = rep_factors(np.arange(1, max_reps + 1))
+    table = factors[:, :1] / factors
+    table.setflags(write=False)
+    return table
+
+
+def _optional_column(values, n, name):
+    if values is None:
+        return np.full(n, np.nan)
+    if len(values) != n:
+        raise ValueError(f"Column '{name}' has {len(values)} values, expected {n}")
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def round_to(values, increment):
+    """Round loads to the nearest plate increment (no rounding for None)."""
+    if increment is None:
+        return values
+    if increment <= 0:
+        raise ValueError("Rounding increment must be positive")
+    return np.round(values / increment) * increment
+
+
+def strength_plan(weight, reps, max_reps=TABLE_REPS, increment=None, per_formula=False):
+    """Estimated 1RMs and loading tables for columnar (weight lifted, reps) sets.
+
+    ``loads`` is the mean of the formulas, as the calculator's headline 1RM;
+    ``loads_by_formula`` (athletes x formulas x reps) only when ``per_formula``.
+    """
+    weight = np.asarray(weight, dtype=np.float64)
+    reps = np.asarray(reps, dtype=np.float64)
+    if reps.shape != weight.shape:
+        raise ValueError(f"Column 'reps' has {reps.size} values, expected {weight.size}")
+    if (weight <= 0).any():
+        raise ValueError("Lifted weights must be positive")
+    if (reps < 1).any() or (reps > MAX_REPS).any() or (reps != np.round(reps)).any():
+        raise ValueError(f"Reps must be whole numbers from 1 to {MAX_REPS}")
+    if not 1 <= max_reps <= MAX_REPS:
+        raise ValueError(f"max_reps must be between 1 and {MAX_REPS}")
+
+    # (athletes x formulas): the lifted weight times each formula's factor at its reps
+    one_rm = weight[:, None] * rep_factors(reps).T
+    mean_one_rm = one_rm.mean(axis=1)
+    table = percent_table(max_reps)
+    result = {
+        "one_rep_max": {name: one_rm[:, i] for i, name in enumerate(ONE_RM_FORMULAS)},
+        "one_rep_max_mean": mean_one_rm,
+        "one_rep_max_range": (one_rm.min(axis=1), one_rm.max(axis=1)),
+        # Mean 1RM x mean %1RM per rep count: (athletes x reps)
+        "loads": round_to(np.outer(mean_one_rm, table.mean(axis=0)), increment),
+    }
+    if per_formula:
+        result["loads_by_formula"] = round_to(one_rm[:, :, None] * table[None, :, :], increment)
+    return result
+
+
+def heart_rate_zones(age, resting_hr=None, max_hr=None):
+    """Karvonen zone bounds in bpm for each athlete.
+
+    Max HR is 220 - age unless measured; resting HR defaults to 70 as in the
+    calculator. Returns {zone: (low, high)} with one value per athlete.
+    """
+    age = np.asarray(age, dtype=np.float64)
+    n = age.shape[0]
+    resting = _optional_column(resting_hr, n, "resting_hr")
+    resting = np.where(np.isnan(resting), DEFAULT_RESTING_HR, resting)
+    measured = _optional_column(max_hr, n, "max_hr")
+    max_hr = np.where(np.isnan(measured), 220 - age, measured)
+    if (age <= 0).any() or (resting <= 0).any():
+        raise ValueError("Ages and resting heart rates must be positive")
+    if (max_hr <= resting).any():
+        raise ValueError("Max heart rate must be above resting heart rate")
+
+    bounds = np.array(list(HR_ZONES.values()), dtype=np.float64) / 100
+    # (athletes x zones x 2): reserve x intensity + resting
+    bpm = (max_hr - resting)[:, None, None] * bounds[None, :, :] + resting[:, None, None]
+    return {
+        "max_hr": max_hr,
+        "resting_hr": resting,
+        "zones": {name: (bpm[:, i, 0], bpm[:, i, 1]) for i, name in enumerate(HR_ZONES)},
+    }
@@ -0,0 +1,139 @@
+"""Dense healthy-weight and ideal-weight tables indexed by height in mm.
+
+The healthy range in HealthyWeightCalculator.jsx depends only on height and
+a BMI band chosen by age, activity level and body frame; ideal weights in
+IdealWeightCalculator.jsx depend only on height and sex. Both are built once
+into float32 arrays so any query is a single array index.
+"""
+import hashlib
+import json
+import math
+
+import numpy as np
+
+from formulas import CM_PER_INCH, IDEAL_WEIGHT_FORMULAS
+
+MIN_HEIGHT_MM = 1000
+MAX_HEIGHT_MM = 2500
+
+AGE_BANDS = ("under_50", "50_to_64", "65_plus")
+ACTIVITY_LEVELS = ("low", "moderate", "high")
+BODY_FRAMES = ("small", "average", "large")
+SEXES = ("male", "female")
+
+
+def age_band(age):
+    if age >= 65:
+        return "65_plus"
+    if age >= 50:
+        return "50_to_64"
+    return "under_50"
+
+
+def bmi_band(band, activity, frame):
+    """(min, max) healthy BMI with the calculator's age/activity/frame adjustments."""
+    min_bmi, max_bmi = {"under_50": (18.5, 24.9), "50_to_64": (20.0, 26.0), "65_plus": (22.0, 27.0)}[band]
+    max_bmi += {"low": 0.0, "moderate": 1.0, "high": 2.0}[activity]
+    frame_shift = {"small": -1.0, "average": 0.0, "large": 1.0}[frame]
+    return max(17.0, min_bmi + frame_shift), min(30.0, max_bmi + frame_shift)
+
+
+def _etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class WeightTables:
+    def __init__(self):
+        heights_m = np.arange(MIN_HEIGHT_MM, MAX_HEIGHT_MM + 1, dtype=np.float64) / 1000
+        height_sq = heights_m * heights_m
+
+        bands = np.array([
+            [[bmi_band(b, a, f) for f in BODY_FRAMES] for a in ACTIVITY_LEVELS] for b in AGE_BANDS
+        ])
+        # shape (age, activity, frame, 2, heights): [..., 0, :] is min, [..., 1, :] is max
+        self.healthy = (bands[..., None] * height_sq).astype(np.float32)
+        self.bmi_bands = bands.astype(np.float32)
+
+        inches_over = np.maximum(0.0, heights_m * 100 / CM_PER_INCH - 60)
+        coefficients = np.array([IDEAL_WEIGHT_FORMULAS[name] for name in IDEAL_WEIGHT_FORMULAS])
+        # shape (formula, sex, heights)
+        self.ideal = (coefficients[..., 0, None] + coefficients[..., 1, None] * inches_over).astype(np.float32)
+        self.ideal_formulas = tuple(IDEAL_WEIGHT_FORMULAS)
+
+        self.json_bytes = self._to_json()
+        self.binary_bytes = self.healthy.astype("<f4").tobytes() + self.ideal.astype("<f4").tobytes()
+        self.json_etag = _etag(self.json_bytes)
+        self.binary_etag = _etag(self.binary_bytes)
+
+    @staticmethod
+    def height_index(height_cm):
+        # inf and NaN cannot be rounded to an int
+        height_mm = int(round(height_cm * 10)) if math.isfinite(height_cm) else None
+        if height_mm is None or not MIN_HEIGHT_MM <= height_mm <= MAX_HEIGHT_MM:
+            raise ValueError(f"Height must be between {MIN_HEIGHT_MM / 10:g} and {MAX_HEIGHT_MM / 10:g} cm")
+        return height_mm - MIN_HEIGHT_MM
+
+    def healthy_range(self, height_cm, age, activity="low", frame="average"):
+        if activity not in ACTIVITY_LEVELS:
+            raise ValueError(f"Unknown activity level: {activity}")
+        if frame not in BODY_FRAMES:
+            raise ValueError(f"Unknown body frame: {frame}")
+        i = self.height_index(height_cm)
+        key = (AGE_BANDS.index(age_band(age)), ACTIVITY_LEVELS.index(activity), BODY_FRAMES.index(frame))
+        min_bmi, max_bmi = self.bmi_bands[key].tolist()
+        low, high = self.healthy[key][:, i].tolist()
+        return {
+            "min_bmi": round(min_bmi, 1),
+            "max_bmi": round(max_bmi, 1),
+            "min_weight": round(low, 1),
+            "max_weight": round(high, 1),
+            "ideal_weight": round((low + high) / 2, 1),
+        }
+
+    def ideal_weights(self, height_cm, sex):
+        # Any case, like the calculators and formulas.ideal_weight
+        sex = str(sex).strip().lower()
+        if sex not in SEXES:
+            raise ValueError(f"Unknown sex value: {sex}")
+        i = self.height_index(height_cm)
+        values = self.ideal[:, SEXES.index(sex), i].tolist()
+        return {name: round(value, 1) for name, value in zip(self.ideal_formulas, values)}
+
+    def layout(self):
+        return {
+            "height_mm": [MIN_HEIGHT_MM, MAX_HEIGHT_MM],
+            "dtype": "float32-le",
+            "healthy": {
+                "shape": list(self.healthy.shape),
+                "axes": ["age_band", "activity", "frame", "bound", "height"],
+                "age_band": list(AGE_BANDS),
+                "activity": list(ACTIVITY_LEVELS),
+                "frame": list(BODY_FRAMES),
+                "bound": ["min", "max"],
+            },
+            "ideal": {
+                "shape": list(self.ideal.shape),
+                "axes": ["formula", "sex", "height"],
+                "formula": list(self.ideal_formulas),
+                "sex": list(SEXES),
+                "offset_bytes": self.healthy.nbytes,
+            },
+        }
+
+    def _to_json(self):
+        payload = {
+            "layout": self.layout(),
+            "healthy": np.round(self.healthy.astype(np.float64), 1).tolist(),
+            "ideal": np.round(self.ideal.astype(np.float64), 1).tolist(),
+        }
+        return json.dumps(payload, separators=(",", ":")).encode()
+
+
+_tables = None
+
+
+def get_tables():
+    global _tables
+    if _tables is None:
+        _tables = WeightTables()
+    return _tables
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteBehindBuffer:
+    """Collects documents in an asyncio queue and writes them with insert_many.
+
+    A batch is flushed once it reaches ``max_batch`` documents or the oldest
+    document has waited ``max_delay`` seconds. ``put`` only blocks when
+    ``max_pending`` documents are already queued (backpressure). ``on_flush``
+    is awaited after each flush that wrote at least one document.
+    """
+
+    def __init__(self, collection, max_batch=500, max_delay=0.05, max_pending=10000, on_flush=None):
+        self.collection = collection
+        self.on_flush = on_flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._task = None
+        self.flushes = 0
+        self.documents_written = 0
+        self.write_errors = 0
+        self.last_flush_size = 0
+        self.last_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, doc):
+        await self._queue.put(doc)
+
+    async def drain(self):
+        """Flush everything queued so far and stop the background task."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def metrics(self):
+        return {
+            "pending": self._queue.qsize(),
+            "flushes": self.flushes,
+            "documents_written": self.documents_written,
+            "write_errors": self.write_errors,
+            "last_flush_size": self.last_flush_size,
+            "last_flush_seconds": round(self.last_flush_seconds, 6),
+            "avg_flush_seconds": round(self.total_flush_seconds / self.flushes, 6) if self.flushes else 0.0,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    doc = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if doc is _STOP:
+                    stopping = True
+                    break
+                batch.append(doc)
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        started = time.perf_counter()
+        written = len(batch)
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            failed = len(e.details.get("writeErrors", []))
+            written -= failed
+            self.write_errors += failed
+            logger.warning("Write-behind flush had %d failed inserts", failed)
+        except PyMongoError:
+            written = 0
+            self.write_errors += len(batch)
+            logger.exception("Write-behind flush of %d documents failed", len(batch))
+        elapsed = time.perf_counter() - started
+        self.flushes += 1
+        self.documents_written += written
+        self.last_flush_size = len(batch)
+        self.last_flush_seconds = elapsed
+        self.total_flush_seconds += elapsed
+        if written and self.on_flush is not None:
+            await self.on_flush(written)
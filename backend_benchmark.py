@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Latency Benchmark Suite for BMI Calculator Website
+Drives the FastAPI app in-process (ASGI transport) at configurable concurrency,
+reports p50/p95/p99 latency and throughput per endpoint, and compares the
+results against a JSON baseline so regressions fail the run.
+
+Runs fully offline: MongoDB is replaced by an in-memory mongomock-motor client
+unless --mongo-url is given. Pass --frontend-url to also load the SPA routes
+over HTTP.
+
+Usage:
+    python backend_benchmark.py                      # compare with baseline
+    python backend_benchmark.py --update-baseline    # record a new baseline
+    python backend_benchmark.py -c 64 -n 2000        # heavier run
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from site_crawler import ROUTES as FRONTEND_ROUTES
+
+ROOT_DIR = Path(__file__).parent
+BACKEND_DIR = ROOT_DIR / "backend"
+DEFAULT_BASELINE = ROOT_DIR / "benchmark_baseline.json"
+
+METABOLIC_BATCH = {
+    "weight_kg": [70.0, 82.5, 58.0, 95.0] * 25,
+    "height_cm": [175.0, 182.0, 162.0, 190.0] * 25,
+    "age": [30, 45, 28, 52] * 25,
+    "sex": ["male", "male", "female", "male"] * 25,
+    "activity_level": ["moderate", "light", "very", "sedentary"] * 25,
+}
+
+# (name, method, path, json body)
+API_ENDPOINTS = [
+    ("GET /api/", "GET", "/api/", None),
+    ("POST /api/status", "POST", "/api/status", {"client_name": "benchmark"}),
+    ("GET /api/status", "GET", "/api/status?limit=100", None),
+    ("POST /api/batch/metabolic", "POST", "/api/batch/metabolic", METABOLIC_BATCH),
+    ("GET /api/formulas/bsa", "GET", "/api/formulas/bsa?weight=70&height=175", None),
+    ("GET /api/tables/healthy-weight", "GET", "/api/tables/healthy-weight?height_cm=175&age=30", None),
+]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def load_app(mongo_url=None):
+    """Import backend/server.py, pointing it at a local Mongo stand-in when offline"""
+    if mongo_url:
+        os.environ["MONGO_URL"] = mongo_url
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "benchmark")
+    # Measure handler latency, not the per-client limiter (every request shares one address)
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    sys.path.insert(0, str(BACKEND_DIR))
+    import server
+
+    if mongo_url is None:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("mongomock-motor is required for offline runs (pip install mongomock-motor) "
+                     "or pass --mongo-url")
+        # Picked up by the app lifespan instead of opening a real connection
+        server.client = AsyncMongoMockClient()
+    return server.app
+
+
+def offline_app():
+    """App factory for multi-worker runs (run.py --factory); each worker gets its own in-memory store"""
+    return load_app()
+
+
+class LatencyBenchmark:
+    def __init__(self, concurrency, requests_per_endpoint, warmup):
+        self.concurrency = concurrency
+        self.requests_per_endpoint = requests_per_endpoint
+        self.warmup = warmup
+        self.results = {}
+
+    async def run_endpoint(self, client, name, method, path, body):
+        latencies = []
+        errors = 0
+        remaining = self.requests_per_endpoint
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        for _ in range(self.warmup):
+            await client.request(method, path, json=body)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        self.results[name] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        }
+        r = self.results[name]
+        print(f"[DONE] {name}: p50={r['p50_ms']}ms p95={r['p95_ms']}ms p99={r['p99_ms']}ms "
+              f"rps={r['rps']} errors={r['errors']}")
+
+    async def run_api(self, app):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                for name, method, path, body in API_ENDPOINTS:
+                    await self.run_endpoint(client, name, method, path, body)
+
+    async def run_frontend(self, frontend_url):
+        limits = httpx.Limits(max_connections=self.concurrency)
+        async with httpx.AsyncClient(base_url=frontend_url, limits=limits, timeout=10) as client:
+            for route in FRONTEND_ROUTES:
+                await self.run_endpoint(client, f"GET {route}", "GET", route, None)
+
+
+def compare_with_baseline(results, baseline, tolerance, slack_ms=0.0):
+    """Return a list of regression messages (empty when within tolerance)"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"[INFO] {name}: no baseline entry")
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            limit = previous[metric] * (1 + tolerance) + slack_ms
+            if current[metric] > limit:
+                regressions.append(f"{name}: {metric} {current[metric]} > {round(limit, 3)} (baseline {previous[metric]})")
+        floor = previous["rps"] * (1 - tolerance)
+        if current["rps"] < floor:
+            regressions.append(f"{name}: rps {current['rps']} < {round(floor, 1)} (baseline {previous['rps']})")
+        if current["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: {current['errors']} errors (baseline {previous.get('errors', 0)})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-n", "--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per endpoint")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--slack-ms", type=float, default=0.5,
+                        help="absolute latency slack added to each limit, absorbs sub-millisecond jitter")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--mongo-url", help="benchmark against a real MongoDB instead of the in-memory stand-in")
+    parser.add_argument("--frontend-url", help="also benchmark the SPA routes served at this URL")
+    parser.add_argument("--output", type=Path, help="write the results JSON here")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("BMI CALCULATOR WEBSITE - LATENCY BENCHMARK")
+    print(f"Concurrency: {args.concurrency}, requests per endpoint: {args.requests}")
+    print("=" * 80)
+
+    app = load_app(args.mongo_url)
+    # server.py configures INFO logging; per-request client logs would swamp the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    bench = LatencyBenchmark(args.concurrency, args.requests, args.warmup)
+    asyncio.run(bench.run_api(app))
+    if args.frontend_url:
+        asyncio.run(bench.run_frontend(args.frontend_url))
+
+    if args.output:
+        args.output.write_text(json.dumps(bench.results, indent=2) + "\n")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(bench.results, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return True
+
+    if not args.baseline.exists():
+        print(f"\n[WARN] No baseline at {args.baseline}; run with --update-baseline to create one")
+        return True
+
+    regressions = compare_with_baseline(bench.results, json.loads(args.baseline.read_text()),
+                                        args.tolerance, args.slack_ms)
+    print("\n" + "=" * 80)
+    print("BASELINE COMPARISON")
+    print("=" * 80)
+    if regressions:
+        print(f"❌ {len(regressions)} regressions beyond {int(args.tolerance * 100)}% tolerance:")
+        for message in regressions:
+            print(f"  - {message}")
+        return False
+    print("✅ All endpoints within tolerance of the baseline.")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
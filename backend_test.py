@@ -9,11 +9,14 @@ import json
 import sys
 from datetime import datetime
 
+from site_crawler import ROUTES, crawl_sync
+
 class BMICalculatorTester:
     def __init__(self):
         self.frontend_url = "http://localhost:3000"
         self.backend_url = "http://localhost:8001"
         self.test_results = []
+        self._pages = None
         
     def log_test(self, test_name, status, message, details=None):
         """Log test results"""
@@ -29,22 +32,26 @@ class BMICalculatorTester:
         if details:
             print(f"    Details: {details}")
     
+    def pages(self):
+        """Crawl every route once; all page checks share this index"""
+        if self._pages is None:
+            self._pages = crawl_sync(self.frontend_url, ROUTES)
+        return self._pages
+
     def test_frontend_server(self):
         """Test if frontend server is running and responding"""
-        try:
-            response = requests.get(self.frontend_url, timeout=5)
-            if response.status_code == 200:
-                self.log_test("Frontend Server", "PASS", 
-                            f"Frontend server responding with status {response.status_code}")
-                return True
-            else:
-                self.log_test("Frontend Server", "FAIL", 
-                            f"Frontend server returned status {response.status_code}")
-                return False
-        except Exception as e:
+        page = self.pages()["/"]
+        if page.ok:
+            self.log_test("Frontend Server", "PASS", 
+                        f"Frontend server responding with status {page.status_code}")
+            return True
+        elif page.error:
             self.log_test("Frontend Server", "FAIL", 
-                        f"Frontend server not accessible: {str(e)}")
-            return False
+                        f"Frontend server not accessible: {page.error}")
+        else:
+            self.log_test("Frontend Server", "FAIL", 
+                        f"Frontend server returned status {page.status_code}")
+        return False
     
     def test_static_files(self):
         """Test static file serving"""
@@ -74,111 +81,74 @@ class BMICalculatorTester:
     
     def test_routing(self):
         """Test all frontend routes"""
-        routes = [
-            "/",
-            "/body-fat-calculator",
-            "/army-body-fat-calculator",
-            "/lean-body-mass-calculator", 
-            "/ideal-weight-calculator",
-            "/healthy-weight-calculator",
-            "/body-type-calculator",
-            "/body-surface-area-calculator",
-            "/calorie-calculator",
-            "/tdee-calculator",
-            "/bmr-calculator",
-            "/macro-calculator",
-            "/carbohydrate-calculator",
-            "/protein-calculator",
-            "/fat-intake-calculator",
-            "/pace-calculator",
-            "/calories-burned-calculator",
-            "/one-rep-max-calculator",
-            "/target-heart-rate-calculator",
-            "/privacy-policy", 
-            "/terms-conditions",
-            "/contact-us"
-        ]
-        
-        for route in routes:
-            try:
-                response = requests.get(f"{self.frontend_url}{route}", timeout=5)
-                if response.status_code == 200:
-                    self.log_test(f"Route {route}", "PASS", 
-                                f"Route accessible with status {response.status_code}")
-                else:
-                    self.log_test(f"Route {route}", "FAIL", 
-                                f"Route returned status {response.status_code}")
-            except Exception as e:
+        for route, page in self.pages().items():
+            if page.ok:
+                self.log_test(f"Route {route}", "PASS", 
+                            f"Route accessible with status {page.status_code}")
+            elif page.error:
                 self.log_test(f"Route {route}", "FAIL", 
-                            f"Error accessing route: {str(e)}")
+                            f"Error accessing route: {page.error}")
+            else:
+                self.log_test(f"Route {route}", "FAIL", 
+                            f"Route returned status {page.status_code}")
     
     def test_seo_meta_tags(self):
         """Test SEO meta tags in HTML head"""
-        try:
-            response = requests.get(self.frontend_url, timeout=5)
-            if response.status_code == 200:
-                html_content = response.text
-                
-                # Check for essential SEO meta tags
-                seo_checks = [
-                    ('<title>', 'Title tag'),
-                    ('meta name="description"', 'Meta description'),
-                    ('meta name="keywords"', 'Meta keywords'),
-                    ('meta property="og:title"', 'Open Graph title'),
-                    ('meta property="og:description"', 'Open Graph description'),
-                    ('meta property="twitter:title"', 'Twitter Card title'),
-                    ('link rel="canonical"', 'Canonical URL')
-                ]
-                
-                for tag, description in seo_checks:
-                    if tag in html_content:
-                        self.log_test(f"SEO Meta Tag - {description}", "PASS", 
-                                    f"{description} found in HTML")
-                    else:
-                        self.log_test(f"SEO Meta Tag - {description}", "FAIL", 
-                                    f"{description} missing from HTML")
-            else:
-                self.log_test("SEO Meta Tags", "FAIL", 
-                            f"Could not retrieve HTML content, status: {response.status_code}")
-        except Exception as e:
+        page = self.pages()["/"]
+        if not page.ok:
             self.log_test("SEO Meta Tags", "FAIL", 
-                        f"Error checking SEO meta tags: {str(e)}")
+                        f"Could not retrieve HTML content: {page.error or page.status_code}")
+            return
+        
+        # Check for essential SEO meta tags
+        seo_checks = [
+            (page.title is not None, 'Title tag'),
+            (page.has_meta('description'), 'Meta description'),
+            (page.has_meta('keywords'), 'Meta keywords'),
+            (page.has_meta('og:title'), 'Open Graph title'),
+            (page.has_meta('og:description'), 'Open Graph description'),
+            (page.has_meta('twitter:title'), 'Twitter Card title'),
+            ('canonical' in page.links, 'Canonical URL')
+        ]
+        
+        for found, description in seo_checks:
+            if found:
+                self.log_test(f"SEO Meta Tag - {description}", "PASS", 
+                            f"{description} found in HTML")
+            else:
+                self.log_test(f"SEO Meta Tag - {description}", "FAIL", 
+                            f"{description} missing from HTML")
     
     def test_structured_data(self):
         """Test JSON-LD structured data"""
-        try:
-            response = requests.get(self.frontend_url, timeout=5)
-            if response.status_code == 200:
-                html_content = response.text
-                
-                # Check for JSON-LD structured data
-                if 'application/ld+json' in html_content:
-                    self.log_test("Structured Data", "PASS", 
-                                "JSON-LD structured data found in HTML")
-                    
-                    # Check for specific schema types
-                    schema_checks = [
-                        ('MedicalRiskCalculator', 'Medical Risk Calculator schema'),
-                        ('FAQPage', 'FAQ Page schema'),
-                        ('WebApplication', 'Web Application schema')
-                    ]
-                    
-                    for schema_type, description in schema_checks:
-                        if schema_type in html_content:
-                            self.log_test(f"Schema - {description}", "PASS", 
-                                        f"{description} found in structured data")
-                        else:
-                            self.log_test(f"Schema - {description}", "WARN", 
-                                        f"{description} not found in structured data")
-                else:
-                    self.log_test("Structured Data", "FAIL", 
-                                "No JSON-LD structured data found")
-            else:
-                self.log_test("Structured Data", "FAIL", 
-                            f"Could not retrieve HTML content, status: {response.status_code}")
-        except Exception as e:
+        page = self.pages()["/"]
+        if not page.ok:
+            self.log_test("Structured Data", "FAIL", 
+                        f"Could not retrieve HTML content: {page.error or page.status_code}")
+            return
+        
+        if not page.json_ld:
             self.log_test("Structured Data", "FAIL", 
-                        f"Error checking structured data: {str(e)}")
+                        "No JSON-LD structured data found")
+            return
+        
+        self.log_test("Structured Data", "PASS", 
+                    "JSON-LD structured data found in HTML")
+        
+        # Check for specific schema types
+        schema_checks = [
+            ('MedicalRiskCalculator', 'Medical Risk Calculator schema'),
+            ('FAQPage', 'FAQ Page schema'),
+            ('WebApplication', 'Web Application schema')
+        ]
+        
+        for schema_type, description in schema_checks:
+            if schema_type in page.schema_types:
+                self.log_test(f"Schema - {description}", "PASS", 
+                            f"{description} found in structured data")
+            else:
+                self.log_test(f"Schema - {description}", "WARN", 
+                            f"{description} not found in structured data")
     
     def test_backend_api_endpoints(self):
         """Test that backend API endpoints are NOT accessible (as expected for frontend-only app)"""
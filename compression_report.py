@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Bytes-on-the-wire Report for response and static compression
+API: requests each endpoint in-process (in-memory MongoDB, seeded with
+heartbeats) with Accept-Encoding identity, gzip and br, and reports the
+response bytes actually sent.
+Frontend (with --dist): for each route, the prerendered shell plus every
+script and stylesheet it references, uncompressed vs the .gz / .br
+siblings listed in precompress-manifest.json.
+
+Usage:
+    python compression_report.py [--dist frontend/build]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+
+import httpx
+
+from backend_benchmark import load_app
+from prerender import APP_PATH, parse_routes
+from prerender_benchmark import ASSET_RE
+
+ENCODINGS = ("identity", "gzip", "br")
+
+API_REQUESTS = [
+    ("GET", "/api/", None),
+    ("GET", "/api/status?limit=200", None),
+    ("GET", "/api/pace/vdot-table", None),
+    ("GET", "/api/tables/weight-ranges.json", None),
+    ("GET", "/api/activities/search?q=running&limit=50", None),
+    ("POST", "/api/batch/metabolic", {
+        "weight_kg": [70.0 + i % 30 for i in range(1000)],
+        "height_cm": [160.0 + i % 40 for i in range(1000)],
+        "age": [20.0 + i % 50 for i in range(1000)],
+        "sex": ["male" if i % 2 else "female" for i in range(1000)],
+        "activity_level": ["moderate"] * 1000,
+    }),
+    ("GET", "/api/metrics", None),
+]
+
+
+async def wire_bytes(client, method, path, body, encoding):
+    async with client.stream(method, path, json=body, headers={"Accept-Encoding": encoding}) as response:
+        size = 0
+        async for chunk in response.aiter_raw():
+            size += len(chunk)
+        return response.status_code, response.headers.get("content-encoding", "identity"), size
+
+
+async def api_report():
+    app = load_app()
+    rows = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for i in range(200):
+                await client.post("/api/status", json={"client_name": f"client-{i % 7}"})
+            for method, path, body in API_REQUESTS:
+                sizes = {}
+                for encoding in ENCODINGS:
+                    status, applied, size = await wire_bytes(client, method, path, body, encoding)
+                    sizes[encoding] = (size, applied, status)
+                rows.append((f"{method} {path.split('?')[0]}", sizes))
+    return rows
+
+
+def static_report(dist):
+    with open(os.path.join(dist, "precompress-manifest.json"), "r", encoding="utf-8") as f:
+        files = json.load(f)["files"]
+    with open(APP_PATH, "r", encoding="utf-8") as f:
+        pages = parse_routes(f.read())
+
+    def size_of(relative, encoding):
+        entry = files.get(relative)
+        if entry is None:
+            return os.path.getsize(os.path.join(dist, relative))
+        return entry["sizes"].get(encoding, entry["size"]) if encoding != "identity" else entry["size"]
+
+    rows = []
+    for page in pages:
+        shell = "index.html" if page.path == "/" else f"{page.slug}/index.html"
+        if not os.path.exists(os.path.join(dist, shell)):
+            shell = "index.html"
+        with open(os.path.join(dist, shell), "r", encoding="utf-8") as f:
+            assets = [asset.lstrip("/") for asset in ASSET_RE.findall(f.read())]
+        sizes = {encoding: sum(size_of(r, encoding) for r in [shell] + assets) for encoding in ENCODINGS}
+        rows.append((page.path, sizes))
+    return rows
+
+
+def kib(size):
+    return f"{size / 1024:,.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dist", help="built frontend with precompress-manifest.json")
+    args = parser.parse_args()
+
+    print("API responses (KiB on the wire)\n")
+    print("| Endpoint | identity | gzip | br | br saving |")
+    print("|---|---|---|---|---|")
+    for name, sizes in asyncio.run(api_report()):
+        identity, gz, br = (sizes[e][0] for e in ENCODINGS)
+        note = "" if sizes["br"][1] == "br" else f" (sent {sizes['br'][1]})"
+        print(f"| {name} | {kib(identity)} | {kib(gz)} | {kib(br)}{note} | {1 - br / identity:.0%} |")
+
+    if args.dist:
+        print("\nFrontend routes: shell + referenced assets (KiB on the wire)\n")
+        print("| Route | identity | gzip | br | br saving |")
+        print("|---|---|---|---|---|")
+        for route, sizes in static_report(args.dist):
+            print(f"| {route} | {kib(sizes['identity'])} | {kib(sizes['gzip'])} | {kib(sizes['br'])} | "
+                  f"{1 - sizes['br'] / sizes['identity']:.0%} |")
+
+
+if __name__ == "__main__":
+    main()
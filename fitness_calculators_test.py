@@ -13,10 +13,20 @@ import json
 import sys
 from datetime import datetime
 
+from site_crawler import crawl_sync
+
+FITNESS_CALCULATORS = [
+    ("/pace-calculator", "Pace Calculator"),
+    ("/calories-burned-calculator", "Calories Burned Calculator"),
+    ("/one-rep-max-calculator", "One Rep Max Calculator"),
+    ("/target-heart-rate-calculator", "Target Heart Rate Calculator")
+]
+
 class FitnessCalculatorsTester:
     def __init__(self):
         self.frontend_url = "http://localhost:3000"
         self.test_results = []
+        self._pages = None
         
     def log_test(self, test_name, status, message, details=None):
         """Log test results"""
@@ -32,126 +42,95 @@ class FitnessCalculatorsTester:
         if details:
             print(f"    Details: {details}")
     
+    def pages(self):
+        """Crawl the fitness calculator routes once; all page checks share this index"""
+        if self._pages is None:
+            self._pages = crawl_sync(self.frontend_url, [route for route, _ in FITNESS_CALCULATORS])
+        return self._pages
+    
     def test_fitness_calculator_routes(self):
         """Test all 4 fitness calculator routes"""
-        fitness_calculators = [
-            ("/pace-calculator", "Pace Calculator"),
-            ("/calories-burned-calculator", "Calories Burned Calculator"),
-            ("/one-rep-max-calculator", "One Rep Max Calculator"),
-            ("/target-heart-rate-calculator", "Target Heart Rate Calculator")
-        ]
-        
-        for route, name in fitness_calculators:
-            try:
-                response = requests.get(f"{self.frontend_url}{route}", timeout=10)
-                if response.status_code == 200:
-                    # Check if the page contains the calculator component
-                    html_content = response.text
-                    
-                    # Basic checks for calculator presence
-                    calculator_indicators = [
-                        'calculator',
-                        'calculate',
-                        'input',
-                        'button'
-                    ]
-                    
-                    found_indicators = [indicator for indicator in calculator_indicators if indicator.lower() in html_content.lower()]
-                    
-                    if len(found_indicators) >= 3:
-                        self.log_test(f"{name} Route", "PASS", 
-                                    f"Route accessible and contains calculator elements")
-                    else:
-                        self.log_test(f"{name} Route", "WARN", 
-                                    f"Route accessible but may be missing calculator elements")
-                else:
-                    self.log_test(f"{name} Route", "FAIL", 
-                                f"Route returned status {response.status_code}")
-            except Exception as e:
+        pages = self.pages()
+        for route, name in FITNESS_CALCULATORS:
+            page = pages[route]
+            if page.error:
                 self.log_test(f"{name} Route", "FAIL", 
-                            f"Error accessing route: {str(e)}")
+                            f"Error accessing route: {page.error}")
+                continue
+            if not page.ok:
+                self.log_test(f"{name} Route", "FAIL", 
+                            f"Route returned status {page.status_code}")
+                continue
+            
+            # Basic checks for calculator presence
+            calculator_indicators = [
+                page.mentions('calculator'),
+                page.mentions('calculate'),
+                'input' in page.tags,
+                'button' in page.tags
+            ]
+            
+            if sum(calculator_indicators) >= 3:
+                self.log_test(f"{name} Route", "PASS", 
+                            f"Route accessible and contains calculator elements")
+            else:
+                self.log_test(f"{name} Route", "WARN", 
+                            f"Route accessible but may be missing calculator elements")
     
     def test_seo_optimization(self):
         """Test SEO optimization for fitness calculators"""
-        fitness_calculators = [
-            ("/pace-calculator", "Pace Calculator"),
-            ("/calories-burned-calculator", "Calories Burned Calculator"),
-            ("/one-rep-max-calculator", "One Rep Max Calculator"),
-            ("/target-heart-rate-calculator", "Target Heart Rate Calculator")
-        ]
-        
-        for route, name in fitness_calculators:
-            try:
-                response = requests.get(f"{self.frontend_url}{route}", timeout=10)
-                if response.status_code == 200:
-                    html_content = response.text
-                    
-                    # Check for SEO elements
-                    seo_checks = [
-                        ('<title>', 'Title tag'),
-                        ('meta name="description"', 'Meta description'),
-                        ('meta name="keywords"', 'Meta keywords'),
-                        ('meta property="og:title"', 'Open Graph title'),
-                        ('application/ld+json', 'Structured data')
-                    ]
-                    
-                    passed_checks = 0
-                    for tag, description in seo_checks:
-                        if tag in html_content:
-                            passed_checks += 1
-                    
-                    if passed_checks >= 4:
-                        self.log_test(f"{name} SEO", "PASS", 
-                                    f"SEO optimization present ({passed_checks}/5 elements found)")
-                    else:
-                        self.log_test(f"{name} SEO", "WARN", 
-                                    f"SEO optimization incomplete ({passed_checks}/5 elements found)")
-                else:
-                    self.log_test(f"{name} SEO", "FAIL", 
-                                f"Could not check SEO, status: {response.status_code}")
-            except Exception as e:
+        pages = self.pages()
+        for route, name in FITNESS_CALCULATORS:
+            page = pages[route]
+            if not page.ok:
                 self.log_test(f"{name} SEO", "FAIL", 
-                            f"Error checking SEO: {str(e)}")
+                            f"Could not check SEO: {page.error or page.status_code}")
+                continue
+            
+            # Check for SEO elements
+            seo_checks = [
+                page.title is not None,
+                page.has_meta('description'),
+                page.has_meta('keywords'),
+                page.has_meta('og:title'),
+                bool(page.json_ld)
+            ]
+            passed_checks = sum(seo_checks)
+            
+            if passed_checks >= 4:
+                self.log_test(f"{name} SEO", "PASS", 
+                            f"SEO optimization present ({passed_checks}/5 elements found)")
+            else:
+                self.log_test(f"{name} SEO", "WARN", 
+                            f"SEO optimization incomplete ({passed_checks}/5 elements found)")
     
     def test_responsive_design_indicators(self):
         """Test for responsive design indicators in HTML"""
-        fitness_calculators = [
-            ("/pace-calculator", "Pace Calculator"),
-            ("/calories-burned-calculator", "Calories Burned Calculator"),
-            ("/one-rep-max-calculator", "One Rep Max Calculator"),
-            ("/target-heart-rate-calculator", "Target Heart Rate Calculator")
-        ]
-        
-        for route, name in fitness_calculators:
-            try:
-                response = requests.get(f"{self.frontend_url}{route}", timeout=10)
-                if response.status_code == 200:
-                    html_content = response.text
-                    
-                    # Check for responsive design indicators
-                    responsive_indicators = [
-                        'viewport',
-                        'grid-cols',
-                        'sm:',
-                        'md:',
-                        'lg:',
-                        'responsive'
-                    ]
-                    
-                    found_indicators = [indicator for indicator in responsive_indicators if indicator in html_content]
-                    
-                    if len(found_indicators) >= 3:
-                        self.log_test(f"{name} Responsive Design", "PASS", 
-                                    f"Responsive design indicators present ({len(found_indicators)}/6 found)")
-                    else:
-                        self.log_test(f"{name} Responsive Design", "WARN", 
-                                    f"Limited responsive design indicators ({len(found_indicators)}/6 found)")
-                else:
-                    self.log_test(f"{name} Responsive Design", "FAIL", 
-                                f"Could not check responsive design, status: {response.status_code}")
-            except Exception as e:
+        pages = self.pages()
+        for route, name in FITNESS_CALCULATORS:
+            page = pages[route]
+            if not page.ok:
                 self.log_test(f"{name} Responsive Design", "FAIL", 
-                            f"Error checking responsive design: {str(e)}")
+                            f"Could not check responsive design: {page.error or page.status_code}")
+                continue
+            
+            # Check for responsive design indicators
+            responsive_indicators = [
+                page.has_meta('viewport'),
+                page.has_class_prefix('grid-cols'),
+                page.has_class_prefix('sm:'),
+                page.has_class_prefix('md:'),
+                page.has_class_prefix('lg:'),
+                page.mentions('responsive')
+            ]
+            found = sum(responsive_indicators)
+            
+            if found >= 3:
+                self.log_test(f"{name} Responsive Design", "PASS", 
+                            f"Responsive design indicators present ({found}/6 found)")
+            else:
+                self.log_test(f"{name} Responsive Design", "WARN", 
+                            f"Limited responsive design indicators ({found}/6 found)")
     
     def test_static_assets_serving(self):
         """Test that static assets are served correctly"""
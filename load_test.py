@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Burst Load Test for the rate limiter and admission gate
+Drives the FastAPI app in-process (ASGI transport, one transport per client
+address) with the in-memory Mongo stand-in and checks two scenarios:
+
+1. Noisy neighbour: one client loops on POST /api/status as fast as it can
+   while a few well-behaved clients send a heartbeat every 200 ms. The noisy
+   client must be answered with 429 + Retry-After, the others never.
+2. Burst: many clients hit uncached GET /api/status pages at once. Requests
+   beyond MONGO_ADMISSION_LIMIT must be shed with 503 + Retry-After.
+
+The in-memory stand-in answers queries instantly, so offline runs add
+--mongo-latency-ms to every cursor read to get requests overlapping as they
+would against a real server. Pass --mongo-url to use a real MongoDB instead.
+
+Usage:
+    python load_test.py [-d 5] [--burst 200] [--admission-limit 16] [--mongo-url URL]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from backend_benchmark import load_app, percentile
+
+
+async def noisy_neighbour(app, duration, noisy_concurrency, polite_clients):
+    codes = {}
+
+    async def hammer(client, name):
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            response = await client.post("/api/status", json={"client_name": name})
+            codes.setdefault(name, Counter())[response.status_code] += 1
+            if response.status_code == 429 and "retry-after" not in response.headers:
+                codes[name]["429 without Retry-After"] += 1
+
+    async def heartbeat(client, name):
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            response = await client.post("/api/status", json={"client_name": name})
+            codes.setdefault(name, Counter())[response.status_code] += 1
+            await asyncio.sleep(0.2)
+
+    clients = []
+    tasks = []
+    noisy = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=("10.0.0.1", 1000)), base_url="http://test")
+    clients.append(noisy)
+    tasks += [hammer(noisy, "noisy") for _ in range(noisy_concurrency)]
+    for i in range(polite_clients):
+        polite = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(f"10.0.1.{i}", 1000)),
+                                   base_url="http://test")
+        clients.append(polite)
+        tasks.append(heartbeat(polite, f"polite-{i}"))
+    await asyncio.gather(*tasks)
+    for client in clients:
+        await client.aclose()
+    return codes
+
+
+async def burst(app, requests):
+    latencies = []
+    codes = Counter()
+    missing_retry_after = 0
+
+    async def one(i):
+        nonlocal missing_retry_after
+        transport = httpx.ASGITransport(app=app, client=(f"10.1.{i // 250}.{i % 250}", 1000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = time.perf_counter()
+            # A distinct client_name per request misses the response cache and reaches MongoDB
+            response = await client.get(f"/api/status?client_name=burst-{i}")
+            latencies.append(time.perf_counter() - started)
+            codes[response.status_code] += 1
+            if response.status_code == 503 and "retry-after" not in response.headers:
+                missing_retry_after += 1
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    latencies.sort()
+    return codes, missing_retry_after, latencies
+
+
+def add_mock_latency(seconds):
+    """Delay every mongomock cursor read, standing in for a network round trip"""
+    from mongomock_motor import AsyncCursor
+
+    to_list = AsyncCursor.to_list
+
+    async def slow_to_list(self, *args, **kwargs):
+        await asyncio.sleep(seconds)
+        return await to_list(self, *args, **kwargs)
+
+    AsyncCursor.to_list = slow_to_list
+
+
+async def run(args):
+    app = load_app(args.mongo_url)
+    if args.mongo_url is None and args.mongo_latency_ms > 0:
+        add_mock_latency(args.mongo_latency_ms / 1000)
+    ok = True
+    async with app.router.lifespan_context(app):
+        print("Scenario 1: noisy neighbour on POST /api/status")
+        codes = await noisy_neighbour(app, args.duration, args.noisy_concurrency, args.polite_clients)
+        for name, counter in sorted(codes.items()):
+            print(f"  {name:<10} {dict(counter)}")
+        if not codes["noisy"][429]:
+            print("  ❌ noisy client was never rate limited")
+            ok = False
+        if codes["noisy"]["429 without Retry-After"]:
+            print("  ❌ 429 responses without Retry-After")
+            ok = False
+        for name, counter in codes.items():
+            if name != "noisy" and set(counter) != {200}:
+                print(f"  ❌ {name} was affected: {dict(counter)}")
+                ok = False
+
+        print(f"\nScenario 2: {args.burst} concurrent uncached GET /api/status, "
+              f"admission limit {os.environ['MONGO_ADMISSION_LIMIT']}")
+        codes, missing_retry_after, latencies = await burst(app, args.burst)
+        print(f"  responses {dict(codes)}, p50={percentile(latencies, 50) * 1000:.1f}ms "
+              f"p99={percentile(latencies, 99) * 1000:.1f}ms")
+        if not codes[503]:
+            print("  ❌ nothing was shed")
+            ok = False
+        if missing_retry_after:
+            print(f"  ❌ {missing_retry_after} 503 responses without Retry-After")
+            ok = False
+        if set(codes) - {200, 503}:
+            print("  ❌ unexpected status codes")
+            ok = False
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            exposition = (await client.get("/api/metrics")).text
+        print("\nLimiter counters:")
+        for line in exposition.splitlines():
+            if line.startswith("http_admission_decisions_total{") and "/api/metrics" not in line:
+                print(f"  {line}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-d", "--duration", type=float, default=5.0, help="seconds for the noisy-neighbour scenario")
+    parser.add_argument("--noisy-concurrency", type=int, default=8,
+                        help="parallel loops of the noisy client (kept below the admission limit)")
+    parser.add_argument("--polite-clients", type=int, default=4)
+    parser.add_argument("--burst", type=int, default=200, help="concurrent requests in the burst scenario")
+    parser.add_argument("--admission-limit", type=int, default=16)
+    parser.add_argument("--mongo-latency-ms", type=float, default=20.0, help="simulated query latency offline")
+    parser.add_argument("--mongo-url", help="run against a real MongoDB instead of the in-memory stand-in")
+    args = parser.parse_args()
+
+    # Must be set before server.py is imported
+    os.environ["RATE_LIMIT_ENABLED"] = "1"
+    os.environ["MONGO_ADMISSION_LIMIT"] = str(args.admission_limit)
+    os.environ.setdefault("STATUS_ROLLUP_INTERVAL", "0")
+
+    ok = asyncio.run(run(args))
+    print("\n✅ Limiter and admission gate behaved as expected." if ok else "\n❌ Load test failed.")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
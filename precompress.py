@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Build-time Precompression for the static bundle
+Writes .br and .gz siblings next to every compressible file in the build at
+maximum quality (it runs once per build, not per request) and a
+content-hashed manifest, precompress-manifest.json, from which the server
+picks a sibling without probing the filesystem. Files whose hash matches the
+previous manifest keep their siblings; a sibling that would not be smaller
+than the original is not written. Compression runs on a process pool.
+
+Brotli needs the `brotli` package; without it only .gz siblings are written.
+
+Usage:
+    python precompress.py [--dist frontend/build] [--min-size 256] [--force]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DIST_DIR = "frontend/build"
+MANIFEST_NAME = "precompress-manifest.json"
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".xml", ".txt", ".map", ".ico", ".webmanifest"}
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def find_files(dist, min_size):
+    for directory, _, filenames in os.walk(dist):
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            if (os.path.splitext(filename)[1] in COMPRESSIBLE_EXTENSIONS
+                    and filename != MANIFEST_NAME and os.path.getsize(path) >= min_size):
+                yield os.path.relpath(path, dist).replace(os.sep, "/")
+
+
+def compress_file(dist, relative):
+    """Write the siblings of one file (runs in a worker process)"""
+    path = os.path.join(dist, relative)
+    with open(path, "rb") as f:
+        data = f.read()
+    encoded = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        mode = brotli.MODE_TEXT if not relative.endswith(".ico") else brotli.MODE_GENERIC
+        encoded["br"] = brotli.compress(data, quality=11, mode=mode)
+    variants, sizes = {}, {}
+    for encoding, body in encoded.items():
+        if len(body) >= len(data):
+            continue
+        sibling = os.path.basename(relative) + SUFFIXES[encoding]
+        with open(os.path.join(os.path.dirname(path), sibling), "wb") as f:
+            f.write(body)
+        variants[encoding] = sibling
+        sizes[encoding] = len(body)
+    return relative, {
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "size": len(data),
+        "variants": variants,
+        "sizes": sizes,
+    }
+
+
+def load_manifest(dist):
+    try:
+        with open(os.path.join(dist, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def up_to_date(dist, relative, entry):
+    if entry is None:
+        return False
+    path = os.path.join(dist, relative)
+    with open(path, "rb") as f:
+        if hashlib.sha256(f.read()).hexdigest() != entry["sha256"]:
+            return False
+    directory = os.path.dirname(path)
+    return all(os.path.exists(os.path.join(directory, sibling)) for sibling in entry["variants"].values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dist", default=DIST_DIR)
+    parser.add_argument("--min-size", type=int, default=256, help="smaller files are left alone")
+    parser.add_argument("--force", action="store_true", help="ignore the manifest")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dist):
+        sys.exit(f"{args.dist} not found; run `yarn build` in frontend/ first")
+    if brotli is None:
+        print("⚠️  brotli is not installed (pip install brotli); writing .gz siblings only")
+
+    previous = {} if args.force else load_manifest(args.dist)
+    files = {}
+    pending = []
+    for relative in find_files(args.dist, args.min_size):
+        if up_to_date(args.dist, relative, previous.get(relative)):
+            files[relative] = previous[relative]
+        else:
+            pending.append(relative)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for relative, entry in pool.map(compress_file, [args.dist] * len(pending), pending):
+            files[relative] = entry
+    elapsed = time.perf_counter() - started
+
+    with open(os.path.join(args.dist, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "files": dict(sorted(files.items()))}, f, indent=2)
+
+    raw = sum(entry["size"] for entry in files.values())
+    print(f"Precompressed {len(pending)} files ({len(files) - len(pending)} unchanged) in {elapsed:.2f}s")
+    for encoding in ("br", "gzip"):
+        encoded = sum(entry["sizes"].get(encoding, entry["size"]) for entry in files.values())
+        if raw:
+            print(f"  {encoding:<5} {raw / 1024:,.1f} KiB -> {encoded / 1024:,.1f} KiB ({encoded / raw:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Build-time Prerender for every route in App.jsx
+Runs after `yarn build`. For each <Route> it reads the page's JSX source,
+takes the <h1>, the intro paragraph and any `structuredData` literal, and
+writes a static HTML shell (the built index.html with that route's <title>,
+meta description, Open Graph / Twitter tags, canonical link and JSON-LD) to
+<dist>/<route>/index.html. The SPA still boots from the shell as before, but
+crawlers and first paint no longer wait for JavaScript. Also writes
+<dist>/sitemap.xml covering every route.
+
+Rendering is keyed on a hash of the page source, the built template and this
+script's rules; a route whose hash matches the manifest from the previous run
+is copied from the cache instead of being rendered again.
+
+Usage:
+    python prerender.py                      # frontend/build, after `yarn build`
+    python prerender.py --dist path/to/dist --force
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from xml.etree import ElementTree
+
+SITE_URL = "https://toxictools.in"
+SITE_NAME = "Advanced BMI Calculator"
+APP_PATH = "frontend/src/App.jsx"
+SRC_DIR = "frontend/src"
+DIST_DIR = "frontend/build"
+CACHE_DIR = "frontend/node_modules/.cache/prerender"
+PUBLIC_SITEMAP = "frontend/public/sitemap.xml"
+
+# Bump when the rendering rules change so cached shells are rebuilt
+RENDER_VERSION = "1"
+MAX_DESCRIPTION = 160
+
+IMPORT_RE = re.compile(r'import\s+(\w+)\s+from\s+"\./(pages/\w+)(?:\.jsx)?";')
+ROUTE_RE = re.compile(r'<Route\s+path="([^"]+)"\s+element=\{<PageTransition[^>]*><(\w+)\s*/>')
+H1_RE = re.compile(r"<h1[^>]*>(.*?)</h1>", re.S)
+P_RE = re.compile(r"<p[^>]*>(.*?)</p>", re.S)
+STRUCTURED_DATA_RE = re.compile(r"const\s+structuredData\s*=\s*\{")
+LD_JSON_RE = re.compile(r'(?:<!--[^>]*-->\s*)?<script type="application/ld\+json">.*?</script>\s*', re.S)
+
+
+class RoutePage:
+    def __init__(self, path, component, source_path):
+        self.path = path
+        self.component = component
+        self.source_path = source_path
+
+    @property
+    def slug(self):
+        return self.path.strip("/") or "index"
+
+    @property
+    def url(self):
+        return SITE_URL + self.path if self.path != "/" else SITE_URL + "/"
+
+
+def parse_routes(app_source, src_dir=SRC_DIR):
+    """Routes declared in App.jsx with the page module each one renders"""
+    modules = dict(IMPORT_RE.findall(app_source))
+    routes = []
+    for path, component in ROUTE_RE.findall(app_source):
+        if component not in modules:
+            raise ValueError(f"Route {path} renders {component}, which is not imported from ./pages")
+        routes.append(RoutePage(path, component, os.path.join(src_dir, modules[component] + ".jsx")))
+    return routes
+
+
+def jsx_text(fragment):
+    """Visible text of a JSX fragment: expressions and tags dropped, whitespace collapsed"""
+    text = re.sub(r"\{[^{}]*\}", " ", fragment)
+    text = re.sub(r"<[^>]+>", " ", text)
+    return html.unescape(" ".join(text.split()))
+
+
+def truncate(text, limit=MAX_DESCRIPTION):
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1].rsplit(" ", 1)[0].rstrip(",.;:") + "…"
+
+
+def object_literal(source, start):
+    """The {...} literal opening at ``start``, skipping braces inside strings"""
+    depth = 0
+    quote = None
+    i = start
+    while i < len(source):
+        ch = source[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'`":
+            quote = ch
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return source[start:i + 1]
+        i += 1
+    return None
+
+
+def structured_data(source):
+    """The page's `const structuredData = {...}` when it is plain JSON (quoted keys, no expressions)"""
+    match = STRUCTURED_DATA_RE.search(source)
+    if not match:
+        return None
+    literal = object_literal(source, match.end() - 1)
+    if literal is None:
+        return None
+    try:
+        return json.loads(re.sub(r",\s*([}\]])", r"\1", literal))
+    except ValueError:
+        return None
+
+
+def page_meta(page, source):
+    h1 = H1_RE.search(source)
+    if not h1:
+        return None
+    heading = jsx_text(h1.group(1))
+    intro = P_RE.search(source, h1.end())
+    description = truncate(jsx_text(intro.group(1))) if intro else heading
+    data = structured_data(source)
+    if data is None:
+        data = {
+            "@context": "https://schema.org",
+            "@type": "WebApplication" if page.path.endswith("-calculator") else "WebPage",
+            "name": heading,
+            "description": description,
+        }
+        if data["@type"] == "WebApplication":
+            data.update({
+                "applicationCategory": "HealthApplication",
+                "operatingSystem": "Any",
+                "offers": {"@type": "Offer", "price": "0", "priceCurrency": "USD"},
+            })
+    data["url"] = page.url
+    return {
+        "heading": heading,
+        "title": f"{heading} | {SITE_NAME}",
+        "description": description,
+        "json_ld": data,
+    }
+
+
+def set_meta(document, key, value):
+    attr = "property" if key.startswith(("og:", "twitter:")) else "name"
+    pattern = re.compile(rf'<meta\s+{attr}="{re.escape(key)}"\s+content="[^"]*"\s*/?>')
+    tag = f'<meta {attr}="{key}" content="{html.escape(value)}" />'
+    if pattern.search(document):
+        return pattern.sub(lambda _: tag, document, count=1)
+    return document.replace("</head>", f"    {tag}\n    </head>", 1)
+
+
+def render_shell(template, page, meta):
+    document = LD_JSON_RE.sub("", template)
+    document = re.sub(r"<title>.*?</title>", lambda _: f"<title>{html.escape(meta['title'])}</title>",
+                      document, count=1, flags=re.S)
+    for key, value in (
+        ("title", meta["title"]),
+        ("description", meta["description"]),
+        ("og:url", page.url),
+        ("og:title", meta["title"]),
+        ("og:description", meta["description"]),
+        ("twitter:url", page.url),
+        ("twitter:title", meta["title"]),
+        ("twitter:description", meta["description"]),
+    ):
+        document = set_meta(document, key, value)
+    document = re.sub(r'<link rel="canonical" href="[^"]*"\s*/?>',
+                      lambda _: f'<link rel="canonical" href="{page.url}" />', document, count=1)
+    # "</" would end the script element early
+    json_ld = json.dumps(meta["json_ld"], ensure_ascii=False).replace("</", "<\\/")
+    document = document.replace(
+        "</head>", f'    <script type="application/ld+json">{json_ld}</script>\n    </head>', 1)
+    # Static content for crawlers and first paint; createRoot replaces it on boot
+    fallback = (f'<main><h1>{html.escape(meta["heading"])}</h1>'
+                f'<p>{html.escape(meta["description"])}</p></main>')
+    return document.replace('<div id="root"></div>', f'<div id="root">{fallback}</div>', 1)
+
+
+def render_hash(template_bytes, source_bytes):
+    digest = hashlib.sha256()
+    for part in (RENDER_VERSION.encode(), SITE_URL.encode(), template_bytes, source_bytes):
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+
+def prerender_route(page, template, template_bytes, dist, cache_dir, cached_hash):
+    """Render (or reuse) one route's shell; runs on the thread pool"""
+    with open(page.source_path, "rb") as f:
+        source_bytes = f.read()
+    digest = render_hash(template_bytes, source_bytes)
+    target = os.path.join(dist, page.slug, "index.html")
+    cached = os.path.join(cache_dir, page.slug + ".html")
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if cached_hash == digest and os.path.exists(cached):
+        shutil.copyfile(cached, target)
+        return {"route": page.path, "hash": digest, "state": "cached"}
+
+    meta = page_meta(page, source_bytes.decode("utf-8"))
+    if meta is None:
+        return {"route": page.path, "hash": None, "state": "skipped (no <h1> in page)"}
+    shell = render_shell(template, page, meta)
+    with open(cached, "w", encoding="utf-8") as f:
+        f.write(shell)
+    shutil.copyfile(cached, target)
+    return {"route": page.path, "hash": digest, "state": "rendered"}
+
+
+def last_modified(path):
+    """Date of the last commit touching ``path``, or today outside a checkout"""
+    try:
+        out = subprocess.run(["git", "log", "-1", "--format=%cs", "--", path],
+                             capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        out = ""
+    return out or date.today().isoformat()
+
+
+def sitemap_hints(path=PUBLIC_SITEMAP):
+    """changefreq / priority per URL from the hand-written sitemap, kept where present"""
+    ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+    try:
+        root = ElementTree.parse(path).getroot()
+    except (OSError, ElementTree.ParseError):
+        return {}
+    hints = {}
+    for url in root.findall("sm:url", ns):
+        hints[url.findtext("sm:loc", "", ns).rstrip("/")] = (
+            url.findtext("sm:changefreq", None, ns), url.findtext("sm:priority", None, ns))
+    return hints
+
+
+def build_sitemap(pages, lastmods):
+    hints = sitemap_hints()
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for page in pages:
+        calculator = page.path.endswith("-calculator")
+        changefreq, priority = hints.get(page.url.rstrip("/"), (None, None))
+        lines += [
+            "  <url>",
+            f"    <loc>{html.escape(page.url)}</loc>",
+            f"    <lastmod>{lastmods[page.path]}</lastmod>",
+            f"    <changefreq>{changefreq or ('weekly' if calculator else 'monthly')}</changefreq>",
+            f"    <priority>{priority or ('0.9' if calculator else '0.7')}</priority>",
+            "  </url>",
+        ]
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def load_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dist", default=DIST_DIR, help="vite build output containing index.html")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and render every route")
+    parser.add_argument("-j", "--jobs", type=int, default=min(32, (os.cpu_count() or 1) * 4))
+    args = parser.parse_args()
+
+    template_path = os.path.join(args.dist, "index.html")
+    if not os.path.exists(template_path):
+        sys.exit(f"{template_path} not found; run `yarn build` in frontend/ first")
+    with open(template_path, "rb") as f:
+        template_bytes = f.read()
+    template = template_bytes.decode("utf-8")
+    with open(APP_PATH, "r", encoding="utf-8") as f:
+        pages = parse_routes(f.read())
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    manifest_path = os.path.join(args.cache_dir, "manifest.json")
+    manifest = {} if args.force else load_manifest(manifest_path)
+
+    started = time.perf_counter()
+    # "/" is the built index.html itself; it only needs a sitemap entry
+    shells = [page for page in pages if page.path != "/"]
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        lastmod_futures = {page.path: pool.submit(last_modified, page.source_path) for page in pages}
+        results = list(pool.map(
+            lambda page: prerender_route(page, template, template_bytes, args.dist, args.cache_dir,
+                                         manifest.get(page.path)),
+            shells,
+        ))
+        lastmods = {path: future.result() for path, future in lastmod_futures.items()}
+    with open(os.path.join(args.dist, "sitemap.xml"), "w", encoding="utf-8") as f:
+        f.write(build_sitemap(pages, lastmods))
+    elapsed = time.perf_counter() - started
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({r["route"]: r["hash"] for r in results if r["hash"]}, f, indent=2, sort_keys=True)
+
+    for result in results:
+        print(f"  {result['state']:<10} {result['route']}")
+    rendered = sum(r["state"] == "rendered" for r in results)
+    cached = sum(r["state"] == "cached" for r in results)
+    print(f"Prerendered {len(shells)} routes ({rendered} rendered, {cached} from cache) "
+          f"and sitemap.xml ({len(pages)} URLs) in {elapsed * 1000:.0f}ms")
+    return all(r["hash"] for r in results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
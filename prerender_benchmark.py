@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Prerender Benchmark: static shells vs the SPA
+Serves a built frontend from a local HTTP server, once with the prerendered
+shells and once as a plain SPA (every route rewritten to index.html, as the
+Netlify redirect does), and measures per route:
+
+- TTFB: time to the first byte of the HTML response
+- time to route meta: when the route's <title> and description are known.
+  For a shell that is the HTML response itself. For the SPA it is at least
+  the HTML plus every script and stylesheet it references; JS parse and
+  execution come on top, so the SPA figure is a lower bound.
+
+--rtt-ms adds a simulated network round trip to every response; the SPA
+needs at least two sequential round trips before any route meta exists.
+
+Usage:
+    python prerender.py && python prerender_benchmark.py [--dist frontend/build] [-n 20] [--rtt-ms 50]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from prerender import APP_PATH, DIST_DIR, parse_routes
+
+ASSET_RE = re.compile(r'<(?:script[^>]+src|link[^>]+rel="(?:stylesheet|modulepreload)"[^>]+href)="(/[^"]+)"')
+
+
+class DistHandler(SimpleHTTPRequestHandler):
+    spa_only = False
+    rtt = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        if self.rtt:
+            time.sleep(self.rtt)
+        path = self.translate_path(self.path)
+        shell = os.path.join(path, "index.html")
+        if os.path.isfile(path):
+            return super().send_head()
+        # SPA fallback, or the route's shell when prerendered output is served
+        if self.spa_only or not os.path.isfile(shell):
+            self.path = "/index.html"
+        elif not self.path.endswith("/"):
+            self.path = self.path.rstrip("/") + "/index.html"
+        return super().send_head()
+
+
+def start_server(dist, spa_only, rtt):
+    handler = type("Handler", (DistHandler,), {"spa_only": spa_only, "rtt": rtt})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(handler, directory=dist))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch(client, path):
+    """(seconds to first byte, seconds to complete, body)"""
+    started = time.perf_counter()
+    with client.stream("GET", path) as response:
+        chunks = response.iter_bytes()
+        first = next(chunks, b"")
+        ttfb = time.perf_counter() - started
+        body = first + b"".join(chunks)
+    return ttfb, time.perf_counter() - started, body.decode("utf-8", "replace")
+
+
+def measure_route(client, path, spa):
+    ttfb, html_done, body = fetch(client, path)
+    if not spa:
+        return ttfb, html_done
+    # Scripts and stylesheets load in parallel once the HTML has arrived
+    started = time.perf_counter()
+    assets = ASSET_RE.findall(body)
+    threads = [threading.Thread(target=fetch, args=(client, asset)) for asset in assets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return ttfb, html_done + (time.perf_counter() - started)
+
+
+def run_mode(dist, routes, spa, repeat, rtt):
+    server = start_server(dist, spa, rtt)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    results = {}
+    try:
+        with httpx.Client(base_url=base, limits=httpx.Limits(max_connections=16)) as client:
+            for route in routes:
+                samples = [measure_route(client, route, spa) for _ in range(repeat)]
+                results[route] = (statistics.median(s[0] for s in samples), statistics.median(s[1] for s in samples))
+    finally:
+        server.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dist", default=DIST_DIR)
+    parser.add_argument("-n", "--repeat", type=int, default=20, help="requests per route and mode")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated round trip added to every response")
+    args = parser.parse_args()
+
+    with open(APP_PATH, "r", encoding="utf-8") as f:
+        routes = [page.path for page in parse_routes(f.read()) if page.path != "/"]
+    missing = [r for r in routes if not os.path.isfile(os.path.join(args.dist, r.strip("/"), "index.html"))]
+    if missing:
+        sys.exit(f"No prerendered shell for {', '.join(missing)}; run prerender.py first")
+
+    rtt = args.rtt_ms / 1000
+    shells = run_mode(args.dist, routes, spa=False, repeat=args.repeat, rtt=rtt)
+    spa = run_mode(args.dist, routes, spa=True, repeat=args.repeat, rtt=rtt)
+
+    print(f"Median of {args.repeat} requests per route, simulated RTT {args.rtt_ms:g}ms (ms)\n")
+    print("| Route | Shell TTFB | SPA TTFB | Shell meta | SPA meta (lower bound) |")
+    print("|---|---|---|---|---|")
+    for route in routes:
+        print(f"| {route} | {shells[route][0] * 1000:.2f} | {spa[route][0] * 1000:.2f} | "
+              f"{shells[route][1] * 1000:.2f} | {spa[route][1] * 1000:.2f} |")
+    shell_meta = statistics.median(v[1] for v in shells.values())
+    spa_meta = statistics.median(v[1] for v in spa.values())
+    print(f"\nRoute meta available after {shell_meta * 1000:.2f}ms with shells vs "
+          f">= {spa_meta * 1000:.2f}ms as an SPA ({spa_meta / shell_meta:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Worker Scaling Benchmark for the BMI Calculator backend
+Starts backend/run.py with 1, 2, 4, ... workers, drives each deployment over
+HTTP for a fixed duration, and prints requests/second per worker count as a
+Markdown table (see DEPLOYMENT.md on reading the results).
+
+Runs offline by default: every worker uses the in-memory Mongo stand-in from
+backend_benchmark.py. Pass --mongo-url to benchmark against a real MongoDB.
+The load generator runs on the same host, so keep --load-procs plus the
+largest worker count at or below the number of cores for meaningful numbers.
+
+Usage:
+    python scaling_benchmark.py                          # 1,2,4.. up to the core count
+    python scaling_benchmark.py --workers 1,2,4,8 -d 20 --output scaling.md
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from backend_benchmark import METABOLIC_BATCH
+
+ROOT_DIR = Path(__file__).parent
+RUNNER = ROOT_DIR / "backend" / "run.py"
+
+# (name, method, path, json body)
+SCENARIOS = [
+    ("GET /api/formulas/bsa", "GET", "/api/formulas/bsa?weight=70&height=175", None),
+    ("GET /api/tables/healthy-weight", "GET", "/api/tables/healthy-weight?height_cm=175&age=30", None),
+    ("POST /api/status", "POST", "/api/status", {"client_name": "scaling"}),
+    ("POST /api/batch/metabolic", "POST", "/api/batch/metabolic", METABOLIC_BATCH),
+]
+
+
+def default_worker_counts():
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def start_server(workers, port, mongo_url):
+    env = dict(os.environ, STATUS_ROLLUP_INTERVAL="0", WARM_LOOKUP_TABLES="1",
+               RATE_LIMIT_ENABLED="0")
+    cmd = [sys.executable, str(RUNNER), "--workers", str(workers), "--port", str(port),
+           "--host", "127.0.0.1", "--log-level", "warning", "--no-access-log"]
+    if mongo_url:
+        env["MONGO_URL"] = mongo_url
+        env.setdefault("DB_NAME", "benchmark")
+    else:
+        cmd += ["--app", "backend_benchmark:offline_app", "--factory", "--app-dir", str(ROOT_DIR)]
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL)
+
+
+def wait_ready(base_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not become ready")
+
+
+async def _drive(base_url, method, path, body, concurrency, duration):
+    completed = errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=10) as client:
+        async def worker():
+            nonlocal completed, errors
+            while time.perf_counter() < deadline:
+                try:
+                    response = await client.request(method, path, json=body)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                completed += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return completed, errors
+
+
+def _load_process(args):
+    return asyncio.run(_drive(*args))
+
+
+def measure(base_url, scenario, concurrency, duration, load_procs):
+    _, method, path, body = scenario
+    job = (base_url, method, path, body, concurrency, duration)
+    if load_procs == 1:
+        results = [_load_process(job)]
+    else:
+        with multiprocessing.Pool(load_procs) as pool:
+            results = pool.map(_load_process, [job] * load_procs)
+    completed = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    return completed / duration, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", help="comma-separated worker counts (default: 1,2,4.. up to the core count)")
+    parser.add_argument("-c", "--concurrency", type=int, default=32, help="connections per load process")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--load-procs", type=int, default=1, help="load generator processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mongo-url", help="use a real MongoDB instead of the in-memory stand-in")
+    parser.add_argument("--output", type=Path, help="write the Markdown table here")
+    args = parser.parse_args()
+
+    worker_counts = [int(n) for n in args.workers.split(",")] if args.workers else default_worker_counts()
+    base_url = f"http://127.0.0.1:{args.port}"
+    rps = {}
+    for workers in worker_counts:
+        server = start_server(workers, args.port, args.mongo_url)
+        try:
+            wait_ready(base_url)
+            for scenario in SCENARIOS:
+                # Warm every worker's imports and lookup tables before measuring
+                measure(base_url, scenario, args.concurrency, 1.0, args.load_procs)
+                value, errors = measure(base_url, scenario, args.concurrency, args.duration, args.load_procs)
+                rps[(scenario[0], workers)] = value
+                print(f"[DONE] {scenario[0]} workers={workers}: {value:.0f} req/s errors={errors}")
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+    header = "| Endpoint | " + " | ".join(f"{w} worker{'s' if w > 1 else ''}" for w in worker_counts) + " |"
+    lines = [header, "|" + "---|" * (len(worker_counts) + 1)]
+    for name, *_ in SCENARIOS:
+        base = rps[(name, worker_counts[0])]
+        cells = [f"{rps[(name, w)]:.0f} ({rps[(name, w)] / base:.1f}x)" for w in worker_counts]
+        lines.append(f"| {name} | " + " | ".join(cells) + " |")
+    table = "\n".join(lines)
+    print("\n" + table)
+    if args.output:
+        args.output.write_text(table + "\n")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
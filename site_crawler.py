@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Concurrent Route Crawler for BMI Calculator Website
+Fetches every route once over a pooled HTTP client and parses each page a
+single time into a PageIndex (title, meta tags, links, JSON-LD, classes),
+so the route, SEO and responsive-design checks all run against the cache.
+
+Usage:
+    python site_crawler.py [--frontend-url http://localhost:3000] [-c 8]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from html.parser import HTMLParser
+
+import httpx
+
+# Routes declared in frontend/src/App.jsx
+ROUTES = [
+    "/",
+    "/body-fat-calculator",
+    "/army-body-fat-calculator",
+    "/lean-body-mass-calculator",
+    "/ideal-weight-calculator",
+    "/healthy-weight-calculator",
+    "/body-type-calculator",
+    "/body-surface-area-calculator",
+    "/calorie-calculator",
+    "/tdee-calculator",
+    "/bmr-calculator",
+    "/macro-calculator",
+    "/carbohydrate-calculator",
+    "/protein-calculator",
+    "/fat-intake-calculator",
+    "/pace-calculator",
+    "/calories-burned-calculator",
+    "/one-rep-max-calculator",
+    "/target-heart-rate-calculator",
+    "/privacy-policy",
+    "/terms-conditions",
+    "/contact-us",
+]
+
+
+class PageIndex:
+    """Structured view of one fetched page"""
+
+    def __init__(self, route, status_code, content_type, error=None):
+        self.route = route
+        self.status_code = status_code
+        self.content_type = content_type
+        self.error = error
+        self.title = None
+        self.meta = {}          # name= and property= keys, lowercased
+        self.links = {}         # rel -> href
+        self.json_ld = []       # parsed JSON-LD objects
+        self.schema_types = set()
+        self.tags = set()
+        self.classes = set()
+        self.text = ""
+
+    @property
+    def ok(self):
+        return self.error is None and self.status_code == 200
+
+    def has_meta(self, key):
+        return key.lower() in self.meta
+
+    def has_class_prefix(self, prefix):
+        return any(cls.startswith(prefix) for cls in self.classes)
+
+    def mentions(self, word):
+        word = word.lower()
+        return (word in self.text
+                or word in (self.title or "").lower()
+                or word in self.meta.get("description", "").lower())
+
+
+class _IndexBuilder(HTMLParser):
+    def __init__(self, page):
+        super().__init__(convert_charrefs=True)
+        self.page = page
+        self._in_title = False
+        self._in_json_ld = False
+        self._script_chunks = []
+        self._text_chunks = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or "" for k, v in attrs}
+        page = self.page
+        page.tags.add(tag)
+        page.classes.update(attrs.get("class", "").split())
+        if tag == "title":
+            self._in_title = True
+            page.title = ""
+        elif tag == "meta":
+            key = attrs.get("name") or attrs.get("property")
+            if key:
+                page.meta[key.lower()] = attrs.get("content", "")
+        elif tag == "link" and attrs.get("rel"):
+            page.links[attrs["rel"].lower()] = attrs.get("href", "")
+        elif tag == "script" and attrs.get("type") == "application/ld+json":
+            self._in_json_ld = True
+            self._script_chunks = []
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "script" and self._in_json_ld:
+            self._in_json_ld = False
+            self._add_json_ld("".join(self._script_chunks))
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self._script_chunks.append(data)
+        elif self._in_title:
+            self.page.title += data
+        else:
+            self._text_chunks.append(data)
+
+    def close(self):
+        super().close()
+        self.page.text = " ".join(self._text_chunks).lower()
+
+    def _add_json_ld(self, raw):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+            elif isinstance(node, dict):
+                types = node.get("@type")
+                if isinstance(types, str):
+                    self.page.schema_types.add(types)
+                elif isinstance(types, list):
+                    self.page.schema_types.update(t for t in types if isinstance(t, str))
+                stack.extend(node.values())
+        self.page.json_ld.append(data)
+
+
+def parse_page(route, status_code, content_type, html):
+    page = PageIndex(route, status_code, content_type)
+    builder = _IndexBuilder(page)
+    builder.feed(html)
+    builder.close()
+    return page
+
+
+async def _fetch(client, semaphore, route):
+    async with semaphore:
+        try:
+            response = await client.get(route)
+        except httpx.HTTPError as e:
+            return PageIndex(route, None, None, error=str(e))
+    content_type = response.headers.get("content-type", "").lower()
+    if "html" not in content_type:
+        return PageIndex(route, response.status_code, content_type)
+    # Parsing is CPU-bound; keep it off the event loop so fetches overlap
+    return await asyncio.to_thread(parse_page, route, response.status_code, content_type, response.text)
+
+
+async def crawl(base_url, routes=ROUTES, concurrency=8, timeout=10):
+    """Fetch each route once and return {route: PageIndex}"""
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        pages = await asyncio.gather(*(_fetch(client, semaphore, route) for route in dict.fromkeys(routes)))
+    return {page.route: page for page in pages}
+
+
+def crawl_sync(base_url, routes=ROUTES, concurrency=8, timeout=10):
+    return asyncio.run(crawl(base_url, routes, concurrency, timeout))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl the calculator routes once and summarize SEO tags")
+    parser.add_argument("--frontend-url", default="http://localhost:3000")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    pages = crawl_sync(args.frontend_url, concurrency=args.concurrency)
+    elapsed = time.perf_counter() - started
+
+    failed = 0
+    for route, page in pages.items():
+        if not page.ok:
+            failed += 1
+            print(f"[FAIL] {route}: {page.error or page.status_code}")
+            continue
+        print(f"[PASS] {route}: title={page.title!r} meta={len(page.meta)} "
+              f"json-ld={sorted(page.schema_types)}")
+    print(f"\nCrawled {len(pages)} routes in {elapsed:.2f}s ({failed} failed)")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cold-Start Benchmark for the BMI Calculator backend
+Imports backend/server.py in fresh interpreters with `python -X importtime`,
+reports the median import time and the slowest modules, and fails when the
+median exceeds the budget or a deferred module (NumPy, pandas, the report
+renderer) is loaded at import.
+
+MONGO_URL and DB_NAME are removed from the environment for the run: the
+import must succeed without them, the connection is opened in the lifespan
+(backend/.env, when present, is still loaded by server.py itself).
+
+Usage:
+    python startup_benchmark.py                   # 5 runs, 1000 ms budget
+    python startup_benchmark.py -n 10 --budget-ms 600 --top 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+BACKEND_DIR = ROOT_DIR / "backend"
+
+# Must only be imported once an endpoint that needs them is hit
+DEFERRED_MODULES = ["numpy", "pandas", "metabolic", "composition", "pace", "body_profiles", "weight_tables", "activities", "training", "meals", "reports"]
+
+PROBE = (
+    "import sys, server; "
+    "print(','.join(m for m in {deferred!r} if m in sys.modules))"
+)
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # header line
+        modules[fields[2].strip()] = (self_us, cumulative_us)
+    return modules
+
+
+def measure_once():
+    env = {k: v for k, v in os.environ.items() if k not in ("MONGO_URL", "DB_NAME")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(deferred=DEFERRED_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"Importing server failed:\n{proc.stderr[-2000:]}")
+    modules = parse_importtime(proc.stderr)
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return modules, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="maximum median import time")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("BMI CALCULATOR BACKEND - COLD START BENCHMARK")
+    print("=" * 80)
+
+    totals = []
+    slowest = {}
+    loaded = []
+    for _ in range(args.runs):
+        modules, loaded = measure_once()
+        totals.append(modules["server"][1] / 1000)
+        for name, (self_us, _) in modules.items():
+            slowest[name] = slowest.get(name, 0) + self_us / 1000 / args.runs
+
+    median = statistics.median(totals)
+    print(f"import server: median {median:.1f}ms, min {min(totals):.1f}ms, max {max(totals):.1f}ms "
+          f"over {args.runs} runs")
+    print(f"\n{'module':<50} {'self ms':>10}")
+    for name, ms in sorted(slowest.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{name[:50]:<50} {ms:>10.1f}")
+
+    ok = True
+    if loaded:
+        print(f"\n❌ Deferred modules imported at startup: {', '.join(loaded)}")
+        ok = False
+    if median > args.budget_ms:
+        print(f"\n❌ Median import time {median:.1f}ms exceeds the {args.budget_ms:.0f}ms budget")
+        ok = False
+    if ok:
+        print(f"\n✅ Cold start within the {args.budget_ms:.0f}ms budget.")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+POST /api/status Microbenchmark
+Compares the per-heartbeat work of the old model path (StatusCheckCreate ->
+.dict() -> StatusCheck -> .dict(), then response_model validation and
+serialization) with the StatusRecord fast path in backend/server.py.
+Reports CPU time and peak allocated bytes (tracemalloc) per request, without
+HTTP or MongoDB in the loop.
+
+Usage:
+    python status_microbenchmark.py [-n 50000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+os.environ.setdefault("DB_NAME", "benchmark")
+
+from server import StatusCheck, StatusCheckCreate, StatusRecord  # noqa: E402
+
+BODY = {"client_name": "microbenchmark"}
+
+
+def model_path(body):
+    """The handler as it was: two model validations and two .dict() copies"""
+    status_obj = StatusCheck(**StatusCheckCreate(**body).dict())
+    document = status_obj.dict()
+    # FastAPI's response_model handling revalidates and serializes the return value
+    payload = StatusCheck.model_validate(status_obj).model_dump(mode="json")
+    return document, json.dumps(payload)
+
+
+def record_path(body):
+    """The current handler: one request validation, then a slotted record"""
+    record = StatusRecord(StatusCheckCreate(**body).client_name)
+    return record.to_document(), json.dumps(record.to_json())
+
+
+def cpu_per_call(fn, iterations):
+    started = time.process_time()
+    for _ in range(iterations):
+        fn(BODY)
+    return (time.process_time() - started) / iterations
+
+
+def peak_bytes_per_call(fn):
+    tracemalloc.start()
+    fn(BODY)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--iterations", type=int, default=50000)
+    args = parser.parse_args()
+    # .dict() is deprecated on Pydantic v2; the warning would dominate the model path timing
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    print("=" * 80)
+    print("POST /api/status - RECORD PATH MICROBENCHMARK")
+    print("=" * 80)
+    results = {}
+    for name, fn in (("model path (before)", model_path), ("record path (after)", record_path)):
+        fn(BODY)  # warm caches
+        results[name] = (
+            cpu_per_call(fn, args.iterations) * 1e6,
+            peak_bytes_per_call(fn),
+        )
+
+    print(f"{'path':<22} {'cpu µs/req':>12} {'peak bytes/req':>16}")
+    for name, (cpu_us, peak) in results.items():
+        print(f"{name:<22} {cpu_us:>12.2f} {peak:>16}")
+    before, after = results["model path (before)"], results["record path (after)"]
+    print(f"\nCPU per request: {before[0] / after[0]:.1f}x less, "
+          f"peak allocation: {before[1] / max(after[1], 1):.1f}x less")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
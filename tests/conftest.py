@@ -0,0 +1,37 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Read by server.py at import time: no real MongoDB, no background loops, and
+# every test client shares one address, so the limiter is tested on its own
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "tests")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("STATUS_ROLLUP_INTERVAL", "0")
+os.environ.setdefault("WARM_LOOKUP_TABLES", "0")
+
+
+@pytest.fixture
+def mongo():
+    from mongomock_motor import AsyncMongoMockClient
+
+    return AsyncMongoMockClient()
+
+
+@pytest.fixture
+def client(mongo, monkeypatch):
+    """TestClient for the app against a fresh in-memory database and response cache."""
+    from fastapi.testclient import TestClient
+
+    import server
+    from response_cache import MemoryBackend
+
+    monkeypatch.setattr(server, "client", mongo)
+    monkeypatch.setattr(server.response_cache, "backend", MemoryBackend())
+    with TestClient(server.app) as test_client:
+        yield test_client
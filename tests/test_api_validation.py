@@ -0,0 +1,55 @@
+"""Bad input gets a 422, never a 500 from deep inside a NumPy module."""
+import pytest
+
+BAD_QUERIES = [
+    "/api/formulas/bsa?weight=inf&height=175",
+    "/api/formulas/bsa?weight=70&height=nan",
+    "/api/formulas/one-rep-max?weight=1e308&reps=5",
+    "/api/formulas/one-rep-max?weight=100&reps=25",
+    "/api/formulas/ideal-weight?height=inf&sex=male",
+    "/api/tables/ideal-weight?height_cm=inf&sex=male",
+    "/api/tables/ideal-weight?height_cm=nan&sex=male",
+    "/api/tables/healthy-weight?height_cm=inf&age=30",
+    "/api/training/percent-table?max_reps=50",
+]
+
+BAD_BODIES = [
+    ("/api/batch/pace", '{"distance_m": [NaN], "time_s": [1200]}'),
+    ("/api/batch/pace", '{"distance_m": [5000], "time_s": [Infinity]}'),
+    ("/api/batch/pace", '{"distance_m": [], "time_s": []}'),
+    ("/api/batch/calories", '{"code": [1003], "duration_min": [30], "weight": [NaN]}'),
+    ("/api/batch/calories", '{"code": [100000000000000000000], "duration_min": [30], "weight": [70]}'),
+    ("/api/batch/metabolic", '{"weight_kg": [NaN], "height_cm": [180], "age": [30], "sex": ["male"], "activity_level": ["moderate"]}'),
+    ("/api/profile", '{"weight": 1e308, "height": 170, "sex": "female"}'),
+    ("/api/batch/profile", '{"weight": [70, Infinity], "height": [170, 180], "sex": ["female", "male"]}'),
+    ("/api/meal-plan", '{"tdee": 1e308}'),
+    ("/api/meal-plan", '{"tdee": 9000}'),
+]
+
+
+@pytest.mark.parametrize("url", BAD_QUERIES)
+def test_bad_query_parameters(client, url):
+    assert client.get(url).status_code == 422
+
+
+@pytest.mark.parametrize("url, body", BAD_BODIES)
+def test_bad_request_bodies(client, url, body):
+    response = client.post(url, content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+    assert "detail" in response.json()
+
+
+def test_unknown_activity_code_is_not_found(client):
+    assert client.get("/api/activities/100000000000000000000").status_code == 404
+    assert client.get("/api/activities/1003").json()["code"] == "01003"
+
+
+def test_women_without_hip_get_no_navy_estimate(client):
+    profile = {"weight": 60, "height": 165, "sex": "female", "age": 30, "neck": 32, "waist": 70}
+    result = client.post("/api/profile", json=profile).json()
+    assert result["body_fat"]["navy"] is None
+    assert result["army_pass"] is None
+
+    result = client.post("/api/profile", json={**profile, "hip": 95}).json()
+    assert result["body_fat"]["navy"] == 25.1
+    assert result["army_pass"] is True
@@ -0,0 +1,109 @@
+import math
+
+import numpy as np
+import pytest
+
+import formulas
+from composition import navy_body_fat
+
+# The calculators' expressions, transcribed from the .jsx components
+JSX_BSA = {
+    "dubois": lambda w, h: 0.007184 * h ** 0.725 * w ** 0.425,
+    "mosteller": lambda w, h: math.sqrt(h * w / 3600),
+    "haycock": lambda w, h: 0.024265 * w ** 0.5378 * h ** 0.3964,
+    "gehan": lambda w, h: 0.0235 * w ** 0.51456 * h ** 0.42246,
+    "boyd": lambda w, h: 0.0003207 * h ** 0.3 * (w * 1000) ** (0.7285 - 0.0188 * math.log10(w * 1000)),
+}
+JSX_ONE_REP_MAX = {
+    "epley": lambda w, r: w * (1 + r / 30),
+    "brzycki": lambda w, r: w * (36 / (37 - r)),
+    "lander": lambda w, r: (100 * w) / (101.3 - 2.67123 * r),
+    "lombardi": lambda w, r: w * r ** 0.10,
+    "mayhew": lambda w, r: (100 * w) / (52.2 + 41.9 * math.exp(-0.055 * r)),
+    "oconner": lambda w, r: w * (1 + 0.025 * r),
+    "wathan": lambda w, r: (100 * w) / (48.8 + 53.8 * math.exp(-0.075 * r)),
+}
+JSX_IDEAL_WEIGHT = {
+    ("devine", "male"): lambda inches: 50.0 + 2.3 * max(0, inches - 60),
+    ("devine", "female"): lambda inches: 45.5 + 2.3 * max(0, inches - 60),
+    ("robinson", "male"): lambda inches: 52.0 + 1.9 * max(0, inches - 60),
+    ("robinson", "female"): lambda inches: 49.0 + 1.7 * max(0, inches - 60),
+    ("miller", "male"): lambda inches: 56.2 + 1.41 * max(0, inches - 60),
+    ("miller", "female"): lambda inches: 53.1 + 1.36 * max(0, inches - 60),
+    ("hamwi", "male"): lambda inches: 48.0 + 2.7 * max(0, inches - 60),
+    ("hamwi", "female"): lambda inches: 45.5 + 2.2 * max(0, inches - 60),
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    formulas.cache.clear()
+
+
+@pytest.mark.parametrize("weight, height", [(70, 175), (3.5, 50), (140.2, 201.3)])
+def test_bsa_matches_the_calculator(weight, height):
+    results = formulas.body_surface_area(weight, height)
+    for name, expected in JSX_BSA.items():
+        assert results[name] == pytest.approx(expected(weight, height), rel=1e-12)
+
+
+@pytest.mark.parametrize("weight, reps", [(100, 1), (62.5, 8), (140, 20)])
+def test_one_rep_max_matches_the_calculator(weight, reps):
+    results = formulas.one_rep_max(weight, reps)
+    for name, expected in JSX_ONE_REP_MAX.items():
+        assert results[name] == pytest.approx(expected(weight, reps), rel=1e-12)
+
+
+@pytest.mark.parametrize("height_cm", [140, 152.4, 175, 198.1])
+@pytest.mark.parametrize("sex", ["male", "female"])
+def test_ideal_weight_matches_the_calculator(height_cm, sex):
+    results = formulas.ideal_weight(height_cm, sex)
+    for (name, formula_sex), expected in JSX_IDEAL_WEIGHT.items():
+        if formula_sex == sex:
+            assert results[name] == pytest.approx(expected(height_cm / 2.54), abs=1e-9)
+
+
+def test_navy_body_fat_matches_the_calculator():
+    def jsx(height, neck, waist, hip, male):
+        h, n, w, p = (value / 2.54 for value in (height, neck, waist, hip))
+        if male:
+            return 86.010 * math.log10(w - n) - 70.041 * math.log10(h) + 36.76
+        return 163.205 * math.log10(w + p - n) - 97.684 * math.log10(h) - 78.387
+
+    rows = [(180, 38, 85, 0, True), (165, 32, 70, 95, False), (172, 35, 90, 104, False)]
+    results = navy_body_fat(*(np.array(column) for column in zip(*rows)))
+    assert results == pytest.approx([jsx(*row) for row in rows], rel=1e-12)
+
+
+def test_units_share_a_cache_entry():
+    metric = formulas.body_surface_area(70, 180)
+    imperial = formulas.body_surface_area(154.32, 70.866, "lbs", "in")
+    assert imperial == metric
+    assert formulas.cache.stats()["hits"] == 1
+
+
+def test_cache_evicts_least_recently_used_and_expires(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("formulas.time.monotonic", lambda: clock[0])
+    cache = formulas.FormulaCache(maxsize=2, ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    clock[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["expirations"] == 1
+
+
+@pytest.mark.parametrize("call", [
+    lambda: formulas.body_surface_area(float("inf"), 175),
+    lambda: formulas.body_surface_area(70, float("nan")),
+    lambda: formulas.one_rep_max(1e308, 5),
+    lambda: formulas.one_rep_max(100, 21),
+    lambda: formulas.ideal_weight(175, "other"),
+    lambda: formulas.ideal_weight(float("inf"), "male"),
+])
+def test_invalid_inputs_raise_value_error(call):
+    with pytest.raises(ValueError):
+        call()
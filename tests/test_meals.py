@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+import meals
+
+
+def test_targets_follow_the_macro_calculator():
+    # 2000 kcal balanced: 25/45/30 % at 4/4/9 kcal per gram
+    assert meals.macro_targets(2000, meals.MACRO_PRESETS["balanced"]).tolist() == [125, 225, 67]
+
+
+def test_plan_hits_its_targets():
+    plan = meals.meal_plan(2200, days=3)
+    assert plan["target_calories"] == 2200
+    assert not plan["shortfall"]
+    for day in plan["days"]:
+        assert set(day["meals"]) == set(meals.MEAL_SPLIT)
+        assert day["short_of"] == []
+        assert abs(day["totals"]["calories"] - 2200) / 2200 < 0.05
+
+
+def test_portions_are_capped_quarter_servings():
+    plan = meals.meal_plan(3000, preset="highProtein", days=2)
+    servings = [food["servings"] for day in plan["days"] for meal in day["meals"].values() for food in meal["foods"]]
+    assert all(0 < amount <= meals.MAX_SERVINGS for amount in servings)
+    assert all(amount / meals.SERVING_STEP == int(amount / meals.SERVING_STEP) for amount in servings)
+
+
+def test_consecutive_days_change_protein_and_carb():
+    plan = meals.meal_plan(2000, days=4)
+    for meal in meals.MEAL_SPLIT:
+        foods = [[food["food"] for food in day["meals"][meal]["foods"]] for day in plan["days"]]
+        for today, tomorrow in zip(foods, foods[1:]):
+            assert today[:2] != tomorrow[:2]
+
+
+def test_preferences_filter_the_foods():
+    table = meals.get_food_table()
+    plan = meals.meal_plan(2000, diet="vegan", gluten_free=True, days=2)
+    for day in plan["days"]:
+        for meal in day["meals"].values():
+            for food in meal["foods"]:
+                i = table.index_of([food["food"]])[0]
+                assert meals.DIET_LEVELS[table.diet[i]] == "vegan"
+                assert not table.allergen_bits[i] & 1
+
+
+def test_plans_are_memoized_per_calorie_band():
+    meals.solve_plan.cache_clear()
+    meals.meal_plan(2010)
+    meals.meal_plan(1990)
+    assert meals.plan_cache_stats()["hits"] == 1
+
+
+def test_unmet_targets_are_flagged():
+    plan = meals.meal_plan(4000, preset="keto", days=2)
+    assert plan["shortfall"]
+    assert all("fat" in day["short_of"] for day in plan["days"])
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"tdee": 900}, "below the 1000 kcal"),
+    ({"tdee": 9000}, "above the 6000 kcal"),
+    ({"tdee": 2000, "ratio": (50, 50, 10)}, "adding up to 100"),
+    ({"tdee": 2000, "goal": "bulk"}, "Unknown goal"),
+    ({"tdee": 2000, "diet": "vegan", "exclude": ["Tofu (firm)", "Tempeh", "Seitan", "Edamame", "Pea protein"]},
+     "No protein foods"),
+])
+def test_invalid_requests_raise_value_error(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        meals.meal_plan(**kwargs)
+
+
+def test_rank_meal_orders_by_error():
+    table = meals.get_food_table()
+    _, _, error = meals.rank_meal(table, np.ones(len(table), dtype=bool), np.array([30.0, 50.0, 15.0]))
+    assert (np.diff(error) >= 0).all()
+
+
+def test_meal_plan_endpoint(client):
+    response = client.post("/api/meal-plan", json={"tdee": 2000, "days": 2, "diet": "vegetarian"})
+    assert response.status_code == 200
+    assert len(response.json()["days"]) == 2
+    assert client.post("/api/meal-plan", json={"tdee": 1e308}).status_code == 422
+    assert client.post("/api/meal-plan", json={"tdee": 2000, "protein": 30}).status_code == 422
@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import ndjson
+from composition import process_records
+
+MAN = {"weight_kg": 80, "height_cm": 180, "neck_cm": 38, "waist_cm": 85, "sex": "male"}
+WOMAN = {"weight_kg": 60, "height_cm": 165, "neck_cm": 32, "waist_cm": 70, "hip_cm": 95, "sex": "female"}
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def collect(iterator):
+    async def drain():
+        return [item async for item in iterator]
+
+    return asyncio.run(drain())
+
+
+def test_lines_are_split_across_chunks():
+    assert collect(ndjson.iter_lines(chunks(b'{"a":', b' 1}\n{"b"', b": 2}\n", b'{"c": 3}'))) == [
+        b'{"a": 1}', b'{"b": 2}', b'{"c": 3}',
+    ]
+
+
+def test_oversized_lines_become_errors_and_the_stream_resyncs():
+    lines = collect(ndjson.iter_lines(chunks(b"ok\n", b"x" * 6, b"x" * 6 + b"\nnext\n", b"y" * 20), max_line_bytes=8))
+    assert lines[0] == b"ok"
+    assert isinstance(lines[1], ValueError)
+    assert lines[2] == b"next"
+    assert isinstance(lines[3], ValueError)
+    assert len(lines) == 4
+
+
+def test_batches_keep_line_numbers_and_skip_blank_lines():
+    batches = collect(ndjson.iter_batches(chunks(b'{"a": 1}\n\n[1]\nnot json\n{"b": 2}\n'), batch_size=2))
+    assert [[line for line, _ in batch] for batch in batches] == [[1, 3], [4, 5]]
+    records = [record for batch in batches for _, record in batch]
+    assert records[0] == {"a": 1}
+    assert "expected a JSON object" in str(records[1])
+    assert str(records[2]).startswith("invalid JSON")
+
+
+def test_one_bad_record_does_not_affect_its_batch():
+    results = process_records([MAN, {**MAN, "height_cm": "180"}, {**MAN, "id": 7}, {**MAN, "sex": "other"}])
+    assert results[0]["body_fat"] == 16.15
+    assert "height_cm must be a positive number" in results[1]["error"]
+    assert results[2]["id"] == 7 and results[2]["body_fat"] == 16.15
+    assert results[3] == {"error": "unknown sex value: other"}
+
+
+def test_women_need_a_hip_measurement():
+    results = process_records([WOMAN, {key: value for key, value in WOMAN.items() if key != "hip_cm"}])
+    assert results[0]["body_fat"] == 25.1
+    assert results[1] == {"error": "missing fields: hip_cm"}
+
+
+def test_impossible_body_fat_is_an_error():
+    results = process_records([{**MAN, "neck_cm": 90}, {**MAN, "neck_cm": 30, "waist_cm": 31}])
+    assert all("outside the Navy formula's range" in result["error"] for result in results)
+
+
+def test_stream_reports_each_bad_line(client):
+    body = "\n".join([json.dumps(MAN), "{broken", json.dumps({"weight_kg": 80}), json.dumps(WOMAN)])
+    response = client.post("/api/stream/composition?batch_size=2", content=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["line"] for line in lines] == [1, 2, 3, 4]
+    assert lines[0]["body_fat"] == 16.15
+    assert lines[1]["error"].startswith("invalid JSON")
+    assert lines[2]["error"].startswith("missing fields: height_cm")
+    assert lines[3]["body_fat"] == 25.1
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from ratelimit import AdmissionGate, MemoryStore, RateLimiter
+
+
+def test_bucket_allows_a_burst_then_asks_to_wait(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("ratelimit.time.monotonic", lambda: clock[0])
+    store = MemoryStore()
+
+    async def scenario():
+        waits = [await store.take("a", rate=2, burst=3) for _ in range(4)]
+        assert waits == [0, 0, 0, 0.5]
+        # Half a second refills one token at 2/s
+        clock[0] += 0.5
+        assert await store.take("a", rate=2, burst=3) == 0
+        # Other keys have their own bucket
+        assert await store.take("b", rate=2, burst=3) == 0
+
+    asyncio.run(scenario())
+
+
+def test_forgotten_buckets_restart_full():
+    store = MemoryStore(maxsize=1)
+
+    async def scenario():
+        assert await store.take("a", rate=1, burst=1) == 0
+        assert await store.take("a", rate=1, burst=1) > 0
+        await store.take("b", rate=1, burst=1)
+        assert await store.take("a", rate=1, burst=1) == 0
+
+    asyncio.run(scenario())
+
+
+def limited_app(limiter, gate=None):
+    app = FastAPI(dependencies=[Depends(limiter)])
+
+    @app.get("/cheap")
+    async def cheap():
+        return {}
+
+    @app.get("/busy", dependencies=[Depends(gate)] if gate else [])
+    async def busy():
+        return {"in_flight": gate.in_flight}
+
+    return app
+
+
+def test_limiter_answers_429_per_route_policy():
+    limiter = RateLimiter(default=(0.001, 5), policies={"GET /busy": (0.001, 1)})
+    with TestClient(limited_app(limiter, AdmissionGate(10))) as client:
+        assert [client.get("/busy").status_code for _ in range(2)] == [200, 429]
+        response = client.get("/busy")
+        assert int(response.headers["Retry-After"]) >= 1
+        # The default policy of another route is untouched
+        assert client.get("/cheap").status_code == 200
+
+
+def test_disabled_limiter_lets_everything_through():
+    limiter = RateLimiter(default=(0.001, 1), enabled=False)
+    with TestClient(limited_app(limiter)) as client:
+        assert {client.get("/cheap").status_code for _ in range(5)} == {200}
+
+
+def test_gate_sheds_past_its_limit_and_releases_on_exit():
+    gate = AdmissionGate(limit=1, retry_after=2)
+    limiter = RateLimiter(default=(1000, 1000))
+    with TestClient(limited_app(limiter, gate)) as client:
+        assert client.get("/busy").json() == {"in_flight": 1}
+        assert gate.in_flight == 0
+
+        gate.in_flight = 1  # another request is holding the only slot
+        response = client.get("/busy")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "2"
+        assert gate.in_flight == 1
+
+
+def test_gate_releases_its_slot_when_the_handler_fails():
+    gate = AdmissionGate(limit=1)
+    app = FastAPI()
+
+    @app.get("/boom", dependencies=[Depends(gate)])
+    async def boom():
+        raise RuntimeError("handler failed")
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        assert client.get("/boom").status_code == 500
+    assert gate.in_flight == 0
+
+
+@pytest.mark.parametrize("route", ["/api/formulas/cache", "/api/status"])
+def test_app_routes_are_rate_limited(client, monkeypatch, route):
+    import server
+
+    monkeypatch.setattr(server.rate_limiter, "enabled", True)
+    monkeypatch.setattr(server.rate_limiter, "store", MemoryStore())
+    monkeypatch.setattr(server.rate_limiter, "default", (0.001, 2))
+    assert [client.get(route).status_code for _ in range(3)] == [200, 200, 429]
@@ -0,0 +1,59 @@
+import io
+import zipfile
+
+import reports
+
+BMI = {
+    "name": "Ana",
+    "calculated_on": "2024-05-01",
+    "age": 34,
+    "gender": "female",
+    "weight": 62.5,
+    "height": 168,
+    "bmi": 22.1,
+    "category": "Normal Weight",
+    "health_risk": "Low risk.",
+    "recommendations": ["Keep active", "Sleep well"],
+}
+
+
+def test_report_renders_a_pdf_with_a_safe_filename(client):
+    response = client.post("/api/reports/bmi", json={**BMI, "calculated_on": "../2024/05/01"})
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF-1.4")
+    assert 'filename="BMI-Report-2024-05-01.pdf"' in response.headers["content-disposition"]
+
+
+def test_wrongly_typed_fields_are_a_422(client):
+    response = client.post("/api/reports/bmi", json={**BMI, "category": ["x"]})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "category"]
+
+    response = client.post("/api/reports/bsa/batch", json={"items": [{"bsa": 1.9}, {"bsa": {"m2": 1.9}}]})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:3] == ["body", "items", 1]
+
+
+def test_unknown_report_type_is_not_found(client):
+    assert client.post("/api/reports/tdee", json=BMI).status_code == 404
+
+
+def test_batch_zips_one_pdf_per_item(client):
+    response = client.post("/api/reports/bmi/batch", json={"items": [BMI, BMI, {**BMI, "name": "../Bo"}]})
+    assert response.status_code == 200
+    names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+    assert names == ["Ana.pdf", "Ana-2.pdf", "Bo.pdf"]
+
+
+def test_long_text_flows_onto_new_pages_at_the_line_step():
+    short = reports.render_report("bmi", BMI)
+    long = reports.render_report("bmi", {**BMI, "health_risk": "word " * 3000})
+    assert short.count(b"/Type /Page ") == 1
+    assert long.count(b"/Type /Page ") > 2
+
+    step = 12 * reports.LINE_HEIGHT_FACTOR / reports.PT_PER_MM
+    pages = [reports._Page()]
+    paragraph = reports.Paragraph("text", advance_after=0)
+    end = paragraph.render(pages, 50, reports._Values(text="word " * 30))
+    lines = len(reports.wrap_text("word " * 30, 12, reports.PAGE_WIDTH - 40))
+    assert end == 50 + lines * step
@@ -0,0 +1,119 @@
+import asyncio
+
+from starlette.requests import Request
+
+from response_cache import MongoGenerations, ResponseCache, etag_matches, render_json
+
+
+def make_request(path="/api/status", query="", if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": headers})
+
+
+def test_etag_matching_is_weak():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_cached_until_the_tag_is_invalidated():
+    cache = ResponseCache(policies={"status": "no-cache"})
+    builds = []
+
+    async def build():
+        builds.append(1)
+        return render_json({"version": len(builds)}), {}
+
+    async def scenario():
+        first = await cache.respond(make_request(), "status", build)
+        again = await cache.respond(make_request(), "status", build)
+        assert again.body == first.body and len(builds) == 1
+        assert first.headers["Cache-Control"] == "no-cache"
+
+        # Another URL of the same route is its own entry
+        await cache.respond(make_request(query="limit=5"), "status", build)
+        assert len(builds) == 2
+
+        await cache.invalidate("status")
+        fresh = await cache.respond(make_request(), "status", build)
+        assert len(builds) == 3
+        assert fresh.headers["ETag"] != first.headers["ETag"]
+
+    asyncio.run(scenario())
+
+
+def test_matching_etag_gets_a_bodiless_304_with_the_same_headers():
+    cache = ResponseCache()
+
+    async def build():
+        return render_json([1, 2, 3]), {"X-Next-Cursor": "abc"}
+
+    async def scenario():
+        full = await cache.respond(make_request(), "status", build)
+        revalidated = await cache.respond(make_request(if_none_match=full.headers["ETag"]), "status", build)
+        assert revalidated.status_code == 304
+        assert revalidated.body == b""
+        for header in ("ETag", "Vary", "X-Next-Cursor"):
+            assert revalidated.headers[header] == full.headers[header]
+        assert cache.stats()["not_modified"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_shared_generations_reach_every_worker(mongo, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("response_cache.time.monotonic", lambda: clock[0])
+    collection = mongo.cache.cache_generations
+    first = ResponseCache(generations=MongoGenerations(collection, max_age=1.0))
+    second = ResponseCache(generations=MongoGenerations(collection, max_age=1.0))
+    version = [0]
+
+    async def build():
+        return render_json({"version": version[0]}), {}
+
+    async def scenario():
+        await first.respond(make_request(), "status", build)
+        await second.respond(make_request(), "status", build)
+        version[0] = 1
+        await first.invalidate("status")
+        assert (await first.respond(make_request(), "status", build)).body == b'{"version":1}'
+        # The other worker rereads the generation once its copy is max_age old
+        assert (await second.respond(make_request(), "status", build)).body == b'{"version":0}'
+        clock[0] += 1.0
+        assert (await second.respond(make_request(), "status", build)).body == b'{"version":1}'
+
+    asyncio.run(scenario())
+
+
+def test_status_poll_revalidates_until_a_new_check_arrives(client):
+    assert client.post("/api/status", json={"client_name": "web"}).status_code == 200
+    first = client.get("/api/status")
+    assert [check["client_name"] for check in first.json()] == ["web"]
+    etag = first.headers["etag"]
+    assert first.headers["vary"] == "Accept-Encoding"
+
+    unchanged = client.get("/api/status", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    client.post("/api/status", json={"client_name": "app"})
+    changed = client.get("/api/status", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 2
+
+
+def test_compressed_status_revalidates_with_the_weak_etag(client):
+    for i in range(40):
+        client.post("/api/status", json={"client_name": f"client-{i}"})
+    compressed = client.get("/api/status", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    etag = compressed.headers["etag"]
+    assert etag.startswith("W/")
+
+    revalidated = client.get("/api/status", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.headers["vary"] == "Accept-Encoding"
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from rollups import StatusRollup
+
+NOW = datetime(2024, 5, 1, 12, 30)
+
+
+def checks(*stamps, client_name="web"):
+    return [{"client_name": client_name, "timestamp": stamp} for stamp in stamps]
+
+
+async def hour_counts(rollup):
+    return {doc["bucket"]: doc["count"] async for doc in rollup.rollups.find({"granularity": "hour"})}
+
+
+def test_first_run_counts_every_check(mongo):
+    async def scenario():
+        db = mongo.rollups
+        rollup = StatusRollup(db, lag=0)
+        await rollup.create_indexes()
+        await db.status_checks.insert_many(checks(NOW - timedelta(hours=1), NOW - timedelta(minutes=5), NOW - timedelta(minutes=4)))
+        assert await rollup.run_once(now=NOW) == 3
+        assert await hour_counts(rollup) == {datetime(2024, 5, 1, 11): 1, datetime(2024, 5, 1, 12): 2}
+        assert await rollup.counts_by_client(hours=2, now=NOW) == [{"client_name": "web", "count": 3}]
+
+    asyncio.run(scenario())
+
+
+def test_rerun_recounts_the_open_bucket_without_double_counting(mongo):
+    async def scenario():
+        db = mongo.rollups
+        rollup = StatusRollup(db, lag=0)
+        await rollup.create_indexes()
+        await db.status_checks.insert_many(checks(NOW - timedelta(minutes=10)))
+        await rollup.run_once(now=NOW)
+        await db.status_checks.insert_many(checks(NOW + timedelta(minutes=1)))
+        assert await rollup.run_once(now=NOW + timedelta(minutes=2)) == 1
+        # Nothing new: a repeat run is a no-op
+        assert await rollup.run_once(now=NOW + timedelta(minutes=2)) == 0
+        assert await hour_counts(rollup) == {datetime(2024, 5, 1, 12): 2}
+
+    asyncio.run(scenario())
+
+
+def test_racing_workers_do_not_inflate_counts(mongo):
+    async def scenario():
+        db = mongo.rollups
+        first, second = StatusRollup(db, lag=0), StatusRollup(db, lag=0)
+        await first.create_indexes()
+        await db.status_checks.insert_many(checks(NOW - timedelta(minutes=3), NOW - timedelta(minutes=2)))
+        await first.run_once(now=NOW)
+
+        # Both workers read the same watermark; only one compare-and-set wins
+        state = await db.rollup_state.find_one({"_id": "status_checks"})
+        await db.status_checks.insert_many(checks(NOW + timedelta(minutes=1)))
+        assert await first.run_once(now=NOW + timedelta(minutes=5)) == 1
+        assert not await second._advance_watermark(state, state["watermark"], NOW + timedelta(minutes=5))
+        assert await second.run_once(now=NOW + timedelta(minutes=5)) == 0
+        assert await hour_counts(first) == {datetime(2024, 5, 1, 12): 3}
+
+    asyncio.run(scenario())
+
+
+def test_stale_count_never_replaces_a_fresher_bucket(mongo):
+    async def scenario():
+        db = mongo.rollups
+        rollup = StatusRollup(db, lag=0)
+        await rollup.create_indexes()
+        bucket = datetime(2024, 5, 1, 12)
+        await rollup._write_buckets({("hour", "web", bucket): 5}, until=NOW)
+        await rollup._write_buckets({("hour", "web", bucket): 2}, until=NOW - timedelta(minutes=1))
+        assert await hour_counts(rollup) == {bucket: 5}
+
+    asyncio.run(scenario())
+
+
+def test_buckets_carry_their_expiry(mongo):
+    async def scenario():
+        db = mongo.rollups
+        rollup = StatusRollup(db, lag=0, retention={"minute": timedelta(days=7)})
+        await rollup.create_indexes()
+        # Recent checks: the in-memory store applies the TTL index on reads
+        now = datetime.utcnow()
+        await db.status_checks.insert_many(checks(now - timedelta(seconds=1)))
+        await rollup.run_once(now=now)
+        minute = await db.status_check_rollups.find_one({"granularity": "minute"})
+        hour = await db.status_check_rollups.find_one({"granularity": "hour"})
+        assert minute["expires_at"] == minute["bucket"] + timedelta(days=7)
+        assert "expires_at" not in hour
+
+    asyncio.run(scenario())
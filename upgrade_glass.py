@@ -1,52 +1,223 @@
+"""Glassmorphism design-token codemod for the calculator pages and components.
+
+All rules are compiled once into a single alternation and applied in one
+scan per pass (passes repeat until nothing matches, so a rule can still act
+on text produced by another rule). Matches are taken leftmost-first, so a
+rule is no longer shadowed by an earlier rule rewriting part of its text.
+Files whose content hash matches the manifest from the previous run are
+skipped, the rest are processed on a process pool.
+
+Usage:
+    python upgrade_glass.py                # apply
+    python upgrade_glass.py --dry-run      # print a unified diff, write nothing
+    python upgrade_glass.py --timing       # per-rule timing report
+    python upgrade_glass.py --force        # ignore the manifest
+"""
+import argparse
+import difflib
+import hashlib
+import json
 import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 directories = ["frontend/src/pages", "frontend/src/components"]
 
+MANIFEST_PATH = ".upgrade_glass_manifest.json"
+
+# Make sure we don't break App.jsx or main structural files with aggressive replaces
+PROTECTED_FILES = {"App.jsx", "Navbar.jsx", "Header.jsx"}
+
+MAX_PASSES = 5
+
 replacements = [
     # Card backgrounds
     (r'bg-gray-900/50 border-gray-800', r'glass-panel glow-border'),
     (r'bg-gray-[89]00/50', r'glass-panel glow-border'),
-    
+
     # Inputs and Selects
     (r'bg-gray-800 border-gray-700 text-white flex-1', r'glass-input flex-1'),
     (r'bg-gray-800 border-gray-700 text-white w-([a-z0-9-]+)', r'glass-input w-\1'),
     (r'bg-gray-800 border-gray-700 text-white', r'glass-input'),
     (r'bg-gray-800 border-gray-700', r'glass-panel border-white/10 scale-in'),
-    
+
     # Text
     (r'text-gray-200', r'glass-text'),
     (r'text-gray-300', r'glass-text opacity-90'),
-    
+
     # Buttons
     (r'bg-gradient-to-r from-[a-z]+-\d+ to-[a-z]+-\d+ hover:from-[a-z]+-\d+ hover:to-[a-z]+-\d+ text-white (.*?) transition-all duration-300 transform hover:scale-\d+', r'premium-btn \1'),
     (r'className="border-gray-[0-9]+ text-gray-[0-9]+ hover:bg-gray-[0-9]+"', r'className="premium-btn opacity-80"'),
-    
+
     # Layout Adjustments (mobile squeezed inner calculators)
     # Often contained in <div className="grid grid-cols-1 md:grid-cols-2...">, we want better spacing if any
 ]
 
-for d in directories:
-    if not os.path.exists(d):
-        continue
-    for filename in os.listdir(d):
-        if filename.endswith(".jsx"):
-            filepath = os.path.join(d, filename)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
-            for pattern, repl in replacements:
-                content = re.sub(pattern, repl, content)
-            
-            # Additional targeted specific replaces
-            content = content.replace('bg-gray-800/30', 'bg-white/5')
-            content = content.replace('border-gray-600/30', 'border-white/10')
-            content = content.replace('bg-gray-700/30', 'bg-white/5')
-            
-            # Make sure we don't break App.jsx or main structural files with aggressive replaces
-            if filename not in ["App.jsx", "Navbar.jsx", "Header.jsx"]:
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                  
-print("Glassmorphism migration completed.")
+# Additional targeted literal replaces
+literal_replacements = [
+    ('bg-gray-800/30', 'bg-white/5'),
+    ('border-gray-600/30', 'border-white/10'),
+    ('bg-gray-700/30', 'bg-white/5'),
+]
+
+
+class Rule:
+    def __init__(self, name, pattern, repl):
+        self.name = name
+        self.pattern = pattern
+        self.repl = repl
+        self.regex = re.compile(pattern)
+
+
+class RuleSet:
+    """Rules combined into one alternation; earlier rules win at the same position."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.combined = re.compile("|".join(f"(?P<r{i}>{rule.pattern})" for i, rule in enumerate(rules)))
+        self.fingerprint = hashlib.sha256(
+            json.dumps([(r.pattern, r.repl) for r in rules]).encode()
+        ).hexdigest()
+
+    def apply(self, content, counts=None):
+        def substitute(match):
+            index = int(match.lastgroup[1:])
+            rule = self.rules[index]
+            if counts is not None:
+                counts[rule.name] = counts.get(rule.name, 0) + 1
+            # Re-match with the rule's own pattern so its group numbers apply
+            return rule.regex.fullmatch(match.group()).expand(rule.repl)
+
+        for _ in range(MAX_PASSES):
+            updated = self.combined.sub(substitute, content)
+            if updated == content:
+                break
+            content = updated
+        return content
+
+    def time_rules(self, content):
+        """Seconds each rule spends scanning ``content`` on its own."""
+        timings = {}
+        for rule in self.rules:
+            started = time.perf_counter()
+            for _ in rule.regex.finditer(content):
+                pass
+            timings[rule.name] = time.perf_counter() - started
+        return timings
+
+
+def build_rules():
+    rules = [Rule(f"regex:{pattern}", pattern, repl) for pattern, repl in replacements]
+    rules += [Rule(f"literal:{old}", re.escape(old), new.replace("\\", "\\\\")) for old, new in literal_replacements]
+    return RuleSet(rules)
+
+
+RULES = build_rules()
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def process_file(filepath, dry_run=False, timing=False):
+    """Run the codemod on one file (executes in a worker process)."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    counts = {}
+    updated = RULES.apply(content, counts)
+    result = {
+        "path": filepath,
+        "changed": updated != content,
+        "counts": counts,
+        "timings": RULES.time_rules(content) if timing else {},
+        "diff": None,
+        "hash": content_hash(content),
+    }
+    if result["changed"] and os.path.basename(filepath) not in PROTECTED_FILES:
+        if dry_run:
+            result["diff"] = "".join(difflib.unified_diff(
+                content.splitlines(keepends=True), updated.splitlines(keepends=True),
+                fromfile=f"a/{filepath}", tofile=f"b/{filepath}",
+            ))
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(updated)
+            result["hash"] = content_hash(updated)
+    else:
+        result["changed"] = False
+    return result
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("rules") != RULES.fingerprint:
+        return {}
+    return manifest.get("files", {})
+
+
+def find_files():
+    for d in directories:
+        if not os.path.exists(d):
+            continue
+        for filename in sorted(os.listdir(d)):
+            if filename.endswith(".jsx"):
+                yield os.path.join(d, filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the glassmorphism design-token migration")
+    parser.add_argument("--dry-run", action="store_true", help="print a unified diff instead of writing")
+    parser.add_argument("--timing", action="store_true", help="report time spent per rule")
+    parser.add_argument("--force", action="store_true", help="ignore the content-hash manifest")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    manifest = {} if args.force else load_manifest()
+    pending = []
+    skipped = 0
+    for filepath in find_files():
+        # Same decoded, newline-normalised text that process_file hashes
+        with open(filepath, 'r', encoding='utf-8') as f:
+            if manifest.get(filepath) == content_hash(f.read()):
+                skipped += 1
+                continue
+        pending.append(filepath)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(process_file, pending, [args.dry_run] * len(pending), [args.timing] * len(pending)))
+    elapsed = time.perf_counter() - started
+
+    counts, timings = {}, {}
+    for result in results:
+        for name, count in result["counts"].items():
+            counts[name] = counts.get(name, 0) + count
+        for name, seconds in result["timings"].items():
+            timings[name] = timings.get(name, 0.0) + seconds
+        if result["diff"]:
+            print(result["diff"], end="")
+        if not args.dry_run:
+            manifest[result["path"]] = result["hash"]
+
+    if not args.dry_run:
+        with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+            json.dump({"rules": RULES.fingerprint, "files": manifest}, f, indent=2, sort_keys=True)
+
+    changed = sum(result["changed"] for result in results)
+    verb = "would change" if args.dry_run else "changed"
+    print(f"Glassmorphism migration completed: {len(results)} scanned, {changed} {verb}, "
+          f"{skipped} unchanged since last run ({elapsed:.2f}s).")
+    if args.timing:
+        print(f"\n{'rule':<60} {'matches':>8} {'scan ms':>10}")
+        for rule in RULES.rules:
+            print(f"{rule.name[:60]:<60} {counts.get(rule.name, 0):>8} {timings.get(rule.name, 0.0) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()